@@ -0,0 +1,80 @@
+"""Compares the board backends of HexGame.
+
+Plays the same random games with every backend and reports the time per move, along with the cost
+of the emptiness check alone. Run it from the repository root:
+
+    poetry run python benchmarks/backends.py
+"""
+import argparse
+import random
+import time
+
+from hexterm.bitboard import BitboardHexGame
+from hexterm.hex_game import HexGame
+
+BACKENDS = {
+    "array": HexGame,
+    "bitboard": BitboardHexGame,
+}
+
+
+def random_games(size: int, num_games: int, seed: int) -> list:
+    """Returns the move orders of random games, shared by all backends."""
+    rng = random.Random(seed)
+    games = []
+    for _ in range(num_games):
+        moves = list(range(size * size))
+        rng.shuffle(moves)
+        games.append(moves)
+    return games
+
+
+def time_games(game_class: type, size: int, games: list) -> tuple:
+    """Plays the games through `step` and returns the number of moves and the elapsed time."""
+    game = game_class(num_rows=size, num_cols=size)
+    num_moves = 0
+    start = time.perf_counter()
+    for moves in games:
+        game.reset()
+        for action in moves:
+            num_moves += 1
+            if game.step(action)[2]:
+                break
+    return num_moves, time.perf_counter() - start
+
+
+def time_is_cell_empty(game_class: type, size: int, repeats: int) -> float:
+    """Returns the time of one `is_cell_empty` call on a half filled board."""
+    game = game_class(num_rows=size, num_cols=size)
+    for action in range(0, size * size, 2):
+        game._update_game_state(action)
+        game.update_player()
+    cells = range(size * size)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for cell in cells:
+            game.is_cell_empty(cell)
+    return (time.perf_counter() - start) / (repeats * size * size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 11, 15, 19])
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'backend':>9} {'us/move':>9} {'moves/s':>10} {'ns/is_cell_empty':>17}")
+    for size in args.sizes:
+        games = random_games(size, args.games, args.seed)
+        for name, game_class in BACKENDS.items():
+            num_moves, elapsed = time_games(game_class, size, games)
+            empty_time = time_is_cell_empty(game_class, size, repeats=200)
+            print(
+                f"{size:>5} {name:>9} {elapsed / num_moves * 1e6:>9.2f} "
+                f"{num_moves / elapsed:>10.0f} {empty_time * 1e9:>17.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Measures the bytes per move of the ANSI broadcast and what each viewer costs the server.
+
+Plays random games and reports the size of the diff sent after every move against the size of a
+full redraw, and the time to render and encode it. Then a broadcaster sends a game to a number of
+viewers connected over localhost, and reports the time spent sending each move, in total and per
+viewer. Run it from the repository root:
+
+    poetry run python benchmarks/broadcast.py --sizes 7 11 19 --viewers 1 10 100 500
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from hexterm.broadcast import AnsiRenderer, Broadcaster
+from hexterm.hex_game import HexGame
+
+
+def random_game(size: int, rng: random.Random):
+    """Yields a game after each move of a random game."""
+    game = HexGame(size, size)
+    while not game.done:
+        game.make(game.random_legal_action(rng))
+        yield game
+
+
+def measure_bytes(size: int, num_games: int, seed: int) -> tuple:
+    """Returns the mean and maximum diff per move, the mean keyframe and the render time."""
+    rng = random.Random(seed)
+    diffs, keyframes = [], []
+    seconds = 0.0
+    for _ in range(num_games):
+        renderer = AnsiRenderer(size, size)
+        for game in random_game(size, rng):
+            start = time.perf_counter()
+            diffs.append(len(renderer.render(game)))
+            seconds += time.perf_counter() - start
+            keyframes.append(len(renderer.keyframe()))
+    return np.mean(diffs), np.max(diffs), np.mean(keyframes), seconds / len(diffs)
+
+
+async def measure_viewers(size: int, num_viewers: int, seed: int) -> tuple:
+    """Sends a random game to viewers over localhost, and returns the seconds and bytes per move."""
+    game = HexGame(size, size)
+    broadcaster = Broadcaster(game)
+    joined = asyncio.Event()
+
+    async def serve_viewer(reader, writer):
+        broadcaster.add(writer)
+        if len(broadcaster) == num_viewers:
+            joined.set()
+        await reader.read()
+
+    async def viewer(port: int) -> int:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        received = 0
+        while data := await reader.read(1 << 16):
+            received += len(data)
+        writer.close()
+        return received
+
+    server = await asyncio.start_server(serve_viewer, "127.0.0.1", 0, backlog=num_viewers)
+    port = server.sockets[0].getsockname()[1]
+    viewers = [asyncio.create_task(viewer(port)) for _ in range(num_viewers)]
+    await joined.wait()
+    keyframe = len(broadcaster.renderer.keyframe())
+
+    rng = random.Random(seed)
+    seconds = 0.0
+    while not game.done:
+        game.make(game.random_legal_action(rng))
+        start = time.perf_counter()
+        broadcaster.publish()
+        seconds += time.perf_counter() - start
+        await asyncio.sleep(0)  # let the writes go out, as between the moves of a real game
+    broadcaster.close()
+    received = await asyncio.gather(*viewers)
+    server.close()
+    await server.wait_closed()
+    footer = len(broadcaster.renderer.footer())
+    return seconds / game.num_moves, (np.mean(received) - keyframe - footer) / game.num_moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[7, 11, 19])
+    parser.add_argument("--viewers", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--games", type=int, default=20, help="games per size for the diff sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'diff B/move':>12} {'max B':>6} {'redraw B':>9} {'render us':>10}")
+    for size in args.sizes:
+        mean, largest, keyframe, seconds = measure_bytes(size, args.games, args.seed)
+        print(f"{size:>5} {mean:>12.1f} {largest:>6} {keyframe:>9.0f} {seconds * 1e6:>10.1f}")
+
+    print()
+    print(f"{'size':>5} {'viewers':>8} {'us/move':>9} {'us/viewer':>10} {'B/move/viewer':>14}")
+    for size in args.sizes:
+        for num_viewers in args.viewers:
+            seconds, received = asyncio.run(measure_viewers(size, num_viewers, args.seed))
+            print(
+                f"{size:>5} {num_viewers:>8} {seconds * 1e6:>9.1f} "
+                f"{seconds / num_viewers * 1e6:>10.2f} {received:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
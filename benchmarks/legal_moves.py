@@ -0,0 +1,92 @@
+"""Compares finding legal moves by scanning the board with the legal moves kept by the game.
+
+Plays random games where every move is drawn from the legal moves, found either by calling
+`is_valid` on every action index or with `random_legal_action`, and times a legal actions mask
+built from the board against the one kept by the game. Run it from the repository root:
+
+    poetry run python benchmarks/legal_moves.py --sizes 5 11 19 27
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from hexterm.hex_game import STATE_EMPTY, HexGame
+from hexterm.py_game import PyHexGame
+
+BACKENDS = {
+    "array": HexGame,
+    "python": PyHexGame,
+}
+
+
+def scan_legal_action(game: HexGame, rng: random.Random) -> int:
+    """Returns a random legal action, found by checking every action index."""
+    legal = [action for action in range(game.num_rows * game.num_cols) if game.is_valid(action)]
+    return legal[rng.randrange(len(legal))]
+
+
+def kept_legal_action(game: HexGame, rng: random.Random) -> int:
+    """Returns a random legal action from the legal moves kept by the game."""
+    return game.random_legal_action(rng)
+
+
+def time_playouts(game_class: type, size: int, num_games: int, choose, seed: int) -> float:
+    """Plays random games to the end and returns the time per move in seconds."""
+    game = game_class(size, size)
+    rng = random.Random(seed)
+    num_moves = 0
+    start = time.perf_counter()
+    for _ in range(num_games):
+        game.reset()
+        while not game.done:
+            game.make(choose(game, rng))
+            num_moves += 1
+    return (time.perf_counter() - start) / num_moves
+
+
+def time_masks(game_class: type, size: int, repeats: int, seed: int) -> tuple:
+    """Returns the time to get a legal actions mask built from the board, and kept by the game."""
+    game = game_class(size, size)
+    rng = random.Random(seed)
+    for _ in range(size * size // 2):
+        game.make(game.random_legal_action(rng))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        np.asarray(game.board) == STATE_EMPTY
+    built = (time.perf_counter() - start) / repeats
+    start = time.perf_counter()
+    for _ in range(repeats):
+        np.asarray(game.legal_actions_mask())
+    kept = (time.perf_counter() - start) / repeats
+    return built, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 11, 19, 27])
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>5} {'backend':>8} {'scan us/move':>13} {'kept us/move':>13} "
+        f"{'speedup':>8} {'mask built us':>14} {'mask kept us':>13}"
+    )
+    for size in args.sizes:
+        for name in args.backends:
+            game_class = BACKENDS[name]
+            scan = time_playouts(game_class, size, args.games, scan_legal_action, args.seed)
+            kept = time_playouts(game_class, size, args.games, kept_legal_action, args.seed)
+            built_mask, kept_mask = time_masks(game_class, size, 1000, args.seed)
+            print(
+                f"{size:>5} {name:>8} {scan * 1e6:>13.2f} {kept * 1e6:>13.2f} "
+                f"{scan / kept:>7.1f}x {built_mask * 1e6:>14.2f} {kept_mask * 1e6:>13.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
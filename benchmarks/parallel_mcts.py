@@ -0,0 +1,45 @@
+"""Measures how the parallel MCTS scales with the number of worker processes.
+
+For each worker count, searches the empty board a few times and reports the total playouts per
+second and the speedup over a single worker. Run it from the repository root:
+
+    poetry run python benchmarks/parallel_mcts.py --size 11 --workers 1 2 4 8 16 32
+"""
+import argparse
+import os
+import time
+
+from hexterm.hex_game import HexGame
+from hexterm.parallel_mcts import ParallelMCTS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=11)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    parser.add_argument("--time-limit", type=float, default=1.0)
+    parser.add_argument("--searches", type=int, default=3)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count()
+    workers = args.workers or sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1)))
+    game = HexGame(args.size, args.size)
+
+    print(f"{'workers':>7} {'playouts/s':>11} {'speedup':>8}")
+    baseline = None
+    for num_workers in workers:
+        with ParallelMCTS(
+            args.size, args.size, num_workers=num_workers, time_limit=args.time_limit, seed=0
+        ) as search:
+            playouts = 0
+            start = time.perf_counter()
+            for _ in range(args.searches):
+                search.search(game)
+                playouts += search.last_playouts
+            rate = playouts / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{num_workers:>7} {rate:>11.0f} {rate / baseline:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compares the throughput of random playouts: move by move, filled at once, and vectorized.
+
+From the empty board and from a position a quarter filled, plays the game out at random in three
+ways: with `step` until it is won, with `HexGame.playout`, which fills the board and searches it
+once, and with `random_playouts`, which fills and searches a batch of boards with NumPy. Reports
+the playouts per second of each. Run it from the repository root:
+
+    poetry run python benchmarks/playouts.py --sizes 5 11 19
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from hexterm.hex_batch import random_playouts
+from hexterm.py_game import PyHexGame
+
+
+def step_playouts(game: PyHexGame, num_playouts: int, rng: random.Random) -> None:
+    """Plays the game out with `step`, undoing the moves after each playout."""
+    for _ in range(num_playouts):
+        num_moves = game.num_moves
+        while not game.step(game.random_legal_action(rng))[2]:
+            pass
+        for _ in range(game.num_moves - num_moves):
+            game.undo()
+
+
+def fill_playouts(game: PyHexGame, num_playouts: int, rng: random.Random) -> None:
+    """Plays the game out with `HexGame.playout`."""
+    for _ in range(num_playouts):
+        game.playout(rng)
+
+
+def time_rate(function, *args, num_playouts: int) -> float:
+    """Returns the playouts per second of a function running num_playouts playouts."""
+    start = time.perf_counter()
+    function(*args)
+    return num_playouts / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 11, 19])
+    parser.add_argument("--playouts", type=int, default=2000, help="playouts per measurement")
+    parser.add_argument("--batch", type=int, default=500, help="playouts per vectorized call")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    np_rng = np.random.default_rng(args.seed)
+    print(
+        f"{'size':>5} {'filled':>7} {'step/s':>10} {'fill/s':>10} {'vector/s':>10} "
+        f"{'fill x':>7} {'vector x':>9}"
+    )
+    for size in args.sizes:
+        for filled in (0.0, 0.25):
+            game = PyHexGame(size, size)
+            for _ in range(int(filled * size * size)):
+                game.make(game.random_legal_action(rng))
+            step = time_rate(step_playouts, game, args.playouts, rng, num_playouts=args.playouts)
+            fill = time_rate(fill_playouts, game, args.playouts, rng, num_playouts=args.playouts)
+            batches = max(args.playouts // args.batch, 1)
+            vector = time_rate(
+                lambda: [random_playouts(game, args.batch, np_rng) for _ in range(batches)],
+                num_playouts=batches * args.batch,
+            )
+            print(
+                f"{size:>5} {filled:>7.0%} {step:>10.0f} {fill:>10.0f} {vector:>10.0f} "
+                f"{fill / step:>6.1f}x {vector / step:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
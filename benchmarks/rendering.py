@@ -0,0 +1,99 @@
+"""Measures how many bytes the game screen sends to the terminal per frame.
+
+Runs the game screen in a pseudo terminal and plays a scripted game through it: the cursor walks
+over the board and a stone is placed every few moves. Each script is run twice, with and without
+clearing the screen before every frame as the game used to, and the bytes written to the terminal
+are counted. Run it from the repository root:
+
+    poetry run python benchmarks/rendering.py --size 15
+"""
+import argparse
+import curses
+import fcntl
+import os
+import random
+import select
+import struct
+import subprocess
+import sys
+import termios
+
+from hexterm.game_states import Gameplay
+from hexterm.hex_game import HexGame
+from hexterm.hex_ui import HexUI
+
+KEYS = [curses.KEY_UP, curses.KEY_DOWN, curses.KEY_LEFT, curses.KEY_RIGHT]
+STONE_EVERY = 4  # frames between two stones
+
+
+def play_frames(stdscr, size: int, num_frames: int, full_redraw: bool) -> None:
+    """Renders the scripted frames of a game on the terminal."""
+    curses.curs_set(0)
+    hex_ui = HexUI(HexGame(size, size))
+    state = Gameplay(hex_ui)
+    rng = random.Random(0)
+    state.render(stdscr)
+    stdscr.noutrefresh()
+    curses.doupdate()
+    for frame in range(num_frames):
+        if frame % STONE_EVERY == STONE_EVERY - 1 and not hex_ui.game.done:
+            state.process_input(ord(" "))
+        else:
+            state.process_input(rng.choice(KEYS))
+        if full_redraw:
+            stdscr.clear()
+            hex_ui.invalidate_board()
+        state.render(stdscr)
+        stdscr.noutrefresh()
+        curses.doupdate()
+
+
+def terminal_bytes(size: int, num_frames: int, full_redraw: bool, lines: int, columns: int) -> int:
+    """Runs the frames in a pseudo terminal and returns the number of bytes written to it."""
+    master, slave = os.openpty()
+    fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", lines, columns, 0, 0))
+    command = [sys.executable, __file__, "--child", str(size), str(num_frames), str(full_redraw)]
+    env = dict(os.environ, TERM="xterm-256color")
+    child = subprocess.Popen(command, stdin=slave, stdout=slave, stderr=slave, env=env)
+    os.close(slave)
+
+    written = 0
+    while True:
+        ready, _, _ = select.select([master], [], [], 0.1)
+        if ready:
+            try:
+                data = os.read(master, 65536)
+            except OSError:  # the child exited and closed the terminal
+                break
+            if not data:
+                break
+            written += len(data)
+        elif child.poll() is not None:
+            break
+    child.wait()
+    os.close(master)
+    return written
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        size, num_frames, full_redraw = int(sys.argv[2]), int(sys.argv[3]), sys.argv[4] == "True"
+        curses.wrapper(play_frames, size, num_frames, full_redraw)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=40)
+    parser.add_argument("--columns", type=int, default=120)
+    args = parser.parse_args()
+
+    print(f"{'rendering':>12} {'bytes/frame':>12}")
+    for name, full_redraw in (("full redraw", True), ("incremental", False)):
+        setup = terminal_bytes(args.size, 0, full_redraw, args.lines, args.columns)
+        total = terminal_bytes(args.size, args.frames, full_redraw, args.lines, args.columns)
+        print(f"{name:>12} {(total - setup) / args.frames:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
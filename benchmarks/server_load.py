@@ -0,0 +1,123 @@
+"""Load tests the game server with many concurrent clients on localhost.
+
+For each number of connections, that many clients connect at once, pair up into games and play
+random moves for a while. Reports the moves per second accepted by the server, the latency of a
+move (from sending it to receiving it back) and the server's memory per running game.
+
+By default the server runs in this process, on the same event loop. Pass --port to load test a
+server started separately with `python -m hexterm.server`. Run it from the repository root:
+
+    poetry run python benchmarks/server_load.py --connections 10 100 1000 2000
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from hexterm.server import GameServer, Session
+
+
+async def wait_start(reader) -> int:
+    """Waits for the start of a game, and returns our player."""
+    while True:
+        words = (await reader.readline()).split()
+        if words[0] == b"START":
+            return int(words[3])
+
+
+async def play_client(host: str, port: int, size: int, deadline: float, rng, latencies: list):
+    """Plays random games until the deadline, recording the latency of its moves."""
+    reader, writer = await asyncio.open_connection(host, port)
+    moves = 0
+    try:
+        while time.perf_counter() < deadline:
+            writer.write(f"PLAY {size}\n".encode())
+            try:
+                player = await asyncio.wait_for(wait_start(reader), deadline - time.perf_counter())
+            except asyncio.TimeoutError:
+                break  # nobody left to pair with
+            empty = list(range(size * size))
+            rng.shuffle(empty)
+            sent = None
+            if player == 1:
+                writer.write(f"MOVE {empty.pop()}\n".encode())
+                sent = time.perf_counter()
+            while True:
+                words = (await reader.readline()).split()
+                if words[0] == b"MOVE":
+                    mover, action = int(words[1]), int(words[2])
+                    if mover == player:
+                        latencies.append(time.perf_counter() - sent)
+                        moves += 1
+                    elif action in empty:
+                        empty.remove(action)
+                    if mover != player and empty:
+                        writer.write(f"MOVE {empty.pop()}\n".encode())
+                        sent = time.perf_counter()
+                elif words[0] in (b"END", b"LEFT"):
+                    break
+        writer.write(b"QUIT\n")
+        await writer.drain()
+    finally:
+        writer.close()
+    return moves
+
+
+async def run_load(host: str, port: int, connections: int, size: int, duration: float, seed: int):
+    """Runs one load test and returns its moves per second and latencies."""
+    latencies = []
+    rngs = [random.Random(seed + i) for i in range(connections)]
+    start = time.perf_counter()
+    deadline = start + duration
+    clients = [play_client(host, port, size, deadline, rng, latencies) for rng in rngs]
+    moves = sum(await asyncio.gather(*clients))
+    elapsed = time.perf_counter() - start
+    return moves / elapsed, np.array(latencies) * 1000
+
+
+async def main_async(args):
+    server = None
+    port = args.port
+    if port is None:
+        server = GameServer()
+        ready = asyncio.get_running_loop().create_future()
+        serving = asyncio.create_task(server.serve("127.0.0.1", 0, ready))
+        port = await ready
+
+    print(f"{'connections':>11} {'moves/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for connections in args.connections:
+        rate, latencies = await run_load(
+            args.host, port, connections, args.size, args.duration, args.seed
+        )
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (np.nan, np.nan)
+        print(f"{connections:>11} {rate:>9.0f} {p50:>8.2f} {p99:>8.2f}")
+
+    if server is not None:
+        # Memory of the sessions alone, each with a move played
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        sessions = [Session(i, args.size, None, None) for i in range(1000)]
+        for session in sessions:
+            session.game.make(0)
+        per_game = (tracemalloc.get_traced_memory()[0] - before) / len(sessions) / 1024
+        tracemalloc.stop()
+        print(f"Memory per {args.size}x{args.size} session: {per_game:.1f} KB")
+        serving.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--size", type=int, default=11)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per load test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="port of a running server (default: start one)")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
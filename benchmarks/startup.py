@@ -0,0 +1,88 @@
+"""Measures the cold start of the game, from launching Python to the first frame of the menu.
+
+Each command is started in a new process, in a pseudo terminal, and timed until the main menu is
+on the terminal. For reference, the same is measured with NumPy imported before the game starts,
+as it was when the game board was a NumPy array, and the bare interpreter and NumPy import are
+timed as well. Run it from the repository root:
+
+    poetry run python benchmarks/startup.py --runs 20
+"""
+import argparse
+import fcntl
+import os
+import select
+import statistics
+import struct
+import subprocess
+import sys
+import termios
+import time
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+GAME = os.path.join(SOURCE, "hexterm.py")
+MENU_TEXT = b"Quit"  # the last item of the main menu, drawn with the first frame
+RUN_GAME = (
+    f"import runpy, sys; sys.argv = [{GAME!r}]; runpy.run_path(sys.argv[0], run_name='__main__')"
+)
+COMMANDS = {
+    "interpreter": [sys.executable, "-c", "pass"],
+    "import numpy": [sys.executable, "-c", "import numpy"],
+    "game": [sys.executable, GAME],
+    "game + numpy": [sys.executable, "-c", "import numpy; " + RUN_GAME],
+}
+GAME_COMMANDS = {"game", "game + numpy"}
+
+
+def time_command(command: list) -> float:
+    """Runs a command to completion, and returns how long it took in seconds."""
+    env = dict(os.environ, PYTHONPATH=SOURCE)
+    start = time.perf_counter()
+    subprocess.run(command, env=env, check=True)
+    return time.perf_counter() - start
+
+
+def time_first_frame(command: list, lines: int = 40, columns: int = 120) -> float:
+    """Starts the game in a pseudo terminal, and returns the time until the menu is drawn."""
+    master, slave = os.openpty()
+    fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", lines, columns, 0, 0))
+    env = dict(os.environ, TERM="xterm-256color", PYTHONPATH=SOURCE)
+    start = time.perf_counter()
+    child = subprocess.Popen(command, stdin=slave, stdout=slave, stderr=slave, env=env)
+    os.close(slave)
+
+    output = b""
+    elapsed = None
+    while elapsed is None:
+        ready, _, _ = select.select([master], [], [], 1.0)
+        if not ready:
+            if child.poll() is not None:
+                break
+            continue
+        try:
+            output += os.read(master, 65536)
+        except OSError:  # the child exited and closed the terminal
+            break
+        if MENU_TEXT in output:
+            elapsed = time.perf_counter() - start
+    child.kill()
+    child.wait()
+    os.close(master)
+    if elapsed is None:
+        raise RuntimeError(f"The menu was never drawn: {output[-500:]!r}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="launches per command")
+    args = parser.parse_args()
+
+    print(f"{'command':>14} {'median ms':>10} {'min ms':>8}")
+    for name, command in COMMANDS.items():
+        measure = time_first_frame if name in GAME_COMMANDS else time_command
+        times = [measure(command) for _ in range(args.runs)]
+        print(f"{name:>14} {statistics.median(times) * 1000:>10.1f} {min(times) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
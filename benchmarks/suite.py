@@ -0,0 +1,290 @@
+"""Headless benchmarks of the engine and renderer hot paths, with machine-readable output.
+
+For every backend and board size (4 to 25 by default), measures:
+    - random playout games per second through `step`,
+    - p50/p99 latency of a single `step`,
+    - the cost of the win check, and of finding the winning path once a game is won,
+    - the bytes allocated per `step` and per copy of the info state,
+    - the time to draw the board on a fake curses window, fully and incrementally.
+
+Results are printed as JSON, or written to a file. A previous result file can be passed to
+--compare, which reports metrics that got worse by more than the tolerance and exits with status 1
+if there are any. Run it from the repository root:
+
+    poetry run python benchmarks/suite.py --output bench.json
+    poetry run python benchmarks/suite.py --compare bench.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from hexterm.bitboard import BitboardHexGame
+from hexterm.hex_game import HexGame
+from hexterm.hex_ui import HexUI
+from hexterm.py_game import PyHexGame
+
+BACKENDS = {
+    "array": HexGame,
+    "bitboard": BitboardHexGame,
+    "python": PyHexGame,
+}
+# Metrics where a larger value is better, all others are costs
+HIGHER_IS_BETTER = {"games_per_s"}
+CURSOR_KEYS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+class FakeWindow:
+    """Stands in for a curses window, counting the calls that would reach the terminal."""
+
+    def __init__(self, lines: int, columns: int):
+        self.lines = lines
+        self.columns = columns
+        self.writes = 0
+
+    def getmaxyx(self) -> tuple:
+        return self.lines, self.columns
+
+    def addstr(self, *args) -> None:
+        self.writes += 1
+
+    def erase(self) -> None:
+        pass
+
+
+class HeadlessUI(HexUI):
+    """HexUI without a terminal, colors are plain numbers."""
+
+    def init_colors(self):
+        self.color_player_1 = 1
+        self.color_player_2 = 2
+        self.color_win_path = 6
+        self.color_invalid = 3
+        self.color_neutral = 4
+        self.color_text = 5
+
+
+def random_games(size: int, num_games: int, seed: int) -> list:
+    """Returns the move orders of random games, shared by all backends."""
+    rng = random.Random(seed)
+    games = []
+    for _ in range(num_games):
+        moves = list(range(size * size))
+        rng.shuffle(moves)
+        games.append(moves)
+    return games
+
+
+def play(game: HexGame, moves: list) -> int:
+    """Plays a game through `step` until it is won, and returns the number of moves."""
+    game.reset()
+    for num_moves, action in enumerate(moves, 1):
+        if game.step(action)[2]:
+            return num_moves
+    raise RuntimeError("Game without a winner")
+
+
+def measure_playouts(game_class: type, size: int, games: list) -> dict:
+    """Measures the random playout throughput and the latency of single steps."""
+    game = game_class(size, size)
+    start = time.perf_counter()
+    for moves in games:
+        play(game, moves)
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    timer = time.perf_counter_ns
+    for moves in games:
+        game.reset()
+        for action in moves:
+            step_start = timer()
+            done = game.step(action)[2]
+            latencies.append(timer() - step_start)
+            if done:
+                break
+    p50, p99 = np.percentile(latencies, [50, 99]) / 1000
+    return {"games_per_s": len(games) / elapsed, "step_p50_us": p50, "step_p99_us": p99}
+
+
+def measure_win_check(game_class: type, size: int, games: list) -> dict:
+    """Measures the win check of unfinished positions, and the winning path of won ones."""
+    game = game_class(size, size)
+    check_time = path_time = 0.0
+    num_checks = 0
+    for moves in games:
+        play(game, moves)
+        winner = game.winner
+        start = time.perf_counter()
+        game.is_terminal(winner)
+        path_time += time.perf_counter() - start
+
+        # The position before the winning move, in the middle of the game for the win check
+        game.undo()
+        for player in (1, 2):
+            start = time.perf_counter()
+            game.is_terminal(player)
+            check_time += time.perf_counter() - start
+            num_checks += 1
+    return {
+        "win_check_us": check_time / num_checks * 1e6,
+        "win_path_us": path_time / len(games) * 1e6,
+    }
+
+
+def measure_allocations(game_class: type, size: int, games: list) -> dict:
+    """Measures the bytes allocated by `step`, and by a copy of the info state."""
+    game = game_class(size, size)
+    allocated = 0
+    num_steps = 0
+    tracemalloc.start()
+    try:
+        for moves in games:
+            game.reset()
+            for action in moves:
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                done = game.step(action)[2]
+                allocated += tracemalloc.get_traced_memory()[1] - before
+                num_steps += 1
+                if done:
+                    break
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        game.get_info_state(copy=True)
+        copy_bytes = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return {"step_alloc_bytes": allocated / num_steps, "info_state_copy_bytes": copy_bytes}
+
+
+def measure_rendering(game_class: type, size: int, num_frames: int, seed: int) -> dict:
+    """Measures drawing the board on a fake window, fully and after small changes."""
+    game = game_class(size, size)
+    ui = HeadlessUI(game)
+    window = FakeWindow(size + 10, 2 * ((size + 2) * 2 + size + 2) + 10)
+    rng = random.Random(seed)
+    empty = list(range(size * size))
+    rng.shuffle(empty)
+
+    # Full redraws of the half filled board
+    for action in empty[: size * size // 2]:
+        game.make(action)
+    start = time.perf_counter()
+    for _ in range(num_frames):
+        ui.invalidate_board()
+        ui.draw_board(window, 0, 0)
+    full = (time.perf_counter() - start) / num_frames
+
+    # The cursor walks over the board
+    row = col = size // 2
+    window.writes = 0
+    start = time.perf_counter()
+    for _ in range(num_frames):
+        d_row, d_col = rng.choice(CURSOR_KEYS)
+        row, col = min(max(row + d_row, 0), size - 1), min(max(col + d_col, 0), size - 1)
+        ui.draw_board(window, row, col)
+    incremental = (time.perf_counter() - start) / num_frames
+    return {
+        "render_full_us": full * 1e6,
+        "render_incremental_us": incremental * 1e6,
+        "render_incremental_writes": window.writes / num_frames,
+    }
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Returns the metrics that got worse than in a previous run by more than the tolerance."""
+    previous = {(entry["backend"], entry["size"]): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        old = previous.get((entry["backend"], entry["size"]))
+        if old is None:
+            continue
+        for metric, value in entry.items():
+            if metric in ("backend", "size") or not old.get(metric):
+                continue
+            change = value / old[metric] - 1
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > tolerance:
+                regressions.append(
+                    {
+                        "backend": entry["backend"],
+                        "size": entry["size"],
+                        "metric": metric,
+                        "old": old[metric],
+                        "new": value,
+                    }
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(range(4, 26)))
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["array"])
+    parser.add_argument("--games", type=int, default=100, help="random games per size")
+    parser.add_argument("--frames", type=int, default=200, help="rendered frames per size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this file instead of stdout")
+    parser.add_argument("--compare", help="a previous result file to check for regressions")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="relative change counted as a regression (default: 0.2)",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for backend in args.backends:
+        game_class = BACKENDS[backend]
+        for size in args.sizes:
+            games = random_games(size, args.games, args.seed)
+            entry = {"backend": backend, "size": size}
+            entry.update(measure_playouts(game_class, size, games))
+            entry.update(measure_win_check(game_class, size, games))
+            entry.update(measure_allocations(game_class, size, games[:10]))
+            entry.update(measure_rendering(game_class, size, args.frames, args.seed))
+            results.append(entry)
+            print(f"{backend} {size}x{size} done", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "games": args.games,
+            "frames": args.frames,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            report["regressions"] = compare(results, json.load(baseline_file), args.tolerance)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if report.get("regressions"):
+        for regression in report["regressions"]:
+            print(
+                "Regression: {backend} {size}x{size} {metric} {old:.4g} -> {new:.4g}".format(
+                    **regression
+                ),
+                file=sys.stderr,
+            )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Measures how many entries symmetry saves, and the cost of canonical hashes.
+
+Enumerates every position of the first moves of a game and counts the different ones by their
+hash and by their canonical hash, which is what a cache or a book keyed by either would hold.
+Only the 180 degree turn merges positions reached from the empty board, see `symmetries`.
+Then times `canonical_hashes` on a batch of boards from random games, against
+`HexGame.canonical_hash` while playing them. Run it from the repository root:
+
+    poetry run python benchmarks/symmetry.py --sizes 5 7 9 4x6
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from hexterm.hex_game import HexGame
+from hexterm.symmetry import canonical_hashes
+
+
+def board_size(text: str) -> tuple:
+    """Parses a board size, either N or ROWSxCOLS."""
+    rows, _, cols = text.partition("x")
+    return int(rows), int(cols or rows)
+
+
+def count_positions(game: HexGame, depth: int) -> tuple:
+    """Returns the number of different positions up to depth moves, by hash and canonical hash."""
+    hashes, canonical = set(), set()
+
+    def visit(remaining: int) -> None:
+        if game.hash in hashes:
+            return
+        hashes.add(game.hash)
+        canonical.add(game.canonical_hash())
+        if remaining and not game.done:
+            for action in game.legal_actions():
+                game.make(action)
+                visit(remaining - 1)
+                game.undo()
+
+    visit(depth)
+    return len(hashes), len(canonical)
+
+
+def random_boards(num_rows: int, num_cols: int, num_boards: int, seed: int) -> np.ndarray:
+    """Returns the boards of positions from random games that are not over."""
+    rng = random.Random(seed)
+    game = HexGame(num_rows, num_cols)
+    boards = []
+    while len(boards) < num_boards:
+        game.reset()
+        while not game.make(game.random_legal_action(rng)):
+            boards.append(np.array(game.board))
+    return np.stack(boards[:num_boards])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=board_size, nargs="+", default=[(5, 5), (7, 7), (4, 6)])
+    parser.add_argument("--depth", type=int, default=3, help="moves of the enumerated positions")
+    parser.add_argument("--boards", type=int, default=10000, help="boards per hashed batch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>6} {'positions':>10} {'classes':>8} {'saved':>6} "
+        f"{'batch us/board':>15} {'game us/board':>14}"
+    )
+    for num_rows, num_cols in args.sizes:
+        positions, classes = count_positions(HexGame(num_rows, num_cols), args.depth)
+        boards = random_boards(num_rows, num_cols, args.boards, args.seed)
+        start = time.perf_counter()
+        canonical_hashes(boards, num_rows, num_cols)
+        batch = (time.perf_counter() - start) / len(boards)
+
+        game = HexGame(num_rows, num_cols)
+        rng = random.Random(args.seed)
+        num_hashes = 0
+        start = time.perf_counter()
+        while num_hashes < args.boards:
+            game.reset()
+            while not game.make(game.random_legal_action(rng)):
+                game.canonical_hash()
+                num_hashes += 1
+        per_game = (time.perf_counter() - start) / num_hashes
+        print(
+            f"{num_rows}x{num_cols:<4} {positions:>10} {classes:>8} {positions / classes:>5.1f}x "
+            f"{batch * 1e6:>15.2f} {per_game * 1e6:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Measures how the tournament runner scales with the number of worker processes.
+
+For each worker count, plays the same round robin between MCTS players with fixed playouts and
+reports the games per second and the speedup over a single worker. Run it from the repository
+root:
+
+    poetry run python benchmarks/tournament.py --size 7 --workers 1 2 4 8 16 32
+"""
+import argparse
+import os
+import time
+
+from hexterm.tournament import PlayerConfig, play_tournament
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=7)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    parser.add_argument("--games", type=int, default=16, help="games per pair")
+    parser.add_argument(
+        "--players", nargs="+", default=["random", "mcts:playouts=100", "mcts:playouts=300"]
+    )
+    args = parser.parse_args()
+
+    cpus = os.cpu_count()
+    workers = args.workers or sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1)))
+    configs = [PlayerConfig.parse(spec) for spec in args.players]
+
+    print(f"{'workers':>7} {'games/s':>8} {'speedup':>8}")
+    baseline = None
+    for num_workers in workers:
+        start = time.perf_counter()
+        num_games = sum(
+            1
+            for _ in play_tournament(
+                configs, args.size, args.size, args.games, num_workers=num_workers
+            )
+        )
+        rate = num_games / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{num_workers:>7} {rate:>8.2f} {rate / baseline:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
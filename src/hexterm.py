@@ -1,14 +1,70 @@
+import argparse
 import curses
 
-from hexterm.hex_game import HexGame
+from hexterm.client import NetworkOpponent
+from hexterm.game_states import Gameplay, ReplayState, WinEffect
 from hexterm.hex_ui import HexUI
+from hexterm.profiler import Profiler
+from hexterm.py_game import PyHexGame
+from hexterm.replay import Replay
 
 
-def main(stdscr):
-    game = HexGame()
-    ui = HexUI(game)
+def main(stdscr, args, opponent=None):
+    if opponent is not None:
+        game = PyHexGame(opponent.size, opponent.size)
+    elif args.load or args.replay:
+        from hexterm.records import load_game
+
+        game = load_game(args.load or args.replay, PyHexGame)
+    else:
+        game = PyHexGame()
+    profiler = Profiler(args.trace) if args.trace else None
+    ui = HexUI(
+        game, ai_workers=args.ai_workers, save_path=args.load or "hexterm.save", profiler=profiler
+    )
+    if opponent is not None:
+        ui.ai = opponent
+        ui.ai_player = opponent.opponent
+        ui.current_state = Gameplay(ui)
+    elif args.replay:
+        ui.current_state = ReplayState(ui, Replay.from_game(game))
+    elif args.load:
+        # Resume the saved game as a two player game
+        if game.done:
+            ui.current_state = WinEffect(ui, game.is_terminal(game.winner)[1], game.winner)
+        else:
+            ui.current_state = Gameplay(ui)
     ui.run(stdscr)
 
 
 if __name__ == "__main__":
-    curses.wrapper(main)
+    parser = argparse.ArgumentParser(description="Hex Board Game on Terminal")
+    parser.add_argument(
+        "--ai-workers",
+        type=int,
+        default=1,
+        help="number of processes the AI searches with (default: 1)",
+    )
+    parser.add_argument("--load", help="resume a game saved with 's', saving back to the same file")
+    parser.add_argument("--replay", metavar="FILE", help="replay a game saved with 's'")
+    parser.add_argument(
+        "--connect",
+        metavar="HOST:PORT",
+        help="play a network game on a server started with `python -m hexterm.server`",
+    )
+    parser.add_argument(
+        "--size", type=int, default=11, help="board size of network games (default: 11)"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="write the time of every frame, input, move and AI search to a JSONL file",
+    )
+    args = parser.parse_args()
+
+    opponent = None
+    if args.connect:
+        host, _, port = args.connect.rpartition(":")
+        print("Waiting for an opponent...")
+        opponent = NetworkOpponent(host or "127.0.0.1", int(port), args.size)
+    curses.wrapper(main, args, opponent)
@@ -0,0 +1,177 @@
+from functools import lru_cache
+from typing import Tuple
+
+from hexterm.hex_game import STATE_PLAYERS, HexGame
+
+
+@lru_cache(maxsize=None)
+def bitboard_layout(num_rows: int, num_cols: int) -> Tuple[Tuple[int, ...], dict, dict]:
+    """Returns the bitboard layout of a board of the given size.
+
+    Cell (row, col) is stored in bit `row * (num_cols + 1) + col`. The extra column of each row is
+    always empty, so shifting a bitboard towards a neighbor never wraps a stone onto the other side
+    of the board: it lands in the guard column and is masked away.
+
+    Args:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+
+    Returns:
+        tuple: The bit of each action index, and for each player the masks of their starting and
+            target edges.
+    """
+    width = num_cols + 1
+    bits = tuple(1 << (row * width + col) for row in range(num_rows) for col in range(num_cols))
+    top = sum(1 << col for col in range(num_cols))
+    left = sum(1 << (row * width) for row in range(num_rows))
+    start_edges = {STATE_PLAYERS[1]: top, STATE_PLAYERS[2]: left}
+    target_edges = {
+        STATE_PLAYERS[1]: top << (max(num_rows - 1, 0) * width),
+        STATE_PLAYERS[2]: left << max(num_cols - 1, 0),
+    }
+    return bits, start_edges, target_edges
+
+
+class BitboardHexGame(HexGame):
+    """HexGame with the stones of each player stored as a Python int bitboard.
+
+    Emptiness checks are a single bit test. For connectivity each player keeps a bitboard of the
+    stones connected to their starting edge, grown with a shift-and-mask flood fill using the six
+    hex neighbor offsets (-1, +1, -W, +W, -W + 1 and +W - 1, where W is the row width in bits)
+    whenever a new stone touches it. The player has won once it reaches the target edge.
+
+    The `board` array is still kept up to date, one element per move, so the info states and the UI
+    work as with HexGame.
+    """
+
+    def is_cell_empty(self, index: int) -> bool:
+        """Checks if the cell index is empty.
+
+        Args:
+            cell (int): The cell to check.
+
+        Returns:
+            bool: True if the cell is empty, False otherwise.
+        """
+        return not self._occupied & self._bits[index]
+
+    def is_valid(self, action: int) -> bool:
+        """Checks if the action is a valid move.
+
+        Args:
+            action (int): The action to take.
+
+        Returns:
+            bool: True if the move is valid, False otherwise.
+        """
+        return len(self._bits) > action >= 0 and not self._occupied & self._bits[action]
+
+    def _reset_connectivity(self) -> None:
+        """Resets the bitboards of both players."""
+        self._bits, self._start_edges, self._target_edges = bitboard_layout(
+            self.num_rows, self.num_cols
+        )
+        self._width = self.num_cols + 1
+        self._occupied = 0
+        self._stones = {STATE_PLAYERS[1]: 0, STATE_PLAYERS[2]: 0}
+        self._reached = {STATE_PLAYERS[1]: 0, STATE_PLAYERS[2]: 0}
+
+    def _connectivity_checkpoint(self) -> tuple:
+        """Returns a token that `_restore_connectivity` can roll the bitboards back to."""
+        return (
+            self._occupied,
+            self._stones[STATE_PLAYERS[1]],
+            self._stones[STATE_PLAYERS[2]],
+            self._reached[STATE_PLAYERS[1]],
+            self._reached[STATE_PLAYERS[2]],
+        )
+
+    def _restore_connectivity(self, checkpoint: tuple) -> None:
+        """Rolls the bitboards back to a checkpoint.
+
+        Args:
+            checkpoint (tuple): A token returned by `_connectivity_checkpoint`.
+        """
+        self._occupied, stones_1, stones_2, reached_1, reached_2 = checkpoint
+        self._stones = {STATE_PLAYERS[1]: stones_1, STATE_PLAYERS[2]: stones_2}
+        self._reached = {STATE_PLAYERS[1]: reached_1, STATE_PLAYERS[2]: reached_2}
+
+    def _connect(self, action: int, player: int) -> None:
+        """Adds a newly placed stone to the player's bitboards.
+
+        Args:
+            action (int): The action index of the stone.
+            player (int): The player who placed the stone.
+        """
+        bit = self._bits[action]
+        self._occupied |= bit
+        stones = self._stones[player] = self._stones[player] | bit
+        reached = self._reached[player]
+        if not (bit & self._start_edges[player] or self._grow(reached) & bit):
+            return
+
+        # Flood fill from the new stone, which may join groups that were not reached before
+        reached |= bit
+        while True:
+            grown = self._grow(reached) & stones
+            if grown == reached:
+                break
+            reached = grown
+        self._reached[player] = reached
+
+    def _grow(self, cells: int) -> int:
+        """Returns the cells together with all of their neighbors, including guard bits.
+
+        Args:
+            cells (int): The bitboard to grow.
+
+        Returns:
+            int: The grown bitboard.
+        """
+        width = self._width
+        return (
+            cells
+            | cells << 1
+            | cells >> 1
+            | cells << width
+            | cells >> width
+            | cells << (width - 1)
+            | cells >> (width - 1)
+        )
+
+    def is_connected(self, player: int) -> bool:
+        """Checks if the player has connected their two edges of the board.
+
+        Args:
+            player (int): The player. Must be one of the STATE_PLAYERS values.
+
+        Returns:
+            bool: True if the player's edges are connected, False otherwise.
+        """
+        return bool(self._reached[player] & self._target_edges[player])
+
+    def winning_moves(self, player: int) -> list:
+        """Returns the empty cells where a stone would connect the player's two edges.
+
+        A cell wins if it touches both the stones connected to the starting edge and the stones
+        connected to the target edge, counting the edges themselves.
+
+        Args:
+            player (int): The player. Must be one of the STATE_PLAYERS values.
+
+        Returns:
+            list: The winning action indices.
+        """
+        stones = self._stones[player]
+        target = self._target_edges[player]
+        reached_target = stones & target
+        while True:
+            grown = self._grow(reached_target) & stones
+            if grown == reached_target:
+                break
+            reached_target = grown
+        wins = (self._grow(self._reached[player]) | self._start_edges[player]) & (
+            self._grow(reached_target) | target
+        )
+        wins &= ~self._occupied
+        return [action for action, bit in enumerate(self._bits) if wins & bit]
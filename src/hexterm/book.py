@@ -0,0 +1,165 @@
+import os
+import struct
+
+import numpy as np
+
+from hexterm.hex_game import HexGame, symmetries
+
+# Results stored in a book, for the player to move
+WIN = 1
+LOSS = -1
+UNPROVEN = 0  # the move comes from a search, not from a proof
+
+BOOK_MAGIC = b"HXBK"
+BOOK_VERSION = 2  # keyed by canonical hash since version 2
+# Magic, version, rows, columns and number of entries
+BOOK_HEADER = struct.Struct("<4sBBBxI")
+BOOK_ENTRY = np.dtype([("key", "<u8"), ("move", "<i2"), ("result", "i1")])
+
+BOOKS_DIR = os.path.join(os.path.dirname(__file__), "books")
+
+
+def default_book_path(num_rows: int, num_cols: int) -> str:
+    """Returns the path of the book shipped with hexterm for a board size."""
+    return os.path.join(BOOKS_DIR, f"hex_{num_rows}x{num_cols}.book")
+
+
+def write_book(path: str, num_rows: int, num_cols: int, entries: list) -> None:
+    """Writes an opening book.
+
+    The file is a fixed header followed by packed (key, move, result) entries sorted by key, so a
+    memory map of it can be binary searched directly. Positions are stored once per equivalence
+    class: the key is the canonical hash and the move is a move of the canonical form.
+
+    Args:
+        path (str): The path of the book.
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        entries (list): (canonical hash, result, best move of the canonical form) tuples.
+    """
+    records = np.zeros(len(entries), dtype=BOOK_ENTRY)
+    for i, (key, result, move) in enumerate(entries):
+        records[i] = (key, move, result)
+    records.sort(order="key")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as book_file:
+        header = BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, num_rows, num_cols, len(entries))
+        book_file.write(header)
+        book_file.write(records.tobytes())
+
+
+class OpeningBook:
+    """Read-only opening book, memory mapped from disk.
+
+    Nothing is parsed at load time apart from the header. A lookup is a binary search over the
+    sorted keys of the map, which only touches the pages it needs. The book holds the canonical form
+    of each position, so a position is looked up by its canonical hash and the move found is mapped
+    back from the canonical form through the same symmetry.
+
+    Attributes:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        entries (np.memmap): The (key, move, result) entries, sorted by key.
+
+    Methods:
+        lookup: Returns the result and the best move stored for a key.
+        probe: Returns the result and the best move of a game's position.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as book_file:
+            magic, version, self.num_rows, self.num_cols, count = BOOK_HEADER.unpack(
+                book_file.read(BOOK_HEADER.size)
+            )
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            raise ValueError(f"{path} is not a hexterm opening book")
+        if count:
+            self.entries = np.memmap(
+                path, dtype=BOOK_ENTRY, mode="r", offset=BOOK_HEADER.size, shape=(count,)
+            )
+        else:
+            self.entries = np.zeros(0, dtype=BOOK_ENTRY)
+        self._keys = self.entries["key"]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, key: int):
+        """Returns the result and the best move stored for a key.
+
+        Args:
+            key (int): The canonical hash of the position.
+
+        Returns:
+            tuple: The result (WIN, LOSS or UNPROVEN) for the player to move and the best move, or
+                None if the position is not in the book.
+        """
+        key = np.uint64(key)
+        index = int(np.searchsorted(self._keys, key))
+        if index == len(self._keys) or self._keys[index] != key:
+            return None
+        entry = self.entries[index]
+        return int(entry["result"]), int(entry["move"])
+
+    def probe(self, game: HexGame):
+        """Returns the result and the best move of a game's position.
+
+        Args:
+            game (HexGame): The game. It is not modified.
+
+        Returns:
+            tuple: The result (WIN, LOSS or UNPROVEN) for the player to move and the best move of
+                the position, or None if the position is not in the book.
+        """
+        entry = self.lookup(game.canonical_hash())
+        if entry is None:
+            return None
+        result, move = entry
+        mapping, _ = symmetries(game.num_rows, game.num_cols)[game.canonical_symmetry()]
+        return result, mapping[move]
+
+
+class BookPlayer:
+    """Plays the book move when there is one, and asks another player otherwise.
+
+    Lost positions are left to the other player, since the book has no good move for them.
+
+    Attributes:
+        book (OpeningBook): The opening book.
+        fallback: The player used outside of the book, e.g. an MCTS.
+    """
+
+    def __init__(self, book: OpeningBook, fallback):
+        self.book = book
+        self.fallback = fallback
+
+    @classmethod
+    def with_default_book(cls, num_rows: int, num_cols: int, fallback):
+        """Wraps a player with the shipped book of the board size, if there is one.
+
+        Returns:
+            The wrapped player, or the fallback itself if there is no book for the size.
+        """
+        path = default_book_path(num_rows, num_cols)
+        if not os.path.exists(path):
+            return fallback
+        return cls(OpeningBook(path), fallback)
+
+    def select_action(self, game: HexGame) -> int:
+        """Returns the book move of the position, or the move of the fallback player.
+
+        Args:
+            game (HexGame): The game to play a move in. It is not modified.
+
+        Returns:
+            int: The action to take.
+        """
+        entry = self.book.probe(game)
+        if entry is not None and entry[0] != LOSS and game.is_valid(entry[1]):
+            return entry[1]
+        return self.fallback.select_action(game)
+
+    def close(self) -> None:
+        """Releases the resources of the fallback player."""
+        self.fallback.close()
@@ -0,0 +1,220 @@
+from hexterm.hex_game import STATE_EMPTY, STATE_PLAYERS, HexGame
+from hexterm.layout import board_layout
+
+CELL_FILLED = "⬢"
+CELL_EMPTY = "⬡"
+# SGR parameters of what is drawn, in the colors of HexUI
+STYLE_PLAYERS = {STATE_PLAYERS[1]: "34", STATE_PLAYERS[2]: "31"}
+STYLE_LAST_MOVE = {STATE_PLAYERS[1]: "1;34", STATE_PLAYERS[2]: "1;31"}  # bold
+STYLE_EMPTY = "37"
+STYLE_WIN_PATH = "33"
+STYLE_TEXT = "38;5;247"
+MAX_GAP_SPACES = 3  # blank columns crossed by writing spaces, as moving over them costs more
+MAX_VIEWER_BUFFER = 1 << 16  # bytes queued for a viewer before it is skipped until it catches up
+
+
+class AnsiRenderer:
+    """Renders a game as ANSI escape sequences, for terminals that aren't driven by curses.
+
+    The board is laid out like `HexUI.draw_board` lays it out, on a screen just large enough for
+    the whole board, with a status line above it. A frame is what the screen shows: the character
+    and the style of every position that isn't blank. Rendering a game compares its frame with the
+    previous one and encodes only the positions that changed, sorted by line and column, so a move
+    usually costs a few cursor movements and stones. Blank runs on a line are crossed with spaces
+    or a relative cursor movement, whichever is shorter, and colors are only set when they change.
+
+    Every diff starts with an absolute cursor position and its first color, and ends with the
+    colors reset, so it doesn't depend on what the terminal was doing before it. The same bytes are
+    right for every viewer that shows the previous frame, wherever its cursor was left.
+
+    Attributes:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        height (int): The number of lines of the frame.
+        width (int): The number of columns of the board in the frame.
+
+    Methods:
+        render: Returns the diff from the previous frame to the frame of a game.
+        keyframe: Returns the current frame drawn on a cleared screen.
+        footer: Returns what leaves the screen usable once the broadcast ends.
+    """
+
+    def __init__(self, num_rows: int, num_cols: int):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        # The smallest screen where viewport_size fits the whole board
+        self.height = num_rows + 7
+        self.width = 2 * num_cols + num_rows + 4
+        self._cells, borders = board_layout(num_rows, num_cols, self.height, self.width)
+        self._borders = {(y, x): (CELL_FILLED, STYLE_PLAYERS[player]) for y, x, player in borders}
+        self._frame = dict(self._borders)
+        self._keyframe = None  # the encoded keyframe of the current frame, once asked for
+
+    def _status(self, game: HexGame) -> str:
+        """Returns the status line of a game."""
+        if game.done:
+            return f"Player {game.winner} wins in {game.num_moves} moves."
+        return f"Move {game.num_moves + 1}. Player {game.current_player}'s turn."
+
+    def _frame_of(self, game: HexGame) -> dict:
+        """Returns the (character, style) of every position that isn't blank on a game's screen."""
+        frame = dict(self._borders)
+        board = game.board.tolist()
+        last_move = int(game.history_vector()[-1]) if game.num_moves else -1
+        win_cells = {game.row_col_to_action_index(*cell) for cell in game.win_path()}
+        for cell, (state, position) in enumerate(zip(board, self._cells)):
+            if cell in win_cells:
+                frame[position] = (CELL_FILLED, STYLE_WIN_PATH)
+            elif state == STATE_EMPTY:
+                frame[position] = (CELL_EMPTY, STYLE_EMPTY)
+            elif cell == last_move:
+                frame[position] = (CELL_FILLED, STYLE_LAST_MOVE[state])
+            else:
+                frame[position] = (CELL_FILLED, STYLE_PLAYERS[state])
+        for x, character in enumerate(self._status(game)):
+            if character != " ":
+                frame[(0, x)] = (character, STYLE_TEXT)
+        return frame
+
+    def _encode(self, changes: dict, frame: dict) -> bytes:
+        """Encodes the changed positions of a frame.
+
+        Args:
+            changes (dict): The (character, style) of every changed position, style None for the
+                positions that became blank.
+            frame (dict): The whole frame, to know which positions between two changes are blank.
+
+        Returns:
+            bytes: The escape sequences and characters, UTF-8 encoded.
+        """
+        parts = []
+        cursor = None
+        style = None
+        for (y, x), (character, character_style) in sorted(changes.items()):
+            if cursor is None or cursor[0] != y or cursor[1] > x:
+                parts.append(f"\x1b[{y + 1};{x + 1}H")
+            elif cursor[1] < x:
+                gap = x - cursor[1]
+                blank = all((y, col) not in frame for col in range(cursor[1], x))
+                if gap <= MAX_GAP_SPACES and blank:
+                    parts.append(" " * gap)
+                else:
+                    parts.append(f"\x1b[{gap}C" if gap > 1 else "\x1b[C")
+            if character_style is not None and character_style != style:
+                parts.append(f"\x1b[{character_style}m")
+                style = character_style
+            parts.append(character)
+            cursor = (y, x + 1)
+        if parts:
+            parts.append("\x1b[0m")
+        return "".join(parts).encode()
+
+    def render(self, game: HexGame) -> bytes:
+        """Returns the diff from the previous frame to the frame of a game.
+
+        Args:
+            game (HexGame): The game, of the renderer's size.
+
+        Returns:
+            bytes: What turns the previous frame into the new one, empty if nothing changed.
+        """
+        frame = self._frame_of(game)
+        changes = {
+            position: drawn
+            for position, drawn in frame.items()
+            if self._frame.get(position) != drawn
+        }
+        changes.update({position: (" ", None) for position in self._frame.keys() - frame.keys()})
+        self._frame = frame
+        if changes:
+            self._keyframe = None
+        return self._encode(changes, frame)
+
+    def keyframe(self) -> bytes:
+        """Returns the current frame drawn on a cleared screen, with the cursor hidden.
+
+        Returns:
+            bytes: What a new viewer is sent before the diffs of the next moves.
+        """
+        if self._keyframe is None:
+            self._keyframe = b"\x1b[?25l\x1b[H\x1b[2J" + self._encode(self._frame, self._frame)
+        return self._keyframe
+
+    def footer(self) -> bytes:
+        """Returns what moves the cursor below the frame and shows it, once the broadcast ends."""
+        return f"\x1b[{self.height + 1};1H\x1b[?25h".encode()
+
+
+class Broadcaster:
+    """Sends a live game to many viewers, as the diffs of an AnsiRenderer.
+
+    Each move is rendered and encoded once, and the same bytes are written to every viewer, so the
+    cost of a move is one render plus one buffered write per viewer. Nothing is rendered for a
+    viewer alone but the keyframe it is sent when it joins, which is shared by all the viewers
+    joining between two moves.
+
+    A viewer whose connection can't keep up is not sent more diffs while more than
+    MAX_VIEWER_BUFFER bytes are queued for it. Once it has caught up it is sent a keyframe, which
+    brings it back to the current frame, so a slow viewer never makes the server hold more than a
+    bounded backlog for it.
+
+    Attributes:
+        game (HexGame): The game being watched.
+        renderer (AnsiRenderer): The renderer of the game.
+
+    Methods:
+        add: Starts sending the game to a viewer.
+        remove: Stops sending the game to a viewer.
+        publish: Sends the changes of the game since the last publish to every viewer.
+        close: Ends the broadcast and closes the viewers' connections.
+    """
+
+    def __init__(self, game: HexGame):
+        self.game = game
+        self.renderer = AnsiRenderer(game.num_rows, game.num_cols)
+        self.renderer.render(game)
+        self._viewers = {}  # the stream writer of every viewer, and whether it is behind
+
+    def __len__(self) -> int:
+        return len(self._viewers)
+
+    def add(self, writer) -> None:
+        """Starts sending the game to a viewer, with the keyframe of the current position.
+
+        Args:
+            writer (asyncio.StreamWriter): The viewer's output.
+        """
+        writer.write(self.renderer.keyframe())
+        self._viewers[writer] = False
+
+    def remove(self, writer) -> None:
+        """Stops sending the game to a viewer."""
+        self._viewers.pop(writer, None)
+
+    def publish(self) -> int:
+        """Sends the changes of the game since the last publish to every viewer.
+
+        Returns:
+            int: The size of the diff in bytes, the same for every viewer that is not behind.
+        """
+        diff = self.renderer.render(self.game)
+        if not diff:
+            return 0
+        for writer, behind in self._viewers.items():
+            if writer.transport.get_write_buffer_size() > MAX_VIEWER_BUFFER:
+                self._viewers[writer] = True
+            elif behind:
+                writer.write(self.renderer.keyframe())
+                self._viewers[writer] = False
+            else:
+                writer.write(diff)
+        return len(diff)
+
+    def close(self) -> None:
+        """Sends the last changes and ends the broadcast, closing the viewers' connections."""
+        self.publish()
+        footer = self.renderer.footer()
+        for writer in self._viewers:
+            writer.write(footer)
+            writer.close()
+        self._viewers.clear()
@@ -0,0 +1,104 @@
+import socket
+
+from hexterm.hex_game import HexGame
+
+DEFAULT_PORT = 7878  # of `hexterm.server`, which isn't imported to keep asyncio out of the game
+
+
+class NetworkOpponent:
+    """The opponent of a network game, played by another client of a `hexterm.server`.
+
+    It stands in for the AI: the game state asks it for the opponent's moves with `select_action`,
+    and sends it the local player's moves with `send_move`. The server referees the game, this
+    client only relays moves.
+
+    Attributes:
+        game_id (int): The id of the game on the server.
+        size (int): The size of the board.
+        player (int): The player of this client, 1 or 2.
+        opponent (int): The player of the opponent.
+
+    Methods:
+        send_move: Sends a move of the local player.
+        select_action: Waits for the opponent's move.
+        close: Leaves the game.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, size: int = 11):
+        """Connects to a server and waits until it pairs this client with an opponent.
+
+        Args:
+            host (str, optional): The address of the server. Defaults to 127.0.0.1.
+            port (int, optional): The port of the server. Defaults to DEFAULT_PORT.
+            size (int, optional): The size of the board. Defaults to 11.
+
+        Raises:
+            ConnectionError: If the server refuses the game or closes the connection.
+        """
+        self._socket = socket.create_connection((host, port))
+        self._lines = self._socket.makefile("r", encoding="ascii", newline="\n")
+        self._send(f"PLAY {size}")
+        while True:
+            words = self._read()
+            if words[0] == "START":
+                break
+        self.game_id, self.size, self.player = int(words[1]), int(words[2]), int(words[3])
+        self.opponent = 3 - self.player
+
+    def _send(self, line: str) -> None:
+        self._socket.sendall(line.encode("ascii") + b"\n")
+
+    def _read(self) -> list:
+        """Returns the words of the next line from the server, other than WAIT."""
+        while True:
+            line = self._lines.readline()
+            if not line:
+                raise ConnectionError("The server closed the connection")
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == "ERROR":
+                raise ConnectionError(f"The server refused: {line.strip()}")
+            if words[0] != "WAIT":
+                return words
+
+    def send_move(self, action: int) -> None:
+        """Sends a move of the local player, already played on the local game."""
+        self._send(f"MOVE {action}")
+
+    def select_action(self, game: HexGame):
+        """Waits for the opponent's next move.
+
+        It may be called on another thread than `close`, which ends the wait.
+
+        Args:
+            game (HexGame): The local game, with the opponent to move.
+
+        Returns:
+            int: The opponent's move, or None if they left the game, the connection was lost or
+                the client was closed.
+        """
+        while True:
+            try:
+                words = self._read()
+            except (OSError, ValueError):
+                # ValueError if close() closed the file between two reads
+                return None
+            if words[0] == "LEFT":
+                return None
+            if words[0] == "MOVE" and int(words[1]) == self.opponent:
+                return int(words[2])
+
+    def close(self) -> None:
+        """Leaves the game.
+
+        The connection is shut down before it is closed, so a `select_action` waiting for a move on
+        another thread returns right away.
+        """
+        try:
+            self._send("QUIT")
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._lines.close()
+        self._socket.close()
@@ -0,0 +1,256 @@
+import multiprocessing
+from typing import Iterable, Iterator, NamedTuple
+
+import numpy as np
+
+from hexterm.hex_game import STATE_EMPTY, STATE_PLAYERS
+from hexterm.records import GameArchive, GameRecord
+
+CHUNK_SAMPLES = 4096  # samples per message from a worker process
+QUEUE_CHUNKS = 2  # chunks a worker may get ahead of the consumer
+
+
+class SampleBatch(NamedTuple):
+    """Training samples, one row per position.
+
+    Attributes:
+        boards (np.ndarray): The boards before the move, as in HexGame.board. Shape (n, cells).
+        legal_masks (np.ndarray): Whether each cell is empty. Shape (n, cells).
+        actions (np.ndarray): The move played in the position. Shape (n,).
+        outcomes (np.ndarray): 1 if the player to move won the game, -1 if they lost, 0 if the game
+            is not over. Shape (n,).
+    """
+
+    boards: np.ndarray
+    legal_masks: np.ndarray
+    actions: np.ndarray
+    outcomes: np.ndarray
+
+
+def _empty_batch(num_samples: int, num_cells: int) -> SampleBatch:
+    """Returns an uninitialized batch."""
+    return SampleBatch(
+        np.empty((num_samples, num_cells), dtype=np.int8),
+        np.empty((num_samples, num_cells), dtype=bool),
+        np.empty(num_samples, dtype=np.int16),
+        np.empty(num_samples, dtype=np.int8),
+    )
+
+
+def record_samples(record: GameRecord) -> SampleBatch:
+    """Returns a sample for every position of a game, without replaying it.
+
+    A cell is filled in position t if it was played before move t, so all the boards are one
+    comparison between the move number of each cell and the position numbers.
+
+    Args:
+        record (GameRecord): The game.
+
+    Returns:
+        SampleBatch: One sample per move, in the order they were played.
+    """
+    num_cells = record.num_rows * record.num_cols
+    moves = np.asarray(record.moves, dtype=np.int64)
+    num_moves = len(moves)
+    positions = np.arange(num_moves)
+
+    # The move number that filled each cell, and the stone on it in the end
+    filled_at = np.full(num_cells, num_moves)
+    filled_at[moves] = positions
+    stones = np.full(num_cells, STATE_EMPTY, dtype=np.int8)
+    stones[moves[0::2]] = STATE_PLAYERS[1]
+    stones[moves[1::2]] = STATE_PLAYERS[2]
+
+    filled = filled_at[None, :] < positions[:, None]
+    players = np.where(positions % 2 == 0, STATE_PLAYERS[1], STATE_PLAYERS[2])
+    if record.winner:
+        outcomes = np.where(players == record.winner, 1, -1).astype(np.int8)
+    else:
+        outcomes = np.zeros(num_moves, dtype=np.int8)
+    return SampleBatch(
+        np.where(filled, stones, STATE_EMPTY).astype(np.int8),
+        ~filled,
+        moves.astype(np.int16),
+        outcomes,
+    )
+
+
+def _concatenate(batches: list) -> SampleBatch:
+    return SampleBatch(*(np.concatenate(arrays) for arrays in zip(*batches)))
+
+
+def _record_chunks(path: str, start: int, stop: int, chunk_samples: int) -> Iterator[SampleBatch]:
+    """Yields the samples of a range of games, grouped into chunks of about chunk_samples."""
+    archive = GameArchive(path, readonly=True)
+    try:
+        pending = []
+        num_pending = 0
+        size = None
+        for game_id in range(start, stop):
+            record = archive.record(game_id)
+            if size is None:
+                size = (record.num_rows, record.num_cols)
+            elif (record.num_rows, record.num_cols) != size:
+                raise ValueError(f"Game {game_id} of {path} is not {size[0]}x{size[1]}")
+            samples = record_samples(record)
+            pending.append(samples)
+            num_pending += len(samples.actions)
+            if num_pending >= chunk_samples:
+                yield _concatenate(pending)
+                pending = []
+                num_pending = 0
+        if pending:
+            yield _concatenate(pending)
+    finally:
+        archive.close()
+
+
+def _chunk_worker(queue, path: str, start: int, stop: int, chunk_samples: int) -> None:
+    """Sends the sample chunks of a range of games to the main process, then None."""
+    try:
+        for chunk in _record_chunks(path, start, stop, chunk_samples):
+            queue.put(chunk)
+        queue.put(None)
+    except Exception as error:
+        queue.put(error)
+
+
+def _parallel_chunks(path: str, start: int, stop: int, num_workers: int) -> Iterator[SampleBatch]:
+    """Yields the sample chunks of a range of games, converted by worker processes.
+
+    Each worker converts a contiguous share of the games. Their chunks are read in turn, so the
+    order only depends on the number of workers, and the small queues keep the workers from
+    getting ahead of the consumer.
+    """
+    bounds = np.linspace(start, stop, num_workers + 1).astype(int)
+    queues = []
+    workers = []
+    for worker_start, worker_stop in zip(bounds[:-1], bounds[1:]):
+        queue = multiprocessing.Queue(maxsize=QUEUE_CHUNKS)
+        worker = multiprocessing.Process(
+            target=_chunk_worker,
+            args=(queue, path, int(worker_start), int(worker_stop), CHUNK_SAMPLES),
+            daemon=True,
+        )
+        worker.start()
+        queues.append(queue)
+        workers.append(worker)
+    try:
+        active = list(queues)
+        while active:
+            for queue in list(active):
+                chunk = queue.get()
+                if chunk is None:
+                    active.remove(queue)
+                elif isinstance(chunk, Exception):
+                    raise chunk
+                else:
+                    yield chunk
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+
+
+def _shuffled(chunks: Iterable[SampleBatch], capacity: int, rng) -> Iterator[SampleBatch]:
+    """Shuffles a stream of samples through a buffer of fixed capacity.
+
+    The buffer is filled first. After that every incoming sample takes the slot of a random
+    buffered sample, which goes out instead. What is left in the buffer comes out last, shuffled.
+    """
+    buffer = None
+    count = 0
+    for chunk in chunks:
+        if buffer is None:
+            buffer = _empty_batch(capacity, chunk.boards.shape[1])
+        start = 0
+        num_samples = len(chunk.actions)
+        while start < num_samples:
+            if count < capacity:
+                take = min(capacity - count, num_samples - start)
+                for buffered, array in zip(buffer, chunk):
+                    buffered[count : count + take] = array[start : start + take]
+                count += take
+            else:
+                take = min(capacity, num_samples - start)
+                slots = rng.choice(capacity, size=take, replace=False)
+                yield SampleBatch(*(buffered[slots] for buffered in buffer))
+                for buffered, array in zip(buffer, chunk):
+                    buffered[slots] = array[start : start + take]
+            start += take
+    if count:
+        order = rng.permutation(count)
+        yield SampleBatch(*(buffered[order] for buffered in buffer))
+
+
+def _batched(
+    chunks: Iterable[SampleBatch], batch_size: int, drop_last: bool
+) -> Iterator[SampleBatch]:
+    """Regroups a stream of samples into batches of batch_size."""
+    batch = None
+    count = 0
+    for chunk in chunks:
+        start = 0
+        num_samples = len(chunk.actions)
+        while start < num_samples:
+            if batch is None:
+                batch = _empty_batch(batch_size, chunk.boards.shape[1])
+            take = min(batch_size - count, num_samples - start)
+            for batch_array, array in zip(batch, chunk):
+                batch_array[count : count + take] = array[start : start + take]
+            count += take
+            start += take
+            if count == batch_size:
+                yield batch
+                batch = None
+                count = 0
+    if count and not drop_last:
+        yield SampleBatch(*(array[:count] for array in batch))
+
+
+def stream_samples(
+    path: str,
+    batch_size: int,
+    shuffle_buffer: int = 0,
+    num_workers: int = 0,
+    seed: int = None,
+    drop_last: bool = True,
+    start: int = 0,
+    stop: int = None,
+) -> Iterator[SampleBatch]:
+    """Streams training samples out of a game archive, in batches.
+
+    Every position of every game becomes a (board, legal mask, action, outcome) sample. Samples are
+    computed from the records directly, without replaying the games through HexGame. Games are
+    read one at a time through the archive's memory map, and the buffers are sized by the
+    arguments alone, so memory use doesn't depend on the size of the archive.
+
+    All games of the archive must be played on the same board size.
+
+    Args:
+        path (str): The path of the GameArchive.
+        batch_size (int): The number of samples per batch.
+        shuffle_buffer (int, optional): The number of samples to shuffle through. 0 keeps the
+            order of the archive. Defaults to 0.
+        num_workers (int, optional): The number of processes converting games to samples. 0 does
+            it in this process. Defaults to 0.
+        seed (int, optional): The seed of the shuffling. Defaults to None.
+        drop_last (bool, optional): Whether to drop the last batch if it is smaller than
+            batch_size, so every batch has the same shape. Defaults to True.
+        start (int, optional): The id of the first game. Defaults to 0.
+        stop (int, optional): The id after the last game. Defaults to the end of the archive.
+
+    Yields:
+        SampleBatch: The batches. Their arrays are new for every batch.
+    """
+    if stop is None:
+        archive = GameArchive(path, readonly=True)
+        stop = len(archive)
+        archive.close()
+    if num_workers > 0:
+        chunks = _parallel_chunks(path, start, stop, num_workers)
+    else:
+        chunks = _record_chunks(path, start, stop, CHUNK_SAMPLES)
+    if shuffle_buffer > 0:
+        chunks = _shuffled(chunks, shuffle_buffer, np.random.default_rng(seed))
+    return _batched(chunks, batch_size, drop_last)
@@ -1,9 +1,15 @@
 import curses
 
-from hexterm.hex_game import HexGame
+from hexterm.client import NetworkOpponent
+from hexterm.py_game import PyHexGame
+from hexterm.replay import Replay
 
 WIN_BLINK_DURATION = 200  # Duration for blinking the winning path
 WIN_BLINK_AMOUNT = 5  # Number of times to blink the winning path
+AI_THINK_TIME = 1.0  # Seconds the AI thinks per move
+AI_PLAYER = 2  # The AI plays second, the human always starts
+REPLAY_MOVE_DURATION = 0.5  # Seconds between two moves when a replay plays by itself
+REPLAY_JUMP = 10  # Moves skipped by the up and down keys in a replay
 
 
 class GameState:
@@ -18,6 +24,18 @@ class GameState:
     def render(self, stdscr):
         raise NotImplementedError
 
+    def update(self) -> bool:
+        """Does the work of the state that doesn't wait for input, such as starting the AI's move.
+
+        Called once per tick of the game loop, so it must return quickly. Longer work goes to
+        the background tasks and timers of hex_ui.scheduler.
+
+        Returns:
+            bool: True if the state changed and has to be rendered again. If next_state is set,
+                the game moves on to it.
+        """
+        return False
+
     def _update_screen_dimensions(self, stdscr):
         self.screen_height, self.screen_width = stdscr.getmaxyx()
 
@@ -32,8 +50,10 @@ class MainMenu(GameState):
             if self.highlighted == 0:
                 self.next_state = GameInitMenu(self.hex_ui)
             elif self.highlighted == 1:
-                self.next_state = Instructions(self.hex_ui)
+                self.next_state = GameInitMenu(self.hex_ui, vs_ai=True)
             elif self.highlighted == 2:
+                self.next_state = Instructions(self.hex_ui)
+            elif self.highlighted == 3:
                 self.next_state = None
             return True
         return False
@@ -42,7 +62,7 @@ class MainMenu(GameState):
         self._update_screen_dimensions(stdscr)
         stdscr.clear()
 
-        self.menu_items = ["Start Game", "Instructions", "Quit"]
+        self.menu_items = ["Start Game", "Play vs AI", "Instructions", "Quit"]
 
         for i, item in enumerate(self.menu_items):
             x = self.screen_width // 2 - len(item) // 2
@@ -56,6 +76,10 @@ class MainMenu(GameState):
 
 
 class GameInitMenu(GameState):
+    def __init__(self, hex_ui, vs_ai: bool = False):
+        super().__init__(hex_ui)
+        self.vs_ai = vs_ai
+
     def process_input(self, key):
         if key == curses.KEY_UP and self.highlighted > 0:
             self.highlighted -= 1
@@ -65,25 +89,55 @@ class GameInitMenu(GameState):
             if self.highlighted == len(self.menu_items) - 1:
                 self.next_state = MainMenu(self.hex_ui)
             else:
-                size = int(self.menu_items[list(self.menu_items.keys())[self.highlighted]])
-                self.hex_ui.game = HexGame(num_cols=size, num_rows=size)
+                num_rows, num_cols = list(self.menu_items.values())[self.highlighted]
+                self.hex_ui.game = PyHexGame(num_cols=num_cols, num_rows=num_rows)
+                if self.hex_ui.ai is not None:
+                    self.hex_ui.ai.close()
+                self.hex_ui.ai = self._create_ai(num_rows, num_cols) if self.vs_ai else None
+                self.hex_ui.ai_player = AI_PLAYER
                 self.next_state = Gameplay(self.hex_ui)
             return True
         return False
 
+    def _create_ai(self, num_rows: int, num_cols: int):
+        """Creates the AI opponent, searching on several processes if configured.
+
+        The search is wrapped with the opening book of the board size when one is shipped. The AI
+        is imported here, as it needs NumPy, which two player games don't load.
+        """
+        from hexterm.book import BookPlayer
+        from hexterm.mcts import MCTS
+        from hexterm.parallel_mcts import ParallelMCTS
+
+        if self.hex_ui.ai_workers > 1:
+            search = ParallelMCTS(
+                num_rows=num_rows,
+                num_cols=num_cols,
+                num_workers=self.hex_ui.ai_workers,
+                time_limit=AI_THINK_TIME,
+            )
+        else:
+            search = MCTS(num_rows=num_rows, num_cols=num_cols, time_limit=AI_THINK_TIME)
+        return BookPlayer.with_default_book(num_rows, num_cols, search)
+
     def render(self, stdscr):
         self._update_screen_dimensions(stdscr)
         stdscr.clear()
 
+        # Board sizes as (rows, columns), larger boards than the terminal scroll
         self.menu_items = {
-            "4x4": "4",
-            "5x5": "5",
-            "7x7": "7",
-            "9x9": "9",
-            "11x11": "11",
-            "13x13": "13",
-            "15x15": "15",
-            "Back": "0",
+            "4x4": (4, 4),
+            "5x5": (5, 5),
+            "7x7": (7, 7),
+            "9x9": (9, 9),
+            "11x11": (11, 11),
+            "13x13": (13, 13),
+            "15x15": (15, 15),
+            "19x19": (19, 19),
+            "27x27": (27, 27),
+            "9x11": (9, 11),
+            "11x9": (11, 9),
+            "Back": None,
         }
 
         for i, item in enumerate(self.menu_items):
@@ -100,15 +154,18 @@ class GameInitMenu(GameState):
 class Gameplay(GameState):
     def __init__(self, hex_ui):
         super().__init__(hex_ui)
-        if self.hex_ui.game.history:
-            self.current_row, self.current_col = self.hex_ui.game.index_to_row_col(
-                self.hex_ui.game.history[-1]
+        if self.hex_ui.game.num_moves:
+            self.current_row, self.current_col = self.hex_ui.game.action_index_to_row_col(
+                self.hex_ui.game.history_vector()[-1]
             )
         else:
             self.current_row, self.current_col = 0, 0
-        self.player = self.hex_ui.game.current_player
+        self._screen_size = None
+        self._ai_thinking = False
+        self._message = None  # shown instead of the turn until the next key
 
     def process_input(self, key: int) -> bool:
+        self._message = None
         if key == curses.KEY_UP and self.current_row > 0:
             self.current_row -= 1
         elif key == curses.KEY_DOWN and self.current_row < self.hex_ui.game.num_rows - 1:
@@ -117,27 +174,98 @@ class Gameplay(GameState):
             self.current_col -= 1
         elif key == curses.KEY_RIGHT and self.current_col < self.hex_ui.game.num_cols - 1:
             self.current_col += 1
+        elif self._ai_to_move():
+            return False
+        elif key == ord("s"):
+            from hexterm.records import save_game
+
+            save_game(self.hex_ui.save_path, self.hex_ui.game)
+            self._message = f"Game saved to {self.hex_ui.save_path}"
+        elif key == ord("u") and self._online():
+            self._message = "Moves can't be undone in network games"
+        elif key == ord("u"):
+            action = self.hex_ui.game.undo()
+            # Against the AI, take back its reply as well as the player's move
+            if (
+                self.hex_ui.ai is not None
+                and self.hex_ui.game.current_player == self.hex_ui.ai_player
+            ):
+                action = self.hex_ui.game.undo()
+            if action is not None:
+                self.current_row, self.current_col = self.hex_ui.game.action_index_to_row_col(
+                    action
+                )
         elif key in [curses.KEY_ENTER, ord("\n"), ord(" ")]:
             action = self.hex_ui.game.row_col_to_action_index(self.current_row, self.current_col)
-            _, _, done, extra = self.hex_ui.game.step(action)
-            if done == -1:  # Invalid move
+            _, reward, done, extra = self.hex_ui.game.step(action)
+            if reward == -1:  # Invalid move
                 return False
-            elif done > 0:
-                self.next_state = WinEffect(self.hex_ui, extra['win_path'], done)
+            if self._online():
+                self.hex_ui.ai.send_move(action)
+            if done:
+                self.next_state = WinEffect(self.hex_ui, extra["win_path"], self.hex_ui.game.winner)
                 return True
         return False
 
+    def _ai_to_move(self) -> bool:
+        """Checks if the AI has to make the next move."""
+        game = self.hex_ui.game
+        return (
+            self.hex_ui.ai is not None
+            and game.current_player == self.hex_ui.ai_player
+            and not game.done
+        )
+
+    def _online(self) -> bool:
+        """Checks if the opponent plays over the network."""
+        return isinstance(self.hex_ui.ai, NetworkOpponent)
+
+    def update(self) -> bool:
+        if self._ai_thinking or not self._ai_to_move():
+            return False
+        # The AI searches on the scheduler's thread, the game is left alone until it is done
+        self._ai_thinking = True
+        self.hex_ui.scheduler.submit(
+            self.hex_ui.ai.select_action, self.hex_ui.game, on_done=self._play_ai_move
+        )
+        return True
+
+    def _play_ai_move(self, action: int) -> None:
+        """Plays the move the AI chose."""
+        self._ai_thinking = False
+        if action is None:
+            # The network opponent left, the game goes on as a two player game
+            self.hex_ui.ai.close()
+            self.hex_ui.ai = None
+            self._message = "Your opponent left the game"
+            return
+        self.current_row, self.current_col = self.hex_ui.game.action_index_to_row_col(action)
+        _, _, done, extra = self.hex_ui.game.step(action)
+        if done:
+            self.next_state = WinEffect(self.hex_ui, extra["win_path"], self.hex_ui.game.winner)
+
     def render(self, stdscr):
+        # The board is drawn incrementally, so the screen is only cleared on the first frame and
+        # when the terminal is resized
+        screen_size = stdscr.getmaxyx()
+        if screen_size != self._screen_size:
+            self._screen_size = screen_size
+            stdscr.erase()
+            self.hex_ui.invalidate_board()
         self._update_screen_dimensions(stdscr)
-        stdscr.clear()
 
         self.hex_ui.draw_board(stdscr, self.current_row, self.current_col)
 
         # Add HUD elements
-        hud_str_0 = f"Player {self.player}'s turn."
+        if self._message is not None:
+            hud_str_0 = self._message
+        elif self._ai_to_move():
+            hud_str_0 = "Waiting for your opponent..." if self._online() else "AI is thinking..."
+        else:
+            hud_str_0 = f"Player {self.hex_ui.game.current_player}'s turn."
         hud_str_1 = (
-            "Use arrow keys to navigate the board. Press spacebar or enter to place a piece. "
-            "Press 'q' to quit the game."
+            "Arrow keys to move, spacebar or enter to place a piece, "
+            "'u' to undo, 's' to save, 'q' to quit."
         )
         hud_str_2 = "Player 1 Connects Top to Bottom, and plays "
         hud_str_3 = "Player 2 Connects Left to Right, and plays "
@@ -175,15 +303,19 @@ class Gameplay(GameState):
             self.hex_ui.color_player_2,
         )
 
+        # Cut the lines to the terminal, which can be narrower than them with a scrolling board
+        hud_str_0, hud_str_1 = hud_str_0[: self.screen_width], hud_str_1[: self.screen_width]
+        stdscr.move(0, 0)
+        stdscr.clrtoeol()
         stdscr.addstr(
             0,
-            self.screen_width // 2 - len(hud_str_0) // 2,
+            (self.screen_width - len(hud_str_0)) // 2,
             hud_str_0,
             self.hex_ui.color_text | curses.A_BOLD,
         )
         stdscr.addstr(
             1,
-            self.screen_width // 2 - len(hud_str_1) // 2,
+            (self.screen_width - len(hud_str_1)) // 2,
             hud_str_1,
             self.hex_ui.color_text,
         )
@@ -197,8 +329,10 @@ class GameOver(GameState):
             self.highlighted += 1
         elif key in [curses.KEY_ENTER, ord("\n"), ord(" ")]:
             if self.highlighted == 0:
-                self.next_state = GameInitMenu(self.hex_ui)
+                self.next_state = GameInitMenu(self.hex_ui, vs_ai=self.hex_ui.ai is not None)
             elif self.highlighted == 1:
+                self.next_state = ReplayState(self.hex_ui, Replay.from_game(self.hex_ui.game), self)
+            elif self.highlighted == 2:
                 self.next_state = MainMenu(self.hex_ui)
             return True
         return False
@@ -208,7 +342,7 @@ class GameOver(GameState):
         stdscr.clear()
 
         title = "Do you want to play again?"
-        self.menu_items = ["Yes", "No"]
+        self.menu_items = ["Yes", "Replay the game", "No"]
 
         stdscr.addstr(
             self.screen_height // 2 - 2,
@@ -230,26 +364,37 @@ class WinEffect(GameState):
         super().__init__(hex_ui)
         self.path = win_path
         self.player = winner
+        self._screen_size = None
+        # The path is shown on even phases and hidden on odd ones, the message comes after
+        self._phase = 0
+        self._timer = self.hex_ui.scheduler.call_later(WIN_BLINK_DURATION / 1000, self._blink)
+
+    def _blink(self) -> None:
+        """Moves the animation to its next phase."""
+        self._phase += 1
+        if self._phase < 2 * WIN_BLINK_AMOUNT:
+            self._timer = self.hex_ui.scheduler.call_later(WIN_BLINK_DURATION / 1000, self._blink)
 
     def process_input(self, key):
+        # Any key skips the rest of the animation
+        self._timer.cancel()
         self.next_state = GameOver(self.hex_ui)
         return True
 
     def render(self, stdscr):
-        stdscr.clear()
-        last_cell = self.path[-1]
-        for _ in range(WIN_BLINK_AMOUNT):
-            self.hex_ui.draw_board(
-                stdscr, last_cell[0], last_cell[1], self.path, display_invalid=False
-            )
-            stdscr.refresh()
-            curses.napms(WIN_BLINK_DURATION)
-            self.hex_ui.draw_board(stdscr, last_cell[0], last_cell[1], display_invalid=False)
-            stdscr.refresh()
-            curses.napms(WIN_BLINK_DURATION)
-
+        screen_size = stdscr.getmaxyx()
+        if screen_size != self._screen_size:
+            self._screen_size = screen_size
+            stdscr.erase()
+            self.hex_ui.invalidate_board()
         self._update_screen_dimensions(stdscr)
 
+        last_cell = self.path[-1]
+        win_path = self.path if self._phase % 2 == 0 else None
+        self.hex_ui.draw_board(stdscr, last_cell[0], last_cell[1], win_path, display_invalid=False)
+        if self._phase < 2 * WIN_BLINK_AMOUNT:
+            return
+
         # Display the winning message at the bottom of the screen
         messages_to_display = [
             f"Player {self.player} wins!",
@@ -276,6 +421,9 @@ class Instructions(GameState):
         instructions = [
             "Use arrow keys to navigate the board",
             "Press spacebar to place a piece",
+            "Press 'u' to undo the last move",
+            "Press 's' to save the game",
+            "Press 'p' to show the profiling stats",
             "Press 'q' to quit the game",
             "The first player to connect their sides wins",
             "",
@@ -286,3 +434,123 @@ class Instructions(GameState):
             x = self.screen_width // 2 - len(instruction) // 2
             y = self.screen_height // 2 - len(instructions) // 2 + i
             stdscr.addstr(y, x, instruction, self.hex_ui.color_text)
+
+
+class ReplayState(GameState):
+    """Shows a recorded game, moving through it with the keyboard or playing it by itself.
+
+    The arrow keys move one move, or REPLAY_JUMP moves with up and down, home and end go to the
+    start and the end, and typing a move number then enter jumps to it. Space plays and pauses the
+    game. Enter without a move number leaves the replay.
+    """
+
+    def __init__(self, hex_ui, replay: Replay, previous: GameState = None):
+        """Creates the replay state.
+
+        Args:
+            hex_ui (HexUI): The UI.
+            replay (Replay): The game to show, drawn in the place of the UI's game.
+            previous (GameState, optional): The state to go back to. Defaults to the main menu.
+        """
+        super().__init__(hex_ui)
+        self.replay = replay
+        self.previous = previous
+        self._played_game = hex_ui.game  # given back to the UI when leaving
+        hex_ui.game = replay.game
+        self._typed = ""  # the digits of a move number to jump to
+        self._timer = None  # of the next move, while playing
+        self._screen_size = None
+
+    def _leave(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self.hex_ui.game = self._played_game
+        self.next_state = self.previous if self.previous is not None else MainMenu(self.hex_ui)
+        self.next_state.next_state = None
+
+    def _play(self) -> None:
+        """Shows the next move, and schedules the one after until the end of the game."""
+        self.replay.step(1)
+        if self.replay.position < len(self.replay.moves):
+            self._timer = self.hex_ui.scheduler.call_later(REPLAY_MOVE_DURATION, self._play)
+        else:
+            self._timer = None
+
+    def process_input(self, key):
+        if self._timer is not None:
+            # Any key stops the playing, space only does that
+            self._timer.cancel()
+            self._timer = None
+            if key == ord(" "):
+                return False
+        if ord("0") <= key <= ord("9"):
+            self._typed = (self._typed + chr(key))[-6:]
+        elif key in (curses.KEY_BACKSPACE, 127, 8):
+            self._typed = self._typed[:-1]
+        elif key in [curses.KEY_ENTER, ord("\n")]:
+            if not self._typed:
+                self._leave()
+                return True
+            self.replay.seek(int(self._typed))
+            self._typed = ""
+        elif key == curses.KEY_RIGHT:
+            self.replay.step(1)
+        elif key == curses.KEY_LEFT:
+            self.replay.step(-1)
+        elif key == curses.KEY_UP:
+            self.replay.step(REPLAY_JUMP)
+        elif key == curses.KEY_DOWN:
+            self.replay.step(-REPLAY_JUMP)
+        elif key == curses.KEY_HOME:
+            self.replay.seek(0)
+        elif key == curses.KEY_END:
+            self.replay.seek(len(self.replay.moves))
+        elif key == ord(" "):
+            if self.replay.position == len(self.replay.moves):
+                self.replay.seek(0)
+            self._timer = self.hex_ui.scheduler.call_later(REPLAY_MOVE_DURATION, self._play)
+        return False
+
+    def render(self, stdscr):
+        screen_size = stdscr.getmaxyx()
+        if screen_size != self._screen_size:
+            self._screen_size = screen_size
+            stdscr.erase()
+            self.hex_ui.invalidate_board()
+        self._update_screen_dimensions(stdscr)
+
+        # The last move is highlighted, and the winning path at the end of a won game
+        game = self.replay.game
+        last_move = self.replay.last_move()
+        if game.done:
+            highlighted = self.replay.win_path()
+        elif last_move is not None:
+            highlighted = [game.action_index_to_row_col(last_move)]
+        else:
+            highlighted = []
+        focus = highlighted[-1] if highlighted else (0, 0)
+        self.hex_ui.draw_board(stdscr, focus[0], focus[1], highlighted, display_invalid=False)
+
+        num_moves = len(self.replay.moves)
+        if game.done:
+            status = f"Player {game.winner} won"
+        else:
+            status = f"Player {game.current_player} to move"
+        hud_str_0 = f"Move {self.replay.position} of {num_moves}. {status}."
+        if self._typed:
+            hud_str_0 = f"Jump to move: {self._typed}"
+        elif self._timer is not None:
+            hud_str_0 += " Playing..."
+        hud_str_1 = (
+            "Left/right: one move, up/down: 10 moves, home/end, number and enter: jump, "
+            "space: play, enter: back."
+        )
+        hud_str_0, hud_str_1 = hud_str_0[: self.screen_width], hud_str_1[: self.screen_width]
+        for line, (text, attribute) in enumerate(
+            [(hud_str_0, curses.A_BOLD), (hud_str_1, curses.A_NORMAL)]
+        ):
+            stdscr.move(line, 0)
+            stdscr.clrtoeol()
+            stdscr.addstr(
+                line, (self.screen_width - len(text)) // 2, text, self.hex_ui.color_text | attribute
+            )
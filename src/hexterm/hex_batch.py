@@ -0,0 +1,249 @@
+from typing import Tuple
+
+import numpy as np
+
+from hexterm.hex_game import STATE_EMPTY, STATE_PLAYERS, HexGame
+
+
+def dilate(cells: np.ndarray) -> np.ndarray:
+    """Grows a stack of boolean boards by one cell in each of the six hex directions.
+
+    Args:
+        cells (np.ndarray): A boolean array of shape (batch, num_rows, num_cols).
+
+    Returns:
+        np.ndarray: The cells together with all of their neighbors.
+    """
+    grown = cells.copy()
+    grown[:, 1:, :] |= cells[:, :-1, :]  # from (r - 1, c)
+    grown[:, :-1, :] |= cells[:, 1:, :]  # from (r + 1, c)
+    grown[:, :, 1:] |= cells[:, :, :-1]  # from (r, c - 1)
+    grown[:, :, :-1] |= cells[:, :, 1:]  # from (r, c + 1)
+    grown[:, 1:, :-1] |= cells[:, :-1, 1:]  # from (r - 1, c + 1)
+    grown[:, :-1, 1:] |= cells[:, 1:, :-1]  # from (r + 1, c - 1)
+    return grown
+
+
+def random_playouts(
+    game: HexGame, num_playouts: int, rng: np.random.Generator = None
+) -> np.ndarray:
+    """Plays the rest of a game at random many times at once, and returns the winners.
+
+    The vectorized counterpart of HexGame.playout: each playout fills the empty cells with its
+    own permutation of the stones left to play, and the winners of all the filled boards are found
+    together by growing player 1's stones from the top row until the growth stops.
+
+    Args:
+        game (HexGame): The game to play out. It is not modified.
+        num_playouts (int): The number of playouts.
+        rng (np.random.Generator, optional): The random number generator. Defaults to a new one.
+
+    Returns:
+        np.ndarray: The winning player of each playout.
+    """
+    if game.done:
+        return np.full(num_playouts, game.winner, dtype=np.int8)
+    if rng is None:
+        rng = np.random.default_rng()
+    board = np.asarray(game.board, dtype=np.int8)
+    empty = np.flatnonzero(board == STATE_EMPTY)
+    player = game.current_player
+    stones = np.full(len(empty), game.get_opponent(player), dtype=np.int8)
+    stones[: (len(empty) + 1) // 2] = player
+
+    boards = np.repeat(board[None], num_playouts, axis=0)
+    boards[:, empty] = rng.permuted(np.broadcast_to(stones, (num_playouts, len(empty))), axis=1)
+    ones = (boards == STATE_PLAYERS[1]).reshape(num_playouts, game.num_rows, game.num_cols)
+
+    reach = np.zeros_like(ones)
+    reach[:, 0, :] = ones[:, 0, :]
+    front = reach
+    while front.any():
+        front = dilate(front) & ones & ~reach
+        reach |= front
+    return np.where(reach[:, -1, :].any(axis=1), STATE_PLAYERS[1], STATE_PLAYERS[2]).astype(np.int8)
+
+
+class HexBatch:
+    """HexBatch steps a batch of independent Hex games at once.
+
+    All boards live in a single (batch_size, num_rows * num_cols) array and every method works on
+    the whole batch with NumPy operations, so there is no Python loop over the games.
+
+    The win check is label propagation on the stacked boards. For each player we keep the set of
+    their stones connected to their starting edge (top for player 1, left for player 2). Stones are
+    never removed, so the set only grows: a new stone is propagated from only if it touches the
+    starting edge or the set, and the game is won once the set reaches the opposite edge.
+
+    Attributes:
+        batch_size (int): The number of games in the batch.
+        num_rows (int): The number of rows in each game board.
+        num_cols (int): The number of columns in each game board.
+        auto_reset (bool): Whether finished games are reset right away by `step`.
+        board (np.ndarray): The boards, with shape (batch_size, num_rows * num_cols).
+        history (np.ndarray): The moves made in each game, padded with -1, with shape
+            (batch_size, num_rows * num_cols).
+        num_moves (np.ndarray): The number of moves made in each game.
+        current_player (np.ndarray): The current player of each game.
+        done (np.ndarray): Whether each game has ended. Only set when auto_reset is False.
+        winner (np.ndarray): The winner of each game, 0 while the game is running.
+
+    Methods:
+        step: Makes one move in every game of the batch.
+        reset: Resets all or some of the games.
+        get_info_state: Returns the stacked information states.
+        legal_actions_mask: Returns which actions are legal in each game.
+    """
+
+    def __init__(self, batch_size: int, num_rows: int, num_cols: int, auto_reset: bool = True):
+        self.batch_size = batch_size
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.auto_reset = auto_reset
+
+        num_cells = num_rows * num_cols
+        # Board and history are views into one buffer, so the info states need no copying
+        self._info_states = np.empty((batch_size, 2 * num_cells), dtype=np.int16)
+        self.board = self._info_states[:, :num_cells]
+        self.history = self._info_states[:, num_cells:]
+        self.num_moves = np.empty(batch_size, dtype=np.int32)
+        self.current_player = np.empty(batch_size, dtype=np.int16)
+        self.done = np.empty(batch_size, dtype=bool)
+        self.winner = np.empty(batch_size, dtype=np.int16)
+        # Stones connected to the starting edge, indexed by player - 1
+        self._reach = np.empty((batch_size, 2, num_rows, num_cols), dtype=bool)
+        self._games = np.arange(batch_size)
+
+        self.reset()
+
+    def reset(self, mask: np.ndarray = None) -> np.ndarray:
+        """Resets the games.
+
+        Args:
+            mask (np.ndarray, optional): A boolean array selecting the games to reset. Defaults to
+                None, which resets every game.
+
+        Returns:
+            np.ndarray: The stacked information states.
+        """
+        games = slice(None) if mask is None else mask
+        self.board[games] = STATE_EMPTY
+        self.history[games] = -1
+        self.num_moves[games] = 0
+        self.current_player[games] = STATE_PLAYERS[1]
+        self.done[games] = False
+        self.winner[games] = 0
+        self._reach[games] = False
+        return self.get_info_state()
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, dict]:
+        """Makes one move in every game of the batch.
+
+        Invalid moves (out of range, on an occupied cell or in a finished game) leave their game
+        untouched, exactly like `HexGame.step`.
+
+        Args:
+            actions (np.ndarray): The action to take in each game, with shape (batch_size,).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, dict]: The next information states, the
+                rewards (1 for a win, 0 for a regular move, -1 for an invalid move), whether each
+                game ended, and additional info. The info has the "winner" of each game that
+                ended, and with auto_reset also the "final_info_state" of the games before they
+                were reset.
+        """
+        actions = np.asarray(actions)
+        in_range = (actions >= 0) & (actions < self.board.shape[1])
+        safe_actions = np.where(in_range, actions, 0)
+        valid = in_range & ~self.done & (self.board[self._games, safe_actions] == STATE_EMPTY)
+
+        games = np.flatnonzero(valid)
+        moves = actions[games]
+        players = self.current_player[games]
+        self.board[games, moves] = players
+        self.history[games, self.num_moves[games]] = moves
+        self.num_moves[games] += 1
+
+        won = np.zeros(self.batch_size, dtype=bool)
+        won[games] = self._update_reach(games, moves, players)
+        self.winner[won] = self.current_player[won]
+
+        rewards = np.where(valid, 0, -1)
+        rewards[won] = 1
+        switch = valid & ~won
+        self.current_player[switch] = 3 - self.current_player[switch]
+
+        info = {"winner": self.winner.copy()}
+        if self.auto_reset:
+            if won.any():
+                info["final_info_state"] = self._info_states[won]
+                self.reset(won)
+        else:
+            self.done |= won
+        return self.get_info_state(), rewards, won, info
+
+    def _update_reach(
+        self, games: np.ndarray, moves: np.ndarray, players: np.ndarray
+    ) -> np.ndarray:
+        """Adds the new stones to the sets connected to the starting edges.
+
+        Args:
+            games (np.ndarray): The games where a stone was placed.
+            moves (np.ndarray): The action index of each stone.
+            players (np.ndarray): The player of each stone.
+
+        Returns:
+            np.ndarray: For each of the games, whether the player has now won.
+        """
+        rows, cols = moves // self.num_cols, moves % self.num_cols
+        layers = players - 1
+        reach = self._reach[games, layers]
+
+        # Only stones touching the starting edge or the connected set need propagation
+        touching = dilate(reach)[np.arange(len(games)), rows, cols]
+        touching |= np.where(players == STATE_PLAYERS[1], rows == 0, cols == 0)
+        seeded = np.flatnonzero(touching)
+        if len(seeded) == 0:
+            return np.zeros(len(games), dtype=bool)
+
+        games, layers, reach = games[seeded], layers[seeded], reach[seeded]
+        stones = self.board[games].reshape(-1, self.num_rows, self.num_cols) == (
+            players[seeded, None, None]
+        )
+        front = np.zeros_like(reach)
+        front[np.arange(len(games)), rows[seeded], cols[seeded]] = True
+        while front.any():
+            reach |= front
+            front = dilate(front) & stones & ~reach
+        self._reach[games, layers] = reach
+
+        won = np.zeros(len(touching), dtype=bool)
+        won[seeded] = np.where(
+            players[seeded] == STATE_PLAYERS[1],
+            reach[:, -1, :].any(axis=1),
+            reach[:, :, -1].any(axis=1),
+        )
+        return won
+
+    def get_info_state(self, copy: bool = False) -> np.ndarray:
+        """Returns the stacked information states.
+
+        Each row has the same layout as `HexGame.get_info_state`: the board followed by the move
+        history, padded with -1.
+
+        Args:
+            copy (bool, optional): Whether to return a copy instead of a view of the internal
+                buffer, which is overwritten by the next step. Defaults to False.
+
+        Returns:
+            np.ndarray: The information states, with shape (batch_size, 2 * num_rows * num_cols).
+        """
+        return self._info_states.copy() if copy else self._info_states
+
+    def legal_actions_mask(self) -> np.ndarray:
+        """Returns which actions are legal in each game.
+
+        Returns:
+            np.ndarray: A boolean array with the same shape as the board.
+        """
+        return (self.board == STATE_EMPTY) & ~self.done[:, None]
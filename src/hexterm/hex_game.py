@@ -1,7 +1,12 @@
-# ! Check num_cols and num_rows with different values
+from __future__ import annotations
+
+import random
 from collections import deque
-from typing import Tuple
-import numpy as np
+from functools import lru_cache
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np  # imported when a game is created, see `HexGame._reset_buffers`
 
 
 # BOARD_STATES
@@ -11,6 +16,170 @@ STATE_PLAYERS = {
     2: 2,
 }
 
+# Offsets of the six neighbors of a cell in (row, col) space
+NEIGHBOR_OFFSETS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, 1), (1, -1))
+
+
+@lru_cache(maxsize=None)
+def neighbor_table(num_rows: int, num_cols: int) -> Tuple[Tuple[int, ...], ...]:
+    """Returns the neighbor action indices of every cell on a board of the given size.
+
+    The table only depends on the board size, so it is computed once and shared between games.
+
+    Args:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+
+    Returns:
+        tuple: For each action index, a tuple with the action indices of its neighbors.
+    """
+    return tuple(
+        tuple(
+            (r + dr) * num_cols + (c + dc)
+            for dr, dc in NEIGHBOR_OFFSETS
+            if 0 <= r + dr < num_rows and 0 <= c + dc < num_cols
+        )
+        for r in range(num_rows)
+        for c in range(num_cols)
+    )
+
+
+@lru_cache(maxsize=None)
+def edge_table(num_rows: int, num_cols: int) -> dict:
+    """Returns the edges of the board that every cell touches, for each player.
+
+    The edges are numbered like the nodes of HexGame's disjoint-set forest: after the cells come
+    the top, bottom, left and right edges. Player 1 connects the top and the bottom, player 2 the
+    left and the right, so a cell of the first or last row touches one of player 1's edges (both
+    on a board with a single row).
+
+    Args:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+
+    Returns:
+        dict: For each player, a tuple with the edge nodes touched by each action index.
+    """
+    num_cells = num_rows * num_cols
+    top, bottom, left, right = range(num_cells, num_cells + 4)
+    edges = {STATE_PLAYERS[1]: [], STATE_PLAYERS[2]: []}
+    for row in range(num_rows):
+        for col in range(num_cols):
+            edges[STATE_PLAYERS[1]].append((top,) * (row == 0) + (bottom,) * (row == num_rows - 1))
+            edges[STATE_PLAYERS[2]].append((left,) * (col == 0) + (right,) * (col == num_cols - 1))
+    return {player: tuple(cells) for player, cells in edges.items()}
+
+
+def fill_winner(cells: list, num_rows: int, num_cols: int) -> int:
+    """Returns the winner of a completely filled board.
+
+    A filled Hex board always has exactly one winner, so it is enough to check if player 1 connects
+    the top and the bottom rows.
+
+    Args:
+        cells (list): The filled board, as a list. The search marks the cells it visits in it.
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+
+    Returns:
+        int: The winning player.
+    """
+    player = STATE_PLAYERS[1]
+    neighbors = neighbor_table(num_rows, num_cols)
+    last_row_start = (num_rows - 1) * num_cols
+    stack = [col for col in range(num_cols) if cells[col] == player]
+    for cell in stack:
+        cells[cell] = STATE_EMPTY  # mark as visited
+    while stack:
+        cell = stack.pop()
+        if cell >= last_row_start:
+            return player
+        for neighbor in neighbors[cell]:
+            if cells[neighbor] == player:
+                cells[neighbor] = STATE_EMPTY
+                stack.append(neighbor)
+    return STATE_PLAYERS[2]
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(num_rows: int, num_cols: int) -> Tuple[dict, int]:
+    """Returns the Zobrist keys of a board of the given size.
+
+    The keys are drawn from a generator seeded with the board size, so hashes are the same across
+    runs and can be stored on disk.
+
+    Args:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+
+    Returns:
+        tuple: For each player, the 64-bit key of a stone on each action index, and the key
+            toggled when player 2 is to move.
+    """
+    rng = random.Random(f"hexterm-zobrist-{num_rows}x{num_cols}")
+    stone_keys = {
+        player: tuple(rng.getrandbits(64) for _ in range(num_rows * num_cols))
+        for player in STATE_PLAYERS.values()
+    }
+    return stone_keys, rng.getrandbits(64)
+
+
+@lru_cache(maxsize=None)
+def symmetries(num_rows: int, num_cols: int) -> Tuple[Tuple[Tuple[int, ...], bool], ...]:
+    """Returns the symmetries of a board of the given size that map positions to equivalent ones.
+
+    Turning the board by 180 degrees keeps every edge with its player. On a square board,
+    mirroring it along either diagonal swaps the top and bottom edges with the left and right
+    ones, so the position is equivalent once the colors, and the player to move, are swapped too.
+    Each symmetry is its own inverse, so the same table maps moves both ways.
+
+    Swapping the colors maps a position onto one where player 2 made the first move, which no
+    game from the empty board reaches, so only the turn merges positions of such games.
+
+    Args:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+
+    Returns:
+        tuple: The identity first, then the other symmetries. Each is the action index every
+            action index is mapped to, and whether the colors are swapped.
+    """
+    cells = [(r, c) for r in range(num_rows) for c in range(num_cols)]
+    mappings = [(lambda r, c: (r, c), False)]
+    mappings.append((lambda r, c: (num_rows - 1 - r, num_cols - 1 - c), False))
+    if num_rows == num_cols:
+        mappings.append((lambda r, c: (c, r), True))
+        mappings.append((lambda r, c: (num_cols - 1 - c, num_rows - 1 - r), True))
+    return tuple(
+        (tuple(row * num_cols + col for row, col in (mapping(r, c) for r, c in cells)), swaps)
+        for mapping, swaps in mappings
+    )
+
+
+@lru_cache(maxsize=None)
+def symmetric_stone_keys(num_rows: int, num_cols: int) -> Tuple[dict, ...]:
+    """Returns the Zobrist keys of the stones seen through each symmetry but the identity.
+
+    XORing the key of a player's stone on an action index into a hash updates the hash of the
+    symmetric position, where the stone is on the mapped action index and maybe of the other color.
+
+    Args:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+
+    Returns:
+        tuple: For each symmetry after the identity, the keys of each player like `zobrist_keys`.
+    """
+    stone_keys, _ = zobrist_keys(num_rows, num_cols)
+    return tuple(
+        {
+            player: tuple(stone_keys[3 - player if swaps else player][cell] for cell in mapping)
+            for player in STATE_PLAYERS.values()
+        }
+        for mapping, swaps in symmetries(num_rows, num_cols)[1:]
+    )
+
+
 class HexGame:
     """HexGame class represents a game of Hex.
 
@@ -20,7 +189,9 @@ class HexGame:
         state (np.ndarray): The game state. It's a 1D array of size num_rows * num_cols. Represents
             the board of the game.
         current_player (int): The current player's number.
-        history (list): A list of the moves made in the game.
+        history (str): The moves made in the game, as comma terminated action indices.
+        num_moves (int): The number of moves made in the game.
+        hash (int): The 64-bit Zobrist hash of the position, including the player to move.
         done (bool): A boolean indicating if the game has ended.
         winner (int): The number of the winning player.
         state (np.ndarray): The current state of the game.
@@ -30,19 +201,47 @@ class HexGame:
         key_to_action: Converts the string representation to row and column indices.
         step: Makes a move on the game board at the specified row and column.
         reset: Resets the game.
+        make: Makes a move that is known to be valid, for search.
+        load_moves: Resets the game and plays a sequence of moves in bulk.
+        undo: Takes back the last move.
+        unmake: Takes back the given move, which must be the last one.
         get_info_state: Returns the information state.
+        legal_actions_mask: Returns which actions are legal, for masking a policy.
+        legal_actions: Returns the legal actions.
+        random_legal_action: Returns a random legal action in constant time.
+        playout: Plays the rest of the game at random and returns the winner.
+        canonical_hash: Returns the same hash for all the positions equivalent by symmetry.
+        canonical_symmetry: Returns the symmetry mapping the position to its canonical form.
         history_vector: Returns the vectorized version of the history.
         is_valid: Checks if a move is valid at the specified row and column.
-        is_terminal: Checks if the game has reached a terminal state for the specified player using
-            BFS.
+        is_terminal: Checks if the game has reached a terminal state for the specified player.
+        win_path: Returns the winning path once the game is won.
         _bfs: Performs a breadth-first search to find the shortest path for the specified player.
+
+    Connectivity is tracked incrementally with a disjoint-set forest over the cells, plus four
+    virtual nodes standing for the board edges (top/bottom for player 1, left/right for player 2).
+    Every stone is merged with its same colored neighbors when it is placed, so checking for a win
+    is a single comparison of the roots of the player's two edges.
+
+    The board and the move history share one preallocated buffer, which is also the information
+    state: the board followed by the moves made so far, padded with -1. Making a move writes two
+    elements of it and never reallocates.
+
+    Every move also pushes a small rollback record with the state it overwrote, so undoing a move
+    restores the board, the player, the result and the connectivity structures without copying the
+    game.
+
+    The empty cells are kept in a list, with the position of every cell in it. A move swaps its
+    cell with the last one and removes it, and undoing it reverses the swap, so the legal moves
+    are known without scanning the board and one can be drawn at random in constant time. A mask
+    of the legal actions is kept next to the information state the same way.
     """
 
     def __init__(self, num_rows: int = 0, num_cols: int = 0):
         self.num_cols = num_cols
         self.num_rows = num_rows
 
-        self.reset()
+        self._reset_position()
 
     def row_col_to_action_index(self, row: int, col: int) -> int:
         """Converts the row and column indices to an action index.
@@ -89,26 +288,118 @@ class HexGame:
                 done, and additional info.
         """
         if self.is_valid(action):
-            self._update_game_state(action)
-            self.done, path = self.is_terminal(self.current_player)
-            if self.done:
-                self.winner = self.current_player
-                return self.get_info_state(), 1, True, {"win_path": path}
-            self.update_player()
+            if self.make(action):
+                return self.get_info_state(), 1, True, {"win_path": self._bfs(self.winner)}
             return self.get_info_state(), 0, False, {}
         return self.get_info_state(), -1, False, {} # Invalid move
 
+    def make(self, action: int) -> bool:
+        """Makes a move without validating it or building the info state and winning path.
+
+        This is the cheap counterpart of `unmake` for search, which only needs to know if the move
+        won the game.
+
+        Args:
+            action (int): The action to take. Must be a valid move.
+
+        Returns:
+            bool: True if the move won the game, False otherwise.
+        """
+        self._update_game_state(action)
+        if self.is_connected(self.current_player):
+            self.done = True
+            self.winner = self.current_player
+            return True
+        self.update_player()
+        return False
+
+    def load_moves(self, moves) -> None:
+        """Resets the game and plays a sequence of moves, e.g. from a saved record.
+
+        Each move only places its stone and updates the history, the hash and the connectivity.
+        Unlike `step`, moves are not validated or checked for a win one at a
+        time, so only the last move may end the game. The rollback log is filled as usual, so the
+        moves can be undone.
+
+        Args:
+            moves (Sequence[int]): The action indices, starting with player 1.
+
+        Raises:
+            ValueError: If an action is out of range or played twice.
+        """
+        moves = [int(action) for action in moves]
+        num_cells = self.num_rows * self.num_cols
+        if len(moves) and (
+            min(moves) < 0 or max(moves) >= num_cells or len(set(moves)) != len(moves)
+        ):
+            raise ValueError("Moves must be distinct action indices of the board")
+        self._reset_position()
+
+        num_moves = len(moves)
+        self.num_moves = num_moves
+
+        board, history = self.board, self._history
+        player, opponent = STATE_PLAYERS[1], STATE_PLAYERS[2]
+        stone_keys, player_key = self._stone_keys, self._player_key
+        for index, action in enumerate(moves):
+            self._rollback.append((player, False, None, self.hash, self._connectivity_checkpoint()))
+            # The stone is placed first, connecting it looks at the stones already on the board
+            board[action] = player
+            history[index] = action
+            self.hash ^= stone_keys[player][action] ^ player_key
+            self._fill_cell(action)
+            self._connect(action, player)
+            player, opponent = opponent, player
+
+        if num_moves and self.is_connected(opponent):
+            # The last move won, the player to move stays the winner like after `step`
+            self.hash ^= player_key
+            self.current_player = opponent
+            self.done = True
+            self.winner = opponent
+        else:
+            self.current_player = player
+
     def reset(self) -> None:
         """Resets the game."""
-        self.board = np.zeros(self.num_rows * self.num_cols, dtype=int) # only the board
+        self._reset_position()
+        return self.get_info_state()
+
+    def _reset_position(self) -> None:
+        """Empties the board and resets everything that depends on it."""
+        self._reset_buffers()
+        self.num_moves = 0
+        # The empty cells in any order, and the position of each cell in that list
+        num_cells = self.num_rows * self.num_cols
+        self._empty_cells = list(range(num_cells))
+        self._empty_index = list(range(num_cells))
+        self._rollback = []
+        self._reset_connectivity()
+        self._stone_keys, self._player_key = zobrist_keys(self.num_rows, self.num_cols)
+        self.hash = 0
 
         self.current_player = 1
-        self.history = ""
 
         self.done = False
         self.winner = None
 
-        return self.get_info_state()
+    def _reset_buffers(self) -> None:
+        """Empties the board and the history, allocating them on the first reset."""
+        import numpy as np
+
+        num_cells = self.num_rows * self.num_cols
+        info_state = getattr(self, "_info_state", None)
+        if info_state is None or len(info_state) != 2 * num_cells:
+            # Actions are stored next to the board, so the smallest type that holds them is used
+            dtype = np.int8 if num_cells <= np.iinfo(np.int8).max + 1 else np.int16
+            self._info_state = np.empty(2 * num_cells, dtype=dtype)
+            self.board = self._info_state[:num_cells]  # only the board
+            self._history = self._info_state[num_cells:]
+            self._legal_mask = np.empty(num_cells, dtype=bool)
+            self._no_legal_actions = np.zeros(num_cells, dtype=bool)  # once the game is over
+        self.board[:] = STATE_EMPTY
+        self._history[:] = -1
+        self._legal_mask[:] = True
 
     def _update_game_state(self, action: int) -> None:
         """Updates the game state after a valid move is made.
@@ -116,8 +407,199 @@ class HexGame:
         Args:
             action (int): The action to take.
         """
+        self._rollback.append(
+            (
+                self.current_player,
+                self.done,
+                self.winner,
+                self.hash,
+                self._connectivity_checkpoint(),
+            )
+        )
         self.board[action] = self.current_player
-        self.history += f"{action},"
+        self.hash ^= self._stone_keys[self.current_player][action]
+        self._history[self.num_moves] = action
+        self.num_moves += 1
+        self._fill_cell(action)
+        self._connect(action, self.current_player)
+
+    def _fill_cell(self, action: int) -> None:
+        """Removes a cell from the legal moves, moving the last empty cell to its place."""
+        empty_cells, empty_index = self._empty_cells, self._empty_index
+        index = empty_index[action]
+        last = empty_cells.pop()
+        if last != action:
+            empty_cells[index] = last
+            empty_index[last] = index
+        self._legal_mask[action] = False
+
+    def _empty_cell(self, action: int) -> None:
+        """Gives a cell back to the legal moves, undoing the `_fill_cell` of the last move.
+
+        The cell's position in the list is still the one it was removed from, so the cell moved
+        there goes back to the end and the list is restored exactly.
+        """
+        empty_cells, empty_index = self._empty_cells, self._empty_index
+        index = empty_index[action]
+        if index < len(empty_cells):
+            moved = empty_cells[index]
+            empty_index[moved] = len(empty_cells)
+            empty_cells.append(moved)
+            empty_cells[index] = action
+        else:
+            empty_cells.append(action)
+        self._legal_mask[action] = True
+
+    def undo(self) -> int:
+        """Takes back the last move.
+
+        Returns:
+            int: The action that was taken back, or None if no move has been made.
+        """
+        if not self._rollback:
+            return None
+        player, done, winner, self.hash, checkpoint = self._rollback.pop()
+        self.num_moves -= 1
+        action = int(self._history[self.num_moves])
+        self._history[self.num_moves] = -1
+        self.board[action] = STATE_EMPTY
+        self._empty_cell(action)
+        self._restore_connectivity(checkpoint)
+
+        self.current_player = player
+        self.done = done
+        self.winner = winner
+        return action
+
+    def unmake(self, action: int) -> None:
+        """Takes back the given move, which must be the last one made.
+
+        Args:
+            action (int): The action to take back.
+
+        Raises:
+            ValueError: If the action is not the last move.
+        """
+        if not self.num_moves or self._history[self.num_moves - 1] != action:
+            raise ValueError(f"Action {action} is not the last move")
+        self.undo()
+
+    def _reset_connectivity(self) -> None:
+        """Resets the structures used to check if a player has connected their edges."""
+        self._neighbors = neighbor_table(self.num_rows, self.num_cols)
+        self._touched_edges = edge_table(self.num_rows, self.num_cols)
+
+        # Disjoint-set forest: one node per cell followed by the four edge nodes
+        num_cells = self.num_rows * self.num_cols
+        self._edges = {
+            STATE_PLAYERS[1]: (num_cells, num_cells + 1),  # top, bottom
+            STATE_PLAYERS[2]: (num_cells + 2, num_cells + 3),  # left, right
+        }
+        self._parent = list(range(num_cells + 4))
+        self._size = [1] * (num_cells + 4)
+        self._merged = []  # roots attached to another root, in order
+
+    def _connectivity_checkpoint(self) -> int:
+        """Returns a token that `_restore_connectivity` can roll the structures back to."""
+        return len(self._merged)
+
+    def _restore_connectivity(self, checkpoint: int) -> None:
+        """Rolls the connectivity structures back to a checkpoint.
+
+        Args:
+            checkpoint (int): A token returned by `_connectivity_checkpoint`.
+        """
+        while len(self._merged) > checkpoint:
+            child = self._merged.pop()
+            root = self._parent[child]
+            self._size[root] -= self._size[child]
+            self._parent[child] = child
+
+    def _connect(self, action: int, player: int) -> None:
+        """Merges a newly placed stone with its same colored neighbors and edges.
+
+        Args:
+            action (int): The action index of the stone.
+            player (int): The player who placed the stone.
+        """
+        for neighbor in self._neighbors[action]:
+            if self.board[neighbor] == player:
+                self._union(action, neighbor)
+        for edge in self._touched_edges[player][action]:
+            self._union(action, edge)
+
+    def _find(self, node: int) -> int:
+        """Returns the root of the set containing the node.
+
+        Unions are made by size, so trees stay O(log n) deep without path compression, which
+        would make unions impossible to roll back.
+
+        Args:
+            node (int): The node index.
+
+        Returns:
+            int: The index of the root node.
+        """
+        parent = self._parent
+        while parent[node] != node:
+            node = parent[node]
+        return node
+
+    def _union(self, first: int, second: int) -> None:
+        """Merges the sets containing the two nodes.
+
+        Args:
+            first (int): The first node index.
+            second (int): The second node index.
+        """
+        first, second = self._find(first), self._find(second)
+        if first == second:
+            return
+        if self._size[first] < self._size[second]:
+            first, second = second, first
+        self._parent[second] = first
+        self._size[first] += self._size[second]
+        self._merged.append(second)
+
+    def is_connected(self, player: int) -> bool:
+        """Checks if the player has connected their two edges of the board.
+
+        Args:
+            player (int): The player. Must be one of the STATE_PLAYERS values.
+
+        Returns:
+            bool: True if the player's edges are connected, False otherwise.
+        """
+        first_edge, second_edge = self._edges[player]
+        return self._find(first_edge) == self._find(second_edge)
+
+    def winning_moves(self, player: int) -> list:
+        """Returns the empty cells where a stone would connect the player's two edges.
+
+        Args:
+            player (int): The player. Must be one of the STATE_PLAYERS values.
+
+        Returns:
+            list: The winning action indices.
+        """
+        first_edge, second_edge = self._edges[player]
+        first_root, second_root = self._find(first_edge), self._find(second_edge)
+        cells = self.board.tolist()
+        touched_edges = self._touched_edges[player]
+        moves = []
+        for action, cell in enumerate(cells):
+            if cell != STATE_EMPTY:
+                continue
+            touches_first = first_edge in touched_edges[action]
+            touches_second = second_edge in touched_edges[action]
+            for neighbor in self._neighbors[action]:
+                if cells[neighbor] == player:
+                    root = self._find(neighbor)
+                    touches_first = touches_first or root == first_root
+                    touches_second = touches_second or root == second_root
+            if touches_first and touches_second:
+                moves.append(action)
+        return moves
 
     def get_opponent(self, player: int) -> int:
         """Returns the opponent of the specified player.
@@ -130,11 +612,64 @@ class HexGame:
         """
         return STATE_PLAYERS[3 - player]
 
+    def hash_after(self, action: int) -> int:
+        """Returns the hash of the position after a move that doesn't end the game.
+
+        Args:
+            action (int): The action to take. Must be a valid move.
+
+        Returns:
+            int: The Zobrist hash, computed without making the move.
+        """
+        return self.hash ^ self._stone_keys[self.current_player][action] ^ self._player_key
+
+    def _symmetric_position_hashes(self) -> list:
+        """Returns the hashes of the position seen through each symmetry, like `symmetries`."""
+        board = self.board.tolist()
+        stones = [(action, board[action]) for action in self.history_vector().tolist()]
+        hashes = [self.hash]
+        others = symmetries(self.num_rows, self.num_cols)[1:]
+        for (_, swaps), keys in zip(others, symmetric_stone_keys(self.num_rows, self.num_cols)):
+            symmetric_hash = 0
+            for action, player in stones:
+                symmetric_hash ^= keys[player][action]
+            player = 3 - self.current_player if swaps else self.current_player
+            hashes.append(
+                symmetric_hash ^ self._player_key if player == STATE_PLAYERS[2] else symmetric_hash
+            )
+        return hashes
+
+    def canonical_hash(self) -> int:
+        """Returns the same hash for all the positions equivalent by symmetry.
+
+        It is the smallest hash of the symmetric positions, the hash of the canonical form, so
+        caches, books and datasets keyed by it hold one entry per equivalence class. The hashes of
+        the symmetric positions are computed from the stones when asked for, so making and undoing
+        moves doesn't pay for them.
+
+        Returns:
+            int: The 64-bit Zobrist hash of the canonical form, including the player to move.
+        """
+        return min(self._symmetric_position_hashes())
+
+    def canonical_symmetry(self) -> int:
+        """Returns the symmetry mapping the position to its canonical form.
+
+        A move of the position is the move `symmetries(num_rows, num_cols)[index][0][action]` of
+        the canonical form, and the other way around.
+
+        Returns:
+            int: The index of the symmetry in `symmetries`, 0 for the identity.
+        """
+        hashes = self._symmetric_position_hashes()
+        return hashes.index(min(hashes))
+
     def update_player(self):
         """Updates the current player."""
         self.current_player = self.get_opponent(self.current_player)
+        self.hash ^= self._player_key
 
-    def get_info_state(self, player: int = -1) -> np.ndarray:
+    def get_info_state(self, player: int = -1, copy: bool = False) -> np.ndarray:
         """Returns the information state.
 
         We are using information state naming so that we can unify the interface with darkhex
@@ -142,18 +677,85 @@ class HexGame:
 
         Args:
             player (int): The player index. If not specified, the current player is used.
+            copy (bool, optional): Whether to return a copy. Defaults to False, which returns a
+                view of the game's buffer that changes with every move.
 
         Returns:
-            np.ndarray: The information state. The first element is the board, and the rest are the
-                history vector.
+            np.ndarray: The information state. The first num_rows * num_cols elements are the
+                board, and the rest are the history vector padded with -1.
         """
         if player == -1:
             player = self.current_player
-        return np.concatenate((self.board, self.history_vector()))
+        return self._info_state.copy() if copy else self._info_state
+
+    def legal_actions_mask(self) -> np.ndarray:
+        """Returns which actions are legal, for masking the outputs of a policy.
+
+        Like the information state, the mask is kept up to date by the moves instead of being
+        built on every call.
+
+        Returns:
+            np.ndarray: A boolean array with one element per action index, True for the empty
+                cells and all False once the game is over. It is a view that changes with every
+                move, to be copied to keep it.
+        """
+        return self._no_legal_actions if self.done else self._legal_mask
+
+    def legal_actions(self) -> list:
+        """Returns the legal actions, the empty cells unless the game is over, in no order."""
+        return [] if self.done else list(self._empty_cells)
+
+    def random_legal_action(self, rng: random.Random = random) -> int:
+        """Returns a random legal action in constant time.
+
+        Args:
+            rng (random.Random, optional): The random number generator. Defaults to the random
+                module.
+
+        Returns:
+            int: The action, or None if there is none.
+        """
+        if self.done or not self._empty_cells:
+            return None
+        return self._empty_cells[rng.randrange(len(self._empty_cells))]
+
+    def playout(self, rng: random.Random = random) -> int:
+        """Plays the rest of the game at random and returns the winner, leaving the game as it is.
+
+        Instead of making the moves one by one and checking for a win after each, the empty cells
+        are shuffled and filled alternately, starting with the player to move, which gives the
+        same final boards as random moves. A filled board has exactly one winner, found with a
+        single search, and it is also the first player to connect: a connection can't be broken
+        by the stones placed after it.
+
+        Args:
+            rng (random.Random, optional): The random number generator. Defaults to the random
+                module.
+
+        Returns:
+            int: The winning player.
+        """
+        if self.done:
+            return self.winner
+        cells = self.board.tolist()
+        empty = list(self._empty_cells)
+        rng.shuffle(empty)
+        half = (len(empty) + 1) // 2
+        player, opponent = self.current_player, self.get_opponent(self.current_player)
+        for action in empty[:half]:
+            cells[action] = player
+        for action in empty[half:]:
+            cells[action] = opponent
+        return fill_winner(cells, self.num_rows, self.num_cols)
 
     def history_vector(self) -> np.ndarray:
-        """Returns the vectorized version of the history."""
-        return np.array([int(a) for a in self.history.split(",") if a])
+        """Returns the vectorized version of the history, as a view of the game's buffer."""
+        return self._history[: self.num_moves]
+
+    @property
+    def history(self) -> str:
+        """The moves made in the game, as comma terminated action indices."""
+        return "".join(f"{action}," for action in self.history_vector())
 
     def is_valid(self, action: int) -> bool:
         """Checks if the action is a valid move.
@@ -167,17 +769,32 @@ class HexGame:
         return len(self.board) > action >= 0 and self.is_cell_empty(action)
 
     def is_terminal(self, player):
-        """Checks if the game has reached a terminal state for the specified player using BFS.
+        """Checks if the game has reached a terminal state for the specified player.
+
+        The check itself is a lookup in the disjoint-set forest. The winning path is only searched
+        for with BFS once the player is known to be connected.
 
         Args:
             player (int): The player number (1 or 2).
 
         Returns:
             tuple: A tuple containing a boolean value indicating if the game has ended,
-                   and the winning path if the game has ended, otherwise returns (False, None).
+                   and the winning path if the game has ended, otherwise returns (False, []).
         """
-        path = self._bfs(player)
-        return len(path) > 0, path
+        if not self.is_connected(player):
+            return False, []
+        return True, self._bfs(player)
+
+    def win_path(self) -> list:
+        """Returns the winning path once the game is won.
+
+        Returns:
+            list: The (row, col) cells of the shortest path between the winner's edges, empty
+                while the game is not over.
+        """
+        if not self.done:
+            return []
+        return self._bfs(self.winner)
 
     def _bfs(self, player):
         """
@@ -197,32 +814,31 @@ class HexGame:
         )
         target_row = self.num_rows - 1 if player == STATE_PLAYERS[1] else None
         target_col = None if player == STATE_PLAYERS[1] else self.num_cols - 1
-        visited = set()
-        queue = deque(
-            [
-                (r, c, [(r, c)])
-                for r, c in start_cells
-                if self.board[self.row_col_to_action_index(r, c)] == player
-            ]
-        )
+        # Each visited cell points back to the cell it was reached from
+        previous = {
+            (r, c): None
+            for r, c in start_cells
+            if self.board[self.row_col_to_action_index(r, c)] == player
+        }
+        queue = deque(previous)
 
         while queue:
-            r, c, path = queue.popleft()
+            r, c = queue.popleft()
             if (player == STATE_PLAYERS[1] and r == target_row) or \
                (player == STATE_PLAYERS[2] and c == target_col):
-                return path  # Found a path to the other side
-
-            for nr, nc in [
-                (r - 1, c),
-                (r + 1, c),
-                (r, c - 1),
-                (r, c + 1),
-                (r - 1, c + 1),
-                (r + 1, c - 1),
-            ]:
-                if 0 <= nr < self.num_rows and 0 <= nc < self.num_cols and (nr, nc) not in visited:
+                # Found a path to the other side
+                path = []
+                cell = (r, c)
+                while cell is not None:
+                    path.append(cell)
+                    cell = previous[cell]
+                return path[::-1]
+
+            for dr, dc in NEIGHBOR_OFFSETS:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < self.num_rows and 0 <= nc < self.num_cols and (nr, nc) not in previous:
                     if self.board[self.row_col_to_action_index(nr, nc)] == player:
-                        queue.append((nr, nc, path + [(nr, nc)]))
-                        visited.add((nr, nc))
+                        queue.append((nr, nc))
+                        previous[(nr, nc)] = (r, c)
 
         return []  # No path found
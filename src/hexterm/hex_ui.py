@@ -1,18 +1,59 @@
 import curses
+import time
 from typing import Any
 
-from hexterm.game_states import MainMenu
+from hexterm.client import NetworkOpponent
+from hexterm.game_states import AI_PLAYER, MainMenu
 from hexterm.hex_game import HexGame, STATE_EMPTY, STATE_PLAYERS
+from hexterm.layout import board_layout, viewport_size
+from hexterm.profiler import METRICS, Profiler
+from hexterm.scheduler import Scheduler
+
+TICK_DURATION = 0.05  # Longest wait for input, in seconds, before background work is checked
+STATS_KEY = ord("p")  # shows and hides the profiling overlay
+
+
+def _scroll(first: int, current: int, shown: int, total: int) -> int:
+    """Returns the first line of a viewport after scrolling it to show the current line.
+
+    The viewport doesn't move while the current line is in it, and is centered on it otherwise.
+    """
+    if not first <= current < first + shown:
+        first = current - shown // 2
+    return min(max(first, 0), total - shown)
 
 
 class HexUI:
-    def __init__(self, game: HexGame):
+    def __init__(
+        self,
+        game: HexGame,
+        ai_workers: int = 1,
+        save_path: str = "hexterm.save",
+        profiler: Profiler = None,
+    ):
         self.game = game
+        self.ai = None  # the computer or network opponent, if any
+        self.ai_player = AI_PLAYER  # the player the opponent plays
+        self.ai_workers = ai_workers  # processes searching for the AI
+        self.scheduler = Scheduler()  # timers and background tasks of the states
+        self.save_path = save_path  # where 's' saves the game
+        self.profiler = profiler  # times the game loop when profiling, None otherwise
+        self.show_stats = False  # whether the profiling overlay is shown
         self.current_state = MainMenu(self)
         self.init_colors()
 
         self.cell_filled = "⬢"
         self.cell_empty = "⬡"
+        self.cell_hidden = "·"  # on the border where the board continues past the viewport
+
+        # The first row and column of the board in view, when it doesn't fit on the terminal
+        self._view_origin = (0, 0)
+
+        # What the screen shows, to only draw the cells that changed
+        self._drawn_layout = None
+        self._drawn_cells = None
+        self._drawn_cursor = -1
+        self._drawn_win_cells = frozenset()
 
     def init_colors(self):
         # Color setup
@@ -31,6 +72,80 @@ class HexUI:
         self.color_neutral = curses.color_pair(4)
         self.color_text = curses.color_pair(5)
 
+    def invalidate_board(self) -> None:
+        """Forgets what was drawn, so the next draw_board redraws the whole board.
+
+        Must be called whenever the screen is cleared behind the board's back.
+        """
+        self._drawn_layout = None
+
+    def toggle_stats(self, stdscr: Any) -> None:
+        """Shows or hides the profiling overlay.
+
+        A profiler is started with the overlay if the game has none, and stopped with it, so the
+        game loop is only timed while the overlay is shown or a trace is written.
+
+        Args:
+            stdscr (curses.window): The window the overlay is drawn on.
+        """
+        self.show_stats = not self.show_stats
+        if self.show_stats and self.profiler is None:
+            self.profiler = Profiler()
+        elif not self.show_stats and self.profiler.trace_path is None:
+            self.profiler.close()
+            self.profiler = None
+        # The overlay covers part of the screen, which has to be drawn again without it
+        stdscr.erase()
+        self.invalidate_board()
+
+    def draw_stats(self, stdscr: Any) -> None:
+        """Draws the profiling overlay in the top left corner, below the HUD.
+
+        For each metric of the profiler, shows the median and the maximum of its latest samples.
+
+        Args:
+            stdscr (curses.window): The window to draw the overlay on.
+        """
+        summary = self.profiler.summary()
+        lines = [f"{'':<10}{'p50 ms':>8}{'max ms':>8}{'n':>5} "]
+        for metric, label in METRICS.items():
+            if metric in summary:
+                count, median, maximum = summary[metric]
+                lines.append(f"{label:<10}{median * 1000:>8.2f}{maximum * 1000:>8.2f}{count:>5} ")
+            else:
+                lines.append(f"{label:<10}{'-':>8}{'-':>8}{0:>5} ")
+        screen_height, screen_width = stdscr.getmaxyx()
+        for row, line in enumerate(lines[: max(screen_height - 4, 0)]):
+            stdscr.addstr(2 + row, 0, line[: screen_width - 1], self.color_text | curses.A_REVERSE)
+
+    def _cell_style(
+        self, cell: int, cursor: int, win_path: frozenset, display_invalid: bool
+    ) -> tuple:
+        """Returns the symbol and the color a cell is drawn with."""
+        cell_state = self.game.board[cell]
+        symbol = self.cell_empty if cell_state == STATE_EMPTY else self.cell_filled
+        if cell in win_path:
+            color_pair = self.color_win_path
+        elif cell == cursor:
+            # Highlight the current cell
+            if cell_state != STATE_EMPTY and display_invalid:
+                color_pair = self.color_invalid
+            else:
+                color_pair = (
+                    self.color_player_1
+                    if self.game.current_player == STATE_PLAYERS[1]
+                    else self.color_player_2
+                )
+        elif cell_state == STATE_EMPTY:
+            color_pair = self.color_neutral
+        elif cell_state == STATE_PLAYERS[1]:
+            color_pair = self.color_player_1
+        elif cell_state == STATE_PLAYERS[2]:
+            color_pair = self.color_player_2
+        else:
+            raise ValueError(f"Invalid cell state: {cell_state}")
+        return symbol, color_pair
+
     def draw_board(
         self,
         stdscr: Any,
@@ -42,90 +157,91 @@ class HexUI:
         """Draws the game board on the terminal.
 
         The board is drawn in the center of the terminal. The current cell is highlighted with the
-        color of the player whose turn it is.
+        color of the player whose turn it is. If the board doesn't fit on the terminal, only a part
+        of it is drawn, and the view scrolls to keep the current cell in it.
+
+        Only the cells that changed since the last call are drawn: cells whose stone changed, the
+        old and new cursor cells, and the cells entering or leaving the winning path. The whole
+        board is drawn again after invalidate_board, or when the board or terminal size changes.
 
         Args:
             stdscr (curses.window): The window object to draw the game board on.
+            current_row (int): The row of the current cell.
+            current_col (int): The column of the current cell.
             win_path (list, optional): The winning path to highlight. Defaults to None. This is
                 used to highlight the winning path at the end of the game.
             display_invalid (bool, optional): Whether to display the invalid move highlight.
                 Defaults to True.
         """
         self.screen_height, self.screen_width = stdscr.getmaxyx()
+        num_rows, num_cols = self.game.num_rows, self.game.num_cols
+        view = viewport_size(num_rows, num_cols, self.screen_height, self.screen_width)
 
-        # calculate minimum terminal size needed to check if the terminal is too small
-        min_height = self.game.num_rows + 7
-        min_width = 2 * ((self.game.num_cols + 2) * 2 + self.game.num_rows + 2)
-
-        if self.screen_height < min_height or self.screen_width < min_width:
-            stdscr.clear()
+        if view is None:
+            stdscr.erase()
             stdscr.addstr(
                 self.screen_height // 2,
                 self.screen_width // 2 - 10,
                 "Terminal too small",
                 self.color_invalid | curses.A_BOLD,
             )
-            stdscr.refresh()
+            self.invalidate_board()
             return
 
-        # Calculate the starting position to center the board
-        start_y = (self.screen_height - self.game.num_rows) // 2
-        start_x = (self.screen_width - ((2 * self.game.num_cols) + 4 + self.game.num_rows)) // 2
+        self._view_origin = (
+            _scroll(self._view_origin[0], current_row, view[0], num_rows),
+            _scroll(self._view_origin[1], current_col, view[1], num_cols),
+        )
+        layout = board_layout(
+            num_rows, num_cols, self.screen_height, self.screen_width, *self._view_origin
+        )
+        cells, borders = layout
+        if win_path is None:
+            cursor = self.game.row_col_to_action_index(current_row, current_col)
+            win_cells = frozenset()
+        else:
+            cursor = -1
+            win_cells = frozenset(self.game.row_col_to_action_index(*cell) for cell in win_path)
 
-        stdscr.clear()
-        # Draw the top row for showing player color
-        for col in range(self.game.num_cols):
-            pos_y = start_y
-            pos_x = start_x + (col + 1) * 2
-            stdscr.addstr(pos_y, pos_x, self.cell_filled, self.color_player_1)
-
-        for row in range(self.game.num_rows):
-            for col in range(self.game.num_cols):
-                pos_y = start_y + (row + 1)
-                pos_x = start_x + (col + 1) * 2 + (row + 1)
-
-                # Draw the leftmost column for showing player color
-                if col == 0:
-                    stdscr.addstr(pos_y, pos_x - 2, self.cell_filled, self.color_player_2)
-
-                cell = self.game.row_col_to_action_index(row, col)
-                symbol = self.cell_empty if self.game.is_cell_empty(cell) else self.cell_filled
-                cell_state = self.game.board[cell]
-                if win_path and (row, col) in win_path:
-                    color_pair = self.color_win_path
-                elif row == current_row and col == current_col and win_path is None:
-                    # Highlight the current cell
-                    if cell_state != STATE_EMPTY and display_invalid:
-                        color_pair = self.color_invalid
-                    else:
-                        color_pair = (
-                            self.color_player_1
-                            if self.game.current_player == STATE_PLAYERS[1]
-                            else self.color_player_2
-                        )
-                elif cell_state == STATE_EMPTY:
-                    color_pair = self.color_neutral
-                elif cell_state == STATE_PLAYERS[1]:
-                    color_pair = self.color_player_1
-                elif cell_state == STATE_PLAYERS[2]:
-                    color_pair = self.color_player_2
-                else:
-                    raise ValueError(f"Invalid cell state: {cell_state}")
-                stdscr.addstr(pos_y, pos_x, symbol, color_pair)
-
-                # Draw the rightmost column for showing player color
-                if col == self.game.num_cols - 1:
-                    stdscr.addstr(pos_y, pos_x + 2, self.cell_filled, self.color_player_2)
-
-        # Draw the bottom row for showing player color
-        for col in range(self.game.num_cols):
-            pos_y = start_y + (self.game.num_rows + 1)
-            pos_x = start_x + (col + 1) * 2 + (self.game.num_rows + 1)
-            stdscr.addstr(pos_y, pos_x, self.cell_filled, self.color_player_1)
+        board = self.game.board.tolist()
+        if layout is not self._drawn_layout:
+            # Draw the player color borders and every cell
+            for pos_y, pos_x, player in borders:
+                if player == 0:
+                    stdscr.addstr(pos_y, pos_x, self.cell_hidden, self.color_text)
+                    continue
+                color_pair = self.color_player_1 if player == 1 else self.color_player_2
+                stdscr.addstr(pos_y, pos_x, self.cell_filled, color_pair)
+            dirty = range(len(cells))
+        else:
+            dirty = {
+                cell
+                for cell, (state, drawn) in enumerate(zip(board, self._drawn_cells))
+                if state != drawn
+            }
+            dirty.update(cell for cell in (cursor, self._drawn_cursor) if cell >= 0)
+            dirty.update(win_cells.symmetric_difference(self._drawn_win_cells))
+
+        for cell in dirty:
+            if cells[cell] is None:
+                continue  # outside the viewport
+            symbol, color_pair = self._cell_style(cell, cursor, win_cells, display_invalid)
+            pos_y, pos_x = cells[cell]
+            stdscr.addstr(pos_y, pos_x, symbol, color_pair)
+
+        self._drawn_layout = layout
+        self._drawn_cells = board
+        self._drawn_cursor = cursor
+        self._drawn_win_cells = win_cells
 
     def run(self, stdscr: Any) -> None:
         """Runs the game loop.
 
+        Each tick waits for a key until the next timer is due, or for at most TICK_DURATION, so
+        the loop never blocks on input while timers or background tasks of the states are pending.
+        The screen is only rendered again when a key, a timer, a task or the state changed it.
+        With a profiler, the frames and the input handling are recorded.
+
         Args:
             stdscr (curses.window): The window object to draw the game on.
         """
@@ -133,17 +249,68 @@ class HexUI:
         stdscr.clear()
         stdscr.refresh()
 
-        while True:
-            self.current_state.render(stdscr)
+        needs_render = True
+        while self.current_state is not None:
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.watch(self.game, self.ai)
+            if needs_render:
+                # Send the whole frame to the terminal in one update
+                start = time.perf_counter()
+                self.current_state.render(stdscr)
+                if self.show_stats:
+                    self.draw_stats(stdscr)
+                stdscr.noutrefresh()
+                curses.doupdate()
+                if profiler is not None:
+                    state = type(self.current_state).__name__
+                    profiler.record("frame", time.perf_counter() - start, state=state)
+                needs_render = False
+
+            stdscr.timeout(int(self.scheduler.timeout(TICK_DURATION) * 1000))
             key = stdscr.getch()
             if key == ord("q"):
                 break
-            if self.current_state.process_input(key):
+            if key == STATS_KEY:
+                self.toggle_stats(stdscr)
+                needs_render = True
+                continue
+            if key != -1:
+                needs_render = True
+                start = time.perf_counter()
+                state = self.current_state
+                changed = state.process_input(key)
+                if profiler is not None:
+                    name = type(state).__name__
+                    profiler.record("input", time.perf_counter() - start, state=name)
+                if changed:
+                    self.current_state = self.current_state.next_state
+                    continue
+
+            needs_render |= self.scheduler.run_pending()
+            needs_render |= self.current_state.update()
+            if self.current_state.next_state is not None:
                 self.current_state = self.current_state.next_state
-            stdscr.refresh()
-            if self.current_state is None:
-                break
+                needs_render = True
 
+        self.close()
         stdscr.clear()
         stdscr.refresh()
         curses.endwin()
+
+    def close(self) -> None:
+        """Stops the background tasks and releases the opponent and the profiler.
+
+        A network opponent is closed first, which ends a wait for its move on the scheduler's
+        thread that the scheduler would otherwise wait for. The other players are closed once their
+        searches are done.
+        """
+        if isinstance(self.ai, NetworkOpponent):
+            self.ai.close()
+            self.ai = None
+        self.scheduler.close()
+        if self.profiler is not None:
+            self.profiler.close()
+        if self.ai is not None:
+            self.ai.close()
+            self.ai = None
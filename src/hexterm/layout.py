@@ -0,0 +1,86 @@
+from functools import lru_cache
+
+
+def viewport_size(num_rows: int, num_cols: int, screen_height: int, screen_width: int):
+    """Returns how many rows and columns of the board fit on a terminal of the given size.
+
+    Besides the board, the terminal needs room for the HUD: two lines above the board and two
+    below it, with a blank line in between, and a border of player stones around the board.
+
+    Args:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        screen_height (int): The number of lines of the terminal.
+        screen_width (int): The number of columns of the terminal.
+
+    Returns:
+        tuple: The number of rows and columns shown, or None if not even one cell fits.
+    """
+    # Each row is shifted by one column, and each cell takes two columns
+    view_rows = min(num_rows, screen_height - 7)
+    view_cols = min(num_cols, (screen_width - view_rows - 4) // 2)
+    if view_rows < 1 or view_cols < 1:
+        return None
+    return view_rows, view_cols
+
+
+@lru_cache(maxsize=64)
+def board_layout(
+    num_rows: int,
+    num_cols: int,
+    screen_height: int,
+    screen_width: int,
+    first_row: int = 0,
+    first_col: int = 0,
+):
+    """Returns where the board is drawn on a terminal of the given size.
+
+    The board is centered on the terminal, with one row of player 1 stones above and below it and
+    one column of player 2 stones on each side. When the board doesn't fit, only the part of the
+    size given by viewport_size is drawn, starting at the given row and column. Where the board
+    continues past the viewport, the border is a marker of player 0 instead of stones.
+
+    Args:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        screen_height (int): The number of lines of the terminal.
+        screen_width (int): The number of columns of the terminal.
+        first_row (int, optional): The first row of the viewport. Defaults to 0.
+        first_col (int, optional): The first column of the viewport. Defaults to 0.
+
+    Returns:
+        tuple: The (y, x) screen position of every cell by action index, None for the cells
+            outside the viewport, and the (y, x, player) stones of the border, or None if the
+            terminal is too small for a single cell.
+    """
+    view = viewport_size(num_rows, num_cols, screen_height, screen_width)
+    if view is None:
+        return None
+    view_rows, view_cols = view
+    last_row, last_col = first_row + view_rows, first_col + view_cols
+
+    # Calculate the starting position to center the board
+    start_y = (screen_height - view_rows) // 2
+    start_x = (screen_width - ((2 * view_cols) + 4 + view_rows)) // 2
+
+    cells = tuple(
+        (
+            (start_y + view_row + 1, start_x + (col - first_col + 1) * 2 + view_row + 1)
+            if 0 <= view_row < view_rows and first_col <= col < last_col
+            else None
+        )
+        for view_row in range(-first_row, num_rows - first_row)
+        for col in range(num_cols)
+    )
+    top, bottom = (1 if first_row == 0 else 0), (1 if last_row == num_rows else 0)
+    left, right = (2 if first_col == 0 else 0), (2 if last_col == num_cols else 0)
+    borders = []
+    for col in range(view_cols):
+        borders.append((start_y, start_x + (col + 1) * 2, top))
+        borders.append((start_y + view_rows + 1, start_x + (col + 1) * 2 + view_rows + 1, bottom))
+    for row in range(first_row, last_row):
+        pos_y, pos_x = cells[row * num_cols + first_col]
+        borders.append((pos_y, pos_x - 2, left))
+        pos_y, pos_x = cells[row * num_cols + last_col - 1]
+        borders.append((pos_y, pos_x + 2, right))
+    return cells, tuple(borders)
@@ -0,0 +1,314 @@
+import math
+import time
+from typing import Tuple
+
+import numpy as np
+
+from hexterm.hex_game import STATE_EMPTY, HexGame, fill_winner
+
+
+class MCTS:
+    """Monte Carlo tree search player for Hex.
+
+    The tree lives in flat preallocated arrays indexed by node id, instead of one Python object per
+    node. The children of a node are allocated as one contiguous block when the node is expanded,
+    so a node only stores the offset and the size of its block, and selecting a child is a single
+    vectorized UCT computation over that block.
+
+    Children are scored with UCT combined with RAVE (all moves as first), which shares playout
+    results between every node where a move was played and makes the search usable with few
+    playouts. Playouts fill all remaining cells at random and check the winner once at the end,
+    since a full Hex board always has exactly one winner.
+
+    After each real move the subtree of the move becomes the new root, so the statistics gathered
+    for it are reused. Nodes outside of that subtree are reclaimed by compacting the pool once it
+    is half full.
+
+    Attributes:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        time_limit (float): The thinking time per move, in seconds.
+        max_playouts (int): The number of playouts per move. None means no playout limit.
+        exploration (float): The UCT exploration constant.
+        rave_equivalence (float): The number of visits at which UCT and RAVE estimates weigh the
+            same.
+        max_nodes (int): The size of the node pool.
+
+    Methods:
+        select_action: Searches the position of a game and returns the best move.
+        set_position: Moves the root to the position reached by a sequence of moves.
+        root_visits: Returns the moves searched at the root and their visit counts.
+        search: Runs playouts from the current root.
+        advance: Moves the root to the child reached by a move.
+    """
+
+    def __init__(
+        self,
+        num_rows: int,
+        num_cols: int,
+        time_limit: float = 1.0,
+        max_playouts: int = None,
+        exploration: float = 0.2,
+        rave_equivalence: float = 1000,
+        max_nodes: int = 1 << 20,
+        seed: int = None,
+    ):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.time_limit = time_limit
+        self.max_playouts = max_playouts
+        self.exploration = exploration
+        self.rave_equivalence = rave_equivalence
+        self.max_nodes = max_nodes
+        self._rng = np.random.default_rng(seed)
+
+        # Node pool
+        self.visits = np.zeros(max_nodes, dtype=np.int32)
+        self.wins = np.zeros(max_nodes, dtype=np.float32)  # for the player who moved into the node
+        self.amaf_visits = np.zeros(max_nodes, dtype=np.int32)
+        self.amaf_wins = np.zeros(max_nodes, dtype=np.float32)
+        self.action = np.zeros(max_nodes, dtype=np.int16)
+        self.first_child = np.zeros(max_nodes, dtype=np.int32)  # -1 while not expanded
+        self.num_children = np.zeros(max_nodes, dtype=np.int16)
+
+        self._set_root([])
+
+    def _set_root(self, moves: np.ndarray) -> None:
+        """Discards the tree and starts a new one at the position reached by the moves.
+
+        Args:
+            moves (np.ndarray): The actions made since the start of the game.
+        """
+        self._game = HexGame(self.num_rows, self.num_cols)
+        for action in moves:
+            self._game.make(int(action))
+        self.root = 0
+        self._next_free = 1
+        self._clear_nodes(0, 1)
+
+    def _clear_nodes(self, start: int, stop: int) -> None:
+        """Resets the statistics of a range of nodes.
+
+        Args:
+            start (int): The first node.
+            stop (int): The node after the last one.
+        """
+        self.visits[start:stop] = 0
+        self.wins[start:stop] = 0
+        self.amaf_visits[start:stop] = 0
+        self.amaf_wins[start:stop] = 0
+        self.first_child[start:stop] = -1
+        self.num_children[start:stop] = 0
+
+    def select_action(self, game: HexGame) -> int:
+        """Searches the position of a game and returns the best move.
+
+        The tree is reused if the game continues the position searched last time, otherwise it is
+        rebuilt.
+
+        Args:
+            game (HexGame): The game to play a move in. It is not modified.
+
+        Returns:
+            int: The action with the most visits.
+        """
+        self.set_position(game.history_vector())
+        self.search()
+        actions, visits = self.root_visits()
+        return int(actions[np.argmax(visits)])
+
+    def set_position(self, moves: np.ndarray) -> None:
+        """Moves the root to the position reached by a sequence of moves.
+
+        The tree is reused if the moves continue the current root position, otherwise it is
+        rebuilt.
+
+        Args:
+            moves (np.ndarray): The actions made since the start of the game.
+        """
+        known = self._game.history_vector()
+        if len(moves) >= len(known) and np.array_equal(moves[: len(known)], known):
+            for action in moves[len(known) :]:
+                self.advance(int(action))
+        else:
+            self._set_root(moves)
+
+    def root_visits(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the moves searched at the root and their visit counts.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The actions and the number of visits of each.
+        """
+        if self.first_child[self.root] < 0:
+            return np.zeros(0, dtype=np.int16), np.zeros(0, dtype=np.int32)
+        children = self._children(self.root)
+        return self.action[children], self.visits[children]
+
+    def close(self) -> None:
+        """Releases the resources of the player. The search runs in-process, so there are none."""
+
+    def advance(self, action: int) -> None:
+        """Moves the root to the child reached by a move, keeping its subtree.
+
+        Args:
+            action (int): The move made in the root position.
+        """
+        child = None
+        if self.first_child[self.root] >= 0:
+            children = self._children(self.root)
+            matches = np.flatnonzero(self.action[children] == action)
+            if len(matches):
+                child = children.start + int(matches[0])
+
+        self._game.make(action)
+        if child is None:
+            self.root = 0
+            self._next_free = 1
+            self._clear_nodes(0, 1)
+        else:
+            self.root = child
+            if self._next_free > self.max_nodes // 2:
+                self._compact()
+
+    def _compact(self) -> None:
+        """Moves the subtree of the root to the start of the pool, dropping every other node.
+
+        Nodes are copied level by level, which keeps the children of every node contiguous.
+        """
+        levels = [np.array([self.root])]
+        while True:
+            parents = levels[-1]
+            parents = parents[self.first_child[parents] >= 0]
+            if len(parents) == 0:
+                break
+            counts = self.num_children[parents].astype(np.int64)
+            offsets = np.repeat(np.cumsum(counts) - counts, counts)
+            levels.append(
+                np.repeat(self.first_child[parents], counts) + np.arange(counts.sum()) - offsets
+            )
+        order = np.concatenate(levels)
+
+        new_index = np.full(self.max_nodes, -1, dtype=np.int32)
+        new_index[order] = np.arange(len(order))
+        for array in (self.visits, self.wins, self.amaf_visits, self.amaf_wins, self.action):
+            array[: len(order)] = array[order]
+        first_child = self.first_child[order]
+        self.first_child[: len(order)] = np.where(
+            first_child >= 0, new_index[np.maximum(first_child, 0)], -1
+        )
+        self.num_children[: len(order)] = self.num_children[order]
+
+        self.root = 0
+        self._next_free = len(order)
+
+    def _children(self, node: int) -> slice:
+        """Returns the block of children of an expanded node."""
+        first = self.first_child[node]
+        return slice(first, first + self.num_children[node])
+
+    def _expand(self, node: int) -> bool:
+        """Allocates the children of a node, one per empty cell of the current position.
+
+        Args:
+            node (int): The node to expand. The search game must be at its position.
+
+        Returns:
+            bool: True if the node was expanded, False if the pool is full.
+        """
+        actions = np.flatnonzero(self._game.board == STATE_EMPTY)
+        first = self._next_free
+        if first + len(actions) > self.max_nodes:
+            return False
+        self._next_free += len(actions)
+        self._clear_nodes(first, self._next_free)
+        self.action[first : self._next_free] = actions
+        self.first_child[node] = first
+        self.num_children[node] = len(actions)
+        return True
+
+    def _select(self, node: int) -> int:
+        """Returns the child of a node with the best UCT-RAVE score.
+
+        Args:
+            node (int): An expanded node.
+
+        Returns:
+            int: The selected child.
+        """
+        children = self._children(node)
+        visits = self.visits[children]
+        amaf_visits = self.amaf_visits[children]
+        value = self.wins[children] / np.maximum(visits, 1)
+        # Moves that were never seen in a playout are tried first
+        amaf_value = np.where(
+            amaf_visits > 0, self.amaf_wins[children] / np.maximum(amaf_visits, 1), 1.0
+        )
+        beta = np.sqrt(self.rave_equivalence / (3 * visits + self.rave_equivalence))
+        score = (1 - beta) * value + beta * amaf_value
+        score += self.exploration * np.sqrt(math.log(self.visits[node] + 1) / (visits + 1))
+        return children.start + int(np.argmax(score))
+
+    def search(self) -> int:
+        """Runs playouts from the current root until the time or playout budget is spent.
+
+        Returns:
+            int: The number of playouts made.
+        """
+        if self._game.done:
+            return 0
+        if self.first_child[self.root] < 0:
+            self._expand(self.root)
+
+        deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        playouts = 0
+        while self.max_playouts is None or playouts < self.max_playouts:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self._playout()
+            playouts += 1
+        return playouts
+
+    def _playout(self) -> None:
+        """Runs one selection, expansion, simulation and backpropagation step."""
+        game = self._game
+        root_player = game.current_player
+        node = self.root
+        path = [node]
+        winner = None
+        while True:
+            if self.first_child[node] < 0:
+                if self.visits[node] == 0 or not self._expand(node):
+                    break
+            node = self._select(node)
+            path.append(node)
+            if game.make(int(self.action[node])):
+                winner = game.winner
+                break
+
+        if winner is None:
+            # Fill the rest of the board, alternating players from the one to move
+            board = game.board.copy()
+            empty = np.flatnonzero(board == STATE_EMPTY)
+            self._rng.shuffle(empty)
+            half = (len(empty) + 1) // 2
+            board[empty[:half]] = game.current_player
+            board[empty[half:]] = game.get_opponent(game.current_player)
+            winner = fill_winner(board.tolist(), self.num_rows, self.num_cols)
+        else:
+            board = game.board.copy()
+
+        for _ in range(len(path) - 1):
+            game.undo()
+        # Node i of the path was entered by the player to move at the root for odd i
+        path = np.array(path)
+        movers = np.where(np.arange(len(path)) % 2 == 1, root_player, 3 - root_player)
+        self.visits[path] += 1
+        self.wins[path[movers == winner]] += 1
+
+        # All moves as first: a child's move counts if its player played it later on
+        for parent, mover in zip(path[:-1], movers[:-1]):
+            children = self._children(parent)
+            played = board[self.action[children]] == 3 - mover
+            self.amaf_visits[children] += played
+            if winner != mover:
+                self.amaf_wins[children] += played
@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+from multiprocessing.shared_memory import SharedMemory
+from typing import Tuple
+
+import numpy as np
+
+from hexterm.hex_game import STATE_EMPTY, HexGame
+from hexterm.mcts import MCTS
+
+
+def _search_worker(connection, shared_name: str, num_rows: int, num_cols: int, dtype, options):
+    """Runs the tree search of one worker process.
+
+    The worker keeps its own tree between moves. For each request it reads the root position from
+    shared memory, searches it and sends back the visit counts of the root moves.
+
+    Args:
+        connection (multiprocessing.connection.Connection): The pipe to the main process. It
+            receives (time_limit, max_playouts) requests, or None to stop.
+        shared_name (str): The name of the shared memory block holding the info state.
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        dtype (np.dtype): The type of the info state.
+        options (dict): The keyword arguments of the worker's MCTS.
+    """
+    shared = SharedMemory(name=shared_name)
+    num_cells = num_rows * num_cols
+    info_state = np.ndarray((2 * num_cells,), dtype=dtype, buffer=shared.buf)
+    mcts = MCTS(num_rows, num_cols, **options)
+    try:
+        while True:
+            request = connection.recv()
+            if request is None:
+                break
+            mcts.time_limit, mcts.max_playouts = request
+            history = info_state[num_cells:]
+            mcts.set_position(history[history >= 0])
+            playouts = mcts.search()
+            actions, visits = mcts.root_visits()
+            connection.send((actions, visits, playouts))
+    finally:
+        del info_state
+        shared.close()
+
+
+class ParallelMCTS:
+    """Root parallel Monte Carlo tree search over several processes.
+
+    Every worker process grows its own MCTS tree from the same root with a different seed, and the
+    visit counts of the root moves are summed to pick the move. Workers also keep and reuse their
+    trees between moves.
+
+    The root position is the game's info state, copied into a shared memory block before each
+    search, so a request to a worker is only its budget and nothing about the position has to be
+    pickled.
+
+    Attributes:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        num_workers (int): The number of worker processes.
+        time_limit (float): The thinking time per move, in seconds.
+        max_playouts (int): The number of playouts per move and per worker. None means no limit.
+        last_playouts (int): The number of playouts made by all workers in the last search.
+
+    Methods:
+        select_action: Searches the position of a game and returns the best move.
+        search: Searches the position of a game and returns the merged root statistics.
+        close: Stops the workers and releases the shared memory.
+    """
+
+    def __init__(
+        self,
+        num_rows: int,
+        num_cols: int,
+        num_workers: int = None,
+        time_limit: float = 1.0,
+        max_playouts: int = None,
+        seed: int = None,
+        **options,
+    ):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.num_workers = num_workers or os.cpu_count()
+        self.time_limit = time_limit
+        self.max_playouts = max_playouts
+        self.last_playouts = 0
+
+        template = HexGame(num_rows, num_cols).get_info_state()
+        self._shared = SharedMemory(create=True, size=max(template.nbytes, 1))
+        self._info_state = np.ndarray(template.shape, dtype=template.dtype, buffer=self._shared.buf)
+        self._info_state[:] = template
+
+        seeds = np.random.SeedSequence(seed).generate_state(self.num_workers)
+        self._connections = []
+        self._workers = []
+        for worker_seed in seeds:
+            connection, worker_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_search_worker,
+                args=(
+                    worker_connection,
+                    self._shared.name,
+                    num_rows,
+                    num_cols,
+                    template.dtype,
+                    dict(options, seed=int(worker_seed)),
+                ),
+                daemon=True,
+            )
+            worker.start()
+            self._connections.append(connection)
+            self._workers.append(worker)
+
+    def select_action(self, game: HexGame) -> int:
+        """Searches the position of a game on all workers and returns the best move.
+
+        Args:
+            game (HexGame): The game to play a move in. It is not modified.
+
+        Returns:
+            int: The action with the most visits summed over the workers.
+        """
+        actions, visits = self.search(game)
+        return int(actions[np.argmax(visits)])
+
+    def search(self, game: HexGame) -> Tuple[np.ndarray, np.ndarray]:
+        """Searches the position of a game on all workers and merges their root statistics.
+
+        Args:
+            game (HexGame): The game to search. It is not modified.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The legal actions and their total number of visits.
+        """
+        self._info_state[:] = game.get_info_state()
+        for connection in self._connections:
+            connection.send((self.time_limit, self.max_playouts))
+
+        visits = np.zeros(self.num_rows * self.num_cols, dtype=np.int64)
+        self.last_playouts = 0
+        for connection in self._connections:
+            actions, worker_visits, playouts = connection.recv()
+            np.add.at(visits, actions, worker_visits)
+            self.last_playouts += playouts
+        actions = np.flatnonzero(np.asarray(game.board) == STATE_EMPTY)
+        return actions, visits[actions]
+
+    def close(self) -> None:
+        """Stops the workers and releases the shared memory."""
+        if not self._workers:
+            return
+        for connection in self._connections:
+            connection.send(None)
+        for worker in self._workers:
+            worker.join()
+        self._connections = []
+        self._workers = []
+        del self._info_state
+        self._shared.close()
+        self._shared.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
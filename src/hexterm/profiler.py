@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Callable
+
+# What is measured, in the order of the stats overlay, with its label
+METRICS = {
+    "frame": "render",
+    "input": "input",
+    "step": "step",
+    "win_check": "win check",
+    "win_path": "win path",
+    "ai_think": "AI think",
+}
+WINDOW = 200  # latest samples of each metric the overlay summarizes
+# Timed methods of the game and of the opponent, and the metric of each
+GAME_METHODS = {"step": "step", "is_connected": "win_check", "_bfs": "win_path"}
+OPPONENT_METHODS = {"select_action": "ai_think"}
+
+
+class Profiler:
+    """Records how long the parts of the game loop take, for the stats overlay and a trace file.
+
+    The game loop records its frames and input handling itself. The game's `step`, its win check
+    and winning path, and the opponent's `select_action` are timed by wrapping the methods of the
+    objects being played, which `watch` does for the current ones. Nothing is wrapped when the UI
+    has no profiler, so the game runs at full speed without one.
+
+    Each sample can also be written to a JSONL trace file, one object per line with the time since
+    the profiler started in seconds, the metric, the duration in milliseconds, and any extra
+    fields. The AI records its samples from the scheduler's thread, so recording is locked.
+
+    Attributes:
+        trace_path (str): The path of the trace file, None if there is none.
+
+    Methods:
+        record: Records a sample of a metric.
+        timed: Wraps a function to record the time of its calls.
+        watch: Times the methods of the game and the opponent being played.
+        summary: Returns the median and the maximum of the latest samples of each metric.
+        close: Removes the wrappers and closes the trace file.
+    """
+
+    def __init__(self, trace_path: str = None):
+        """Creates a profiler.
+
+        Args:
+            trace_path (str, optional): Where to write the JSONL trace. Defaults to None, which
+                only keeps the latest samples for the overlay.
+        """
+        self.trace_path = trace_path
+        # Line buffered, so the trace is complete up to the last sample even if the game crashes
+        self._trace = open(trace_path, "w", encoding="utf-8", buffering=1) if trace_path else None
+        self._samples = {metric: deque(maxlen=WINDOW) for metric in METRICS}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._game = None  # the watched game and opponent, whose methods are wrapped
+        self._opponent = None
+
+    def record(self, metric: str, seconds: float, **fields) -> None:
+        """Records a sample of a metric.
+
+        Args:
+            metric (str): One of the METRICS keys.
+            seconds (float): The duration.
+            **fields: Extra fields written to the trace, such as the game state.
+        """
+        with self._lock:
+            self._samples[metric].append(seconds)
+            if self._trace is not None:
+                event = {
+                    "time": round(time.perf_counter() - self._start, 6),
+                    "metric": metric,
+                    "ms": round(seconds * 1000, 4),
+                    **fields,
+                }
+                self._trace.write(json.dumps(event) + "\n")
+
+    def timed(self, metric: str, function: Callable) -> Callable:
+        """Wraps a function to record the time of its calls.
+
+        Args:
+            metric (str): The metric the calls are recorded as.
+            function (Callable): The function to time.
+
+        Returns:
+            Callable: The wrapped function.
+        """
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(metric, time.perf_counter() - start)
+
+        return wrapper
+
+    def _wrap(self, target, methods: dict) -> None:
+        """Hides methods of an object behind timed instance attributes."""
+        if target is not None:
+            for name, metric in methods.items():
+                setattr(target, name, self.timed(metric, getattr(target, name)))
+
+    @staticmethod
+    def _unwrap(target, methods: dict) -> None:
+        """Removes the timed instance attributes, uncovering the methods of the class."""
+        if target is not None:
+            for name in methods:
+                target.__dict__.pop(name, None)
+
+    def watch(self, game, opponent=None) -> None:
+        """Times the methods of the game and the opponent being played.
+
+        Cheap to call on every tick: only a new game or opponent is wrapped, and the one it
+        replaces unwrapped.
+
+        Args:
+            game (HexGame): The game, whose `step`, `is_connected` and `_bfs` are timed.
+            opponent (optional): The AI or network opponent, whose `select_action` is timed.
+        """
+        if game is not self._game:
+            self._unwrap(self._game, GAME_METHODS)
+            self._wrap(game, GAME_METHODS)
+            self._game = game
+        if opponent is not self._opponent:
+            self._unwrap(self._opponent, OPPONENT_METHODS)
+            self._wrap(opponent, OPPONENT_METHODS)
+            self._opponent = opponent
+
+    def summary(self) -> dict:
+        """Returns the median and the maximum of the latest samples of each metric.
+
+        Returns:
+            dict: For each metric with samples, the (count, median, maximum) in seconds, the count
+                being of all the samples in the window.
+        """
+        with self._lock:
+            samples = {metric: sorted(values) for metric, values in self._samples.items() if values}
+        return {
+            metric: (len(values), values[len(values) // 2], values[-1])
+            for metric, values in samples.items()
+        }
+
+    def close(self) -> None:
+        """Removes the wrappers and closes the trace file."""
+        self.watch(None, None)
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
@@ -0,0 +1,41 @@
+from array import array
+
+from hexterm.hex_game import STATE_EMPTY, HexGame
+
+
+class PyHexGame(HexGame):
+    """HexGame whose board and history are a Python array, so playing doesn't need NumPy.
+
+    This is the backend of the interactive game: importing it and playing a game doesn't import
+    NumPy, which takes most of the startup time otherwise. Reading single cells is also cheaper
+    than from a NumPy array, since no NumPy scalar is created.
+
+    Like in HexGame the board and the history share one buffer, and `board`, `history_vector` and
+    `get_info_state` are memoryviews of it. They convert to the arrays of HexGame with
+    `np.asarray`, and so does the memoryview of `legal_actions_mask`.
+    """
+
+    def _reset_buffers(self) -> None:
+        """Empties the board and the history."""
+        num_cells = self.num_rows * self.num_cols
+        self._buffer = array("h", [STATE_EMPTY]) * num_cells + array("h", [-1]) * num_cells
+        self._info_state = memoryview(self._buffer)
+        self.board = self._info_state[:num_cells]  # only the board
+        self._history = self._info_state[num_cells:]
+        # Boolean views of bytes, which NumPy reads as boolean arrays
+        self._legal_mask = memoryview(bytearray(b"\x01") * num_cells).cast("?")
+        self._no_legal_actions = memoryview(bytearray(num_cells)).cast("?")
+
+    def get_info_state(self, player: int = -1, copy: bool = False):
+        """Returns the information state.
+
+        Args:
+            player (int): The player index. If not specified, the current player is used.
+            copy (bool, optional): Whether to return a copy, as an array. Defaults to False, which
+                returns a memoryview of the game's buffer that changes with every move.
+
+        Returns:
+            memoryview | array: The information state. The first num_rows * num_cols elements are
+                the board, and the rest are the history vector padded with -1.
+        """
+        return self._buffer[:] if copy else self._info_state
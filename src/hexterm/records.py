@@ -0,0 +1,265 @@
+import os
+import struct
+from typing import Iterable, NamedTuple
+
+import numpy as np
+
+from hexterm.hex_game import HexGame
+
+# Rows, columns, winner (0 if the game is not over) and number of moves, followed by the moves
+RECORD_HEADER = struct.Struct("<BBBH")
+SAVE_MAGIC = b"HXGR"
+ARCHIVE_MAGIC = b"HXGA"
+INDEX_MAGIC = b"HXGI"
+FORMAT_VERSION = 1
+# Magic and version at the start of every file, padded so the index offsets stay aligned
+FILE_HEADER = struct.Struct("<4sB3x")
+INDEX_SUFFIX = ".idx"
+
+
+class GameRecord(NamedTuple):
+    """The moves of a game and its result.
+
+    Attributes:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        winner (int): The winning player, or 0 if the game is not over.
+        moves (np.ndarray): The action indices, starting with player 1.
+    """
+
+    num_rows: int
+    num_cols: int
+    winner: int
+    moves: np.ndarray
+
+    @classmethod
+    def from_game(cls, game: HexGame) -> "GameRecord":
+        """Returns the record of a game."""
+        return cls(game.num_rows, game.num_cols, game.winner or 0, np.array(game.history_vector()))
+
+    def to_game(self, game_class: type = HexGame) -> HexGame:
+        """Returns a game in the position after the record's moves.
+
+        Args:
+            game_class (type, optional): The HexGame class to build. Defaults to HexGame.
+
+        Returns:
+            HexGame: The game.
+        """
+        game = game_class(self.num_rows, self.num_cols)
+        game.load_moves(self.moves)
+        return game
+
+
+def move_dtype(num_rows: int, num_cols: int) -> np.dtype:
+    """Returns the type moves are packed with, one byte per move when the board allows it."""
+    return np.dtype("u1") if num_rows * num_cols <= 256 else np.dtype("<u2")
+
+
+def encode_record(record: GameRecord) -> bytes:
+    """Packs a record into bytes: the header followed by the moves.
+
+    Args:
+        record (GameRecord): The record.
+
+    Returns:
+        bytes: The packed record, 5 bytes plus one or two bytes per move.
+    """
+    header = RECORD_HEADER.pack(record.num_rows, record.num_cols, record.winner, len(record.moves))
+    moves = np.asarray(record.moves).astype(move_dtype(record.num_rows, record.num_cols))
+    return header + moves.tobytes()
+
+
+def decode_record(buffer, offset: int = 0) -> GameRecord:
+    """Unpacks a record from a buffer.
+
+    Args:
+        buffer: Any object supporting the buffer protocol, such as bytes or a memory map.
+        offset (int, optional): The position of the record in the buffer. Defaults to 0.
+
+    Returns:
+        GameRecord: The record. Its moves are a read-only view of the buffer.
+    """
+    num_rows, num_cols, winner, num_moves = RECORD_HEADER.unpack_from(buffer, offset)
+    moves = np.frombuffer(
+        buffer,
+        dtype=move_dtype(num_rows, num_cols),
+        count=num_moves,
+        offset=offset + RECORD_HEADER.size,
+    )
+    return GameRecord(num_rows, num_cols, winner, moves)
+
+
+def _check_file_header(path: str, header: bytes, magic: bytes) -> None:
+    """Raises a ValueError if a file header doesn't match the expected magic and version."""
+    if len(header) < FILE_HEADER.size or FILE_HEADER.unpack_from(header) != (
+        magic,
+        FORMAT_VERSION,
+    ):
+        raise ValueError(f"{path} is not a hexterm file of the expected type and version")
+
+
+def save_game(path: str, game: HexGame) -> None:
+    """Saves a game to a file.
+
+    Args:
+        path (str): The path of the file.
+        game (HexGame): The game to save.
+    """
+    with open(path, "wb") as save_file:
+        save_file.write(FILE_HEADER.pack(SAVE_MAGIC, FORMAT_VERSION))
+        save_file.write(encode_record(GameRecord.from_game(game)))
+
+
+def load_game(path: str, game_class: type = HexGame) -> HexGame:
+    """Loads a game saved with `save_game`.
+
+    Args:
+        path (str): The path of the file.
+        game_class (type, optional): The HexGame class to build. Defaults to HexGame.
+
+    Returns:
+        HexGame: The game, in the saved position.
+
+    Raises:
+        ValueError: If the file is not a saved game.
+    """
+    with open(path, "rb") as save_file:
+        data = save_file.read()
+    _check_file_header(path, data, SAVE_MAGIC)
+    return decode_record(data, FILE_HEADER.size).to_game(game_class)
+
+
+class GameArchive:
+    """Append-only file of game records, with an index to load any game by its id.
+
+    The archive is two files: the records packed one after the other, and next to it an index of
+    the byte offset of every record, as 64-bit integers. A game's id is its position in the index.
+    Reading memory maps both files, so loading one game only touches the pages holding its offset
+    and its record, however large the archive is.
+
+    Records are written before their offsets, so an interrupted append leaves at worst some
+    unreachable bytes at the end of the records and never an offset to a partial record.
+
+    Attributes:
+        path (str): The path of the records file. The index is at path + INDEX_SUFFIX.
+        readonly (bool): Whether the archive was opened for reading only.
+
+    Methods:
+        append: Adds a game or a record, and returns its id.
+        extend: Adds several games or records in one write.
+        record: Returns the record of a game by id.
+        load: Returns a game by id, in its final position.
+        close: Releases the files.
+    """
+
+    def __init__(self, path: str, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self._index_path = path + INDEX_SUFFIX
+        if not readonly and not os.path.exists(path):
+            with open(path, "wb") as data_file:
+                data_file.write(FILE_HEADER.pack(ARCHIVE_MAGIC, FORMAT_VERSION))
+            with open(self._index_path, "wb") as index_file:
+                index_file.write(FILE_HEADER.pack(INDEX_MAGIC, FORMAT_VERSION))
+        for file_path, magic in ((path, ARCHIVE_MAGIC), (self._index_path, INDEX_MAGIC)):
+            with open(file_path, "rb") as archive_file:
+                _check_file_header(file_path, archive_file.read(FILE_HEADER.size), magic)
+
+        self._data_file = None if readonly else open(path, "ab")
+        self._index_file = None if readonly else open(self._index_path, "ab")
+        self._data = None  # memory maps, refreshed when games are appended
+        self._offsets = None
+
+    def __len__(self) -> int:
+        return (os.path.getsize(self._index_path) - FILE_HEADER.size) // 8
+
+    def append(self, game) -> int:
+        """Adds a game or a record to the archive.
+
+        Args:
+            game (HexGame | GameRecord): The game to add.
+
+        Returns:
+            int: The id of the game.
+        """
+        return self.extend([game])[0]
+
+    def extend(self, games: Iterable) -> range:
+        """Adds several games or records to the archive in one write.
+
+        Args:
+            games (Iterable[HexGame | GameRecord]): The games to add.
+
+        Returns:
+            range: The ids of the games.
+
+        Raises:
+            ValueError: If the archive is read-only.
+        """
+        if self.readonly:
+            raise ValueError(f"{self.path} was opened read-only")
+        first_id = len(self)
+        offset = self._data_file.seek(0, os.SEEK_END)
+        chunks = []
+        offsets = []
+        for game in games:
+            record = game if isinstance(game, GameRecord) else GameRecord.from_game(game)
+            chunk = encode_record(record)
+            chunks.append(chunk)
+            offsets.append(offset)
+            offset += len(chunk)
+        self._data_file.write(b"".join(chunks))
+        self._data_file.flush()
+        self._index_file.write(np.asarray(offsets, dtype="<u8").tobytes())
+        self._index_file.flush()
+        return range(first_id, first_id + len(offsets))
+
+    def record(self, game_id: int) -> GameRecord:
+        """Returns the record of a game.
+
+        Args:
+            game_id (int): The id returned when the game was added.
+
+        Returns:
+            GameRecord: The record, whose moves are a view of the memory map.
+
+        Raises:
+            IndexError: If there is no game with this id.
+        """
+        if (self._offsets is None or game_id >= len(self._offsets)) and len(self):
+            self._map()
+        if self._offsets is None or not 0 <= game_id < len(self._offsets):
+            raise IndexError(f"No game {game_id} in {self.path}")
+        return decode_record(self._data, int(self._offsets[game_id]))
+
+    def load(self, game_id: int, game_class: type = HexGame) -> HexGame:
+        """Returns a game in its final position.
+
+        Args:
+            game_id (int): The id returned when the game was added.
+            game_class (type, optional): The HexGame class to build. Defaults to HexGame.
+
+        Returns:
+            HexGame: The game.
+        """
+        return self.record(game_id).to_game(game_class)
+
+    def _map(self) -> None:
+        """Memory maps the records and the index as they are now."""
+        self._data = np.memmap(self.path, dtype=np.uint8, mode="r")
+        self._offsets = np.memmap(self._index_path, dtype="<u8", mode="r", offset=FILE_HEADER.size)
+
+    def close(self) -> None:
+        """Releases the files."""
+        if not self.readonly:
+            self._data_file.close()
+            self._index_file.close()
+        self._data = None
+        self._offsets = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
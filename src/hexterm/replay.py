@@ -0,0 +1,133 @@
+from hexterm.hex_game import STATE_EMPTY, STATE_PLAYERS, HexGame
+from hexterm.py_game import PyHexGame
+
+KEYFRAME_INTERVAL = 32  # moves between two saved positions
+
+
+class Replay:
+    """Moves through the positions of a recorded game, to review it.
+
+    Reaching a position by playing the game's moves from the start costs one move per move played.
+    Instead, the board and history of every KEYFRAME_INTERVAL-th position are saved, and a seek
+    starts from the closest keyframe at or before the target, or from the current position when
+    it is closer. A seek applies or takes back at most KEYFRAME_INTERVAL moves, however long the
+    game, plus a copy of the keyframe. Keyframes are saved the first time a seek needs them.
+
+    The position is shown on `game`, whose board, history, player and result follow the seeks. Its
+    connectivity, hash and legal moves don't, as nothing is played on it: it is only drawn.
+
+    Attributes:
+        moves (list): The action indices of the game, starting with player 1.
+        winner (int): The winning player, or 0 if the game is not over.
+        game (HexGame): The game in the current position.
+        position (int): The number of moves played in the current position.
+
+    Methods:
+        from_game: Creates the replay of a game.
+        seek: Moves to the position after some number of moves.
+        step: Moves forwards or backwards by some number of moves.
+        last_move: Returns the last move played in the current position.
+        win_path: Returns the winning path at the end of a won game.
+    """
+
+    def __init__(
+        self,
+        num_rows: int,
+        num_cols: int,
+        moves,
+        winner: int = 0,
+        game_class: type = PyHexGame,
+        interval: int = KEYFRAME_INTERVAL,
+    ):
+        """Creates the replay of a game, in its starting position.
+
+        Args:
+            num_rows (int): The number of rows in the game board.
+            num_cols (int): The number of columns in the game board.
+            moves (Sequence[int]): The action indices of the game, starting with player 1.
+            winner (int, optional): The winning player. Defaults to 0, for a game not over.
+            game_class (type, optional): The HexGame class the position is shown on. Defaults to
+                PyHexGame.
+            interval (int, optional): The moves between two keyframes. Defaults to
+                KEYFRAME_INTERVAL.
+        """
+        self.moves = [int(action) for action in moves]
+        self.winner = winner
+        self.game = game_class(num_rows, num_cols)
+        self.position = 0
+        self._interval = interval
+        self._num_cells = num_rows * num_cols
+        self._state = self.game.get_info_state()  # the board followed by the history
+        self._keyframes = [self.game.get_info_state(copy=True)]
+
+    @classmethod
+    def from_game(cls, game: HexGame, game_class: type = PyHexGame) -> "Replay":
+        """Creates the replay of a game, in its starting position."""
+        return cls(
+            game.num_rows, game.num_cols, game.history_vector(), game.winner or 0, game_class
+        )
+
+    def _forward(self) -> None:
+        """Plays the next move."""
+        action = self.moves[self.position]
+        self._state[action] = STATE_PLAYERS[1] if self.position % 2 == 0 else STATE_PLAYERS[2]
+        self._state[self._num_cells + self.position] = action
+        self.position += 1
+
+    def _backward(self) -> None:
+        """Takes back the last move."""
+        self.position -= 1
+        self._state[self.moves[self.position]] = STATE_EMPTY
+        self._state[self._num_cells + self.position] = -1
+
+    def _restore(self, index: int) -> None:
+        """Moves to the position of a keyframe, saving the keyframes missing before it."""
+        while len(self._keyframes) <= index:
+            self._restore(len(self._keyframes) - 1)
+            for _ in range(self._interval):
+                self._forward()
+            self._keyframes.append(self.game.get_info_state(copy=True))
+        self._state[:] = self._keyframes[index]
+        self.position = index * self._interval
+
+    def seek(self, position: int) -> None:
+        """Moves to the position after some number of moves.
+
+        Args:
+            position (int): The number of moves, clipped to the moves of the game.
+        """
+        position = min(max(position, 0), len(self.moves))
+        index = position // self._interval
+        if abs(position - self.position) > position - index * self._interval:
+            self._restore(index)
+        while self.position < position:
+            self._forward()
+        while self.position > position:
+            self._backward()
+
+        # Like after playing the moves, the winner stays the current player
+        game = self.game
+        game.num_moves = position
+        game.done = position == len(self.moves) and self.winner != 0
+        game.winner = self.winner if game.done else None
+        if game.done:
+            game.current_player = self.winner
+        else:
+            game.current_player = STATE_PLAYERS[1] if position % 2 == 0 else STATE_PLAYERS[2]
+
+    def step(self, moves: int) -> None:
+        """Moves forwards, or backwards for a negative number, by some number of moves."""
+        self.seek(self.position + moves)
+
+    def last_move(self):
+        """Returns the last move played in the current position, None at the start."""
+        return self.moves[self.position - 1] if self.position else None
+
+    def win_path(self) -> list:
+        """Returns the (row, col) cells of the winning path, empty unless at the end of a won game.
+
+        The path is searched on the board, as the game's connectivity isn't kept up to date.
+        """
+        if not self.game.done:
+            return []
+        return self.game._bfs(self.winner)
@@ -0,0 +1,313 @@
+import math
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+from hexterm.hex_game import STATE_EMPTY, STATE_PLAYERS, neighbor_table
+
+EMPTY_RESISTANCE = 1.0  # of an empty cell
+STONE_RESISTANCE = 0.01  # of a cell holding a stone of the player whose network it is
+MAX_RESISTANCE = 1e9  # reported when the player is cut off from one of their edges
+CG_TOLERANCE = 1e-6  # norm of the residual currents at which the solver stops
+
+
+@lru_cache(maxsize=None)
+def network_structure(num_rows: int, num_cols: int) -> Tuple[np.ndarray, np.ndarray, dict]:
+    """Returns the sparsity structure of the resistor networks of a board of the given size.
+
+    Every cell is a node, linked to its neighbors with the six-neighbor geometry of the game. The
+    networks of both players have the same structure, only the conductances differ. Rows are padded
+    to six links with a dummy node, num_rows * num_cols, which is never connected.
+
+    Args:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+
+    Returns:
+        tuple: The (cells + 1, 6) neighbor of every link, the (cells + 1, 6) slot of the same link
+            in the neighbor's row, and for each player the masks of the cells touching their first
+            and second edge.
+    """
+    num_cells = num_rows * num_cols
+    links = np.full((num_cells + 1, 6), num_cells, dtype=np.int64)
+    for cell, neighbors in enumerate(neighbor_table(num_rows, num_cols)):
+        links[cell, : len(neighbors)] = neighbors
+    reverse = np.zeros_like(links)
+    for cell in range(num_cells):
+        for slot, neighbor in enumerate(links[cell]):
+            if neighbor < num_cells:
+                reverse[cell, slot] = np.flatnonzero(links[neighbor] == cell)[0]
+
+    rows, cols = np.divmod(np.arange(num_cells + 1), num_cols)
+    real = np.arange(num_cells + 1) < num_cells
+    edges = {
+        STATE_PLAYERS[1]: (real & (rows == 0), real & (rows == num_rows - 1)),
+        STATE_PLAYERS[2]: (real & (cols == 0), real & (cols == num_cols - 1)),
+    }
+    for array in (links, reverse, *edges[1], *edges[2]):
+        array.flags.writeable = False
+    return links, reverse, edges
+
+
+def _conductance(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Returns the conductance of two resistances in series, 0 if either is infinite."""
+    with np.errstate(divide="ignore"):
+        return np.where(np.isinf(first) | np.isinf(second), 0.0, 1.0 / (first + second))
+
+
+class ResistanceEvaluator:
+    """Evaluates Hex positions by modeling each player's connection as a resistor network.
+
+    For each player, every cell is a resistor: an empty cell has EMPTY_RESISTANCE, a stone of the
+    player STONE_RESISTANCE and a stone of the opponent is an open circuit. A unit voltage is put
+    across the player's two edges, and the total resistance between them measures how far the
+    player is from connecting: the more and the shorter the paths left, the lower it is.
+
+    A player is cut off when the opponent's stones leave no path between their edges, so the
+    network conducts no current. The solver's currents are only exact to its tolerance, which
+    can't tell a cut off network from a very resistive one, so cut off networks are found by
+    following the links from the first edge beforehand. They get MAX_RESISTANCE and aren't solved.
+
+    The voltages are the solution of a sparse linear system, the Laplacian of the network. Its
+    structure is built once per board size. The conductances are kept between evaluations, so
+    following a game only recomputes the links of the cells that changed. The system is solved with
+    the conjugate gradient method, with the previous voltages as the starting point. Solves are
+    batched: the networks of both players, and of every candidate move, are solved together.
+
+    Attributes:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        board (np.ndarray): The board the networks were last updated for.
+
+    Methods:
+        update: Updates the networks for a new board.
+        resistances: Returns the resistance of each player's network.
+        evaluate: Returns how much better a player is connected than the opponent.
+        evaluate_moves: Evaluates the position after each of several moves.
+    """
+
+    def __init__(self, num_rows: int, num_cols: int):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        num_cells = num_rows * num_cols
+        self._links, self._reverse, self._edges = network_structure(num_rows, num_cols)
+        self.board = np.full(num_cells, STATE_EMPTY, dtype=np.int8)
+
+        # The networks of player 1 and 2, each with a row for the dummy node
+        self._resistance = np.full((2, num_cells + 1), EMPTY_RESISTANCE)
+        self._resistance[:, num_cells] = np.inf
+        self._links_conductance = np.zeros((2, num_cells + 1, 6))
+        self._source = np.zeros((2, num_cells + 1))  # conductance to the first edge, at voltage 1
+        self._sink = np.zeros((2, num_cells + 1))  # conductance to the second edge, at voltage 0
+        self._voltages = np.zeros((2, num_cells + 1))
+        self._connected = np.ones(2, dtype=bool)  # whether each network links its two edges
+        self._update_cells(np.arange(num_cells))
+        self._solved = False
+
+    def _cell_resistance(self, stones: np.ndarray) -> np.ndarray:
+        """Returns the resistance of cells in the networks of both players, shape (2, cells)."""
+        resistance = np.full((2,) + stones.shape, EMPTY_RESISTANCE)
+        for index, player in enumerate(STATE_PLAYERS.values()):
+            resistance[index, stones == player] = STONE_RESISTANCE
+            resistance[index, stones == 3 - player] = np.inf
+        return resistance
+
+    def _update_cells(self, cells: np.ndarray) -> None:
+        """Recomputes the links of some cells after their stones changed."""
+        self._resistance[:, cells] = self._cell_resistance(self.board[cells])
+        neighbors = self._links[cells]
+        conductance = _conductance(self._resistance[:, cells, None], self._resistance[:, neighbors])
+        self._links_conductance[:, cells] = conductance
+        self._links_conductance[:, neighbors, self._reverse[cells]] = conductance
+        # The dummy node stays disconnected
+        self._links_conductance[:, -1] = 0.0
+
+        edge_conductance = _conductance(self._resistance[:, cells], np.zeros(len(cells)))
+        for index, player in enumerate(STATE_PLAYERS.values()):
+            first_edge, second_edge = self._edges[player]
+            self._source[index, cells] = np.where(first_edge[cells], edge_conductance[index], 0.0)
+            self._sink[index, cells] = np.where(second_edge[cells], edge_conductance[index], 0.0)
+
+    def update(self, board) -> None:
+        """Updates the networks for a new board, only touching the cells that changed.
+
+        Args:
+            board: The board, such as HexGame.board.
+        """
+        board = np.asarray(board)
+        changed = np.flatnonzero(board != self.board)
+        if len(changed):
+            self.board[changed] = board[changed]
+            self._update_cells(changed)
+            self._solved = False
+
+    def _edges_connected(
+        self, links_conductance: np.ndarray, source: np.ndarray, sink: np.ndarray
+    ) -> np.ndarray:
+        """Returns whether the two edges of each network of a batch are linked by some path.
+
+        The cells reached from the first edge grow by one link per step, for all the networks at
+        once, until the second edge is reached or nothing new is.
+
+        Args:
+            links_conductance (np.ndarray): The link conductances, shape (batch, cells + 1, 6).
+            source (np.ndarray): The conductances to the first edges, shape (batch, cells + 1).
+            sink (np.ndarray): The conductances to the second edges, shape (batch, cells + 1).
+
+        Returns:
+            np.ndarray: True for the networks that conduct, shape (batch,).
+        """
+        linked = links_conductance > 0
+        reached = source > 0
+        at_sink = sink > 0
+        connected = (reached & at_sink).any(axis=-1)
+        growing = ~connected
+        while growing.any():
+            grown = reached[growing] | (linked[growing] & reached[growing][:, self._links]).any(-1)
+            changed = (grown != reached[growing]).any(axis=-1)
+            reached[growing] = grown
+            connected[growing] = (grown & at_sink[growing]).any(axis=-1)
+            growing[growing] = changed & ~connected[growing]
+        return connected
+
+    def _solve(
+        self,
+        links_conductance: np.ndarray,
+        source: np.ndarray,
+        sink: np.ndarray,
+        start: np.ndarray,
+        connected: np.ndarray,
+    ) -> np.ndarray:
+        """Solves a batch of networks and returns their voltages.
+
+        Uses the conjugate gradient method with a Jacobi preconditioner. Nodes without any
+        conductance, like the opponent's stones and the dummy node, are left at voltage 0. Networks
+        that are cut off are not solved, their voltages are left at the initial guess.
+
+        Args:
+            links_conductance (np.ndarray): The link conductances, shape (batch, cells + 1, 6).
+            source (np.ndarray): The conductances to the first edges, shape (batch, cells + 1).
+            sink (np.ndarray): The conductances to the second edges, shape (batch, cells + 1).
+            start (np.ndarray): The initial guess of the voltages, shape (batch, cells + 1).
+            connected (np.ndarray): Whether each network links its edges, shape (batch,).
+
+        Returns:
+            np.ndarray: The voltages, shape (batch, cells + 1).
+        """
+        links = self._links
+        diagonal = links_conductance.sum(axis=-1) + source + sink
+        isolated = diagonal == 0
+        inverse_diagonal = np.where(isolated, 0.0, 1.0 / np.where(isolated, 1.0, diagonal))
+
+        def apply(voltages: np.ndarray) -> np.ndarray:
+            return diagonal * voltages - (links_conductance * voltages[:, links]).sum(axis=-1)
+
+        voltages = np.where(isolated, 0.0, start)
+        residual = source - apply(voltages)
+        direction = inverse_diagonal * residual
+        rho = (residual * direction).sum(axis=-1)
+        for _ in range(10 * len(links)):
+            active = connected & (np.linalg.norm(residual, axis=-1) > CG_TOLERANCE)
+            if not active.any():
+                break
+            product = apply(direction)
+            curvature = (direction * product).sum(axis=-1)
+            alpha = np.where(active, rho / np.where(active, curvature, 1.0), 0.0)
+            voltages += alpha[:, None] * direction
+            residual -= alpha[:, None] * product
+            preconditioned = inverse_diagonal * residual
+            new_rho = (residual * preconditioned).sum(axis=-1)
+            beta = np.where(active, new_rho / np.where(rho == 0, 1.0, rho), 0.0)
+            direction = preconditioned + beta[:, None] * direction
+            rho = new_rho
+        return voltages
+
+    @staticmethod
+    def _total_resistance(
+        source: np.ndarray, voltages: np.ndarray, connected: np.ndarray
+    ) -> np.ndarray:
+        """Returns the resistance between the edges, from the current leaving the first edge."""
+        current = (source * (1.0 - voltages)).sum(axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            resistance = np.minimum(1.0 / current, MAX_RESISTANCE)
+        return np.where(connected & (current > 0), resistance, MAX_RESISTANCE)
+
+    def resistances(self) -> np.ndarray:
+        """Returns the resistance between the edges of each player.
+
+        Returns:
+            np.ndarray: The resistances of player 1 and 2. Smaller is better connected, and
+                MAX_RESISTANCE means the player can't connect anymore.
+        """
+        if not self._solved:
+            self._connected = self._edges_connected(
+                self._links_conductance, self._source, self._sink
+            )
+            self._voltages = self._solve(
+                self._links_conductance, self._source, self._sink, self._voltages, self._connected
+            )
+            self._solved = True
+        return self._total_resistance(self._source, self._voltages, self._connected)
+
+    def evaluate(self, player: int) -> float:
+        """Returns how much better a player is connected than the opponent.
+
+        Args:
+            player (int): The player. Must be one of the STATE_PLAYERS values.
+
+        Returns:
+            float: The log of the ratio of the opponent's resistance to the player's. Positive
+                when the player is better connected.
+        """
+        resistance = self.resistances()
+        return math.log(resistance[2 - player] / resistance[player - 1])
+
+    def evaluate_moves(self, actions, player: int) -> np.ndarray:
+        """Evaluates the positions after each of several moves, in one batched solve.
+
+        Each move only changes the links of its cell, so the networks of all the moves are copies of
+        the current ones with those links replaced, solved together for both players.
+
+        Args:
+            actions (Sequence[int]): Empty cells to play, one move each.
+            player (int): The player making the moves.
+
+        Returns:
+            np.ndarray: The `evaluate` value of each move for the player.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        num_moves = len(actions)
+        batch = np.arange(num_moves)[:, None]
+        neighbors = self._links[actions]
+        slots = self._reverse[actions]
+
+        resistance_after = self._cell_resistance(np.full(num_moves, player))
+        links_conductance = np.repeat(self._links_conductance[:, None], num_moves, axis=1)
+        source = np.repeat(self._source[:, None], num_moves, axis=1)
+        sink = np.repeat(self._sink[:, None], num_moves, axis=1)
+        for index, edge_player in enumerate(STATE_PLAYERS.values()):
+            conductance = _conductance(
+                resistance_after[index][:, None], self._resistance[index][neighbors]
+            )
+            links_conductance[index, batch[:, 0], actions] = conductance
+            links_conductance[index, batch, neighbors, slots] = conductance
+            links_conductance[index, :, -1] = 0.0
+            edge_conductance = _conductance(resistance_after[index], np.zeros(num_moves))
+            first_edge, second_edge = self._edges[edge_player]
+            source[index, batch[:, 0], actions] = np.where(
+                first_edge[actions], edge_conductance, 0.0
+            )
+            sink[index, batch[:, 0], actions] = np.where(
+                second_edge[actions], edge_conductance, 0.0
+            )
+
+        self.resistances()  # the current voltages are the starting point
+        start = np.repeat(self._voltages[:, None], num_moves, axis=1)
+        shape = (2 * num_moves, -1)
+        links_conductance = links_conductance.reshape(shape + (6,))
+        source, sink = source.reshape(shape), sink.reshape(shape)
+        connected = self._edges_connected(links_conductance, source, sink)
+        voltages = self._solve(links_conductance, source, sink, start.reshape(shape), connected)
+        resistance = self._total_resistance(source, voltages, connected).reshape(2, num_moves)
+        return np.log(resistance[2 - player] / resistance[player - 1])
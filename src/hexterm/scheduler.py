@@ -0,0 +1,138 @@
+import heapq
+import itertools
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+
+class Timer:
+    """A callback scheduled to run once after a delay.
+
+    Attributes:
+        deadline (float): The time.monotonic() time the callback is due at.
+        callback (Callable): The function to call, without arguments.
+        cancelled (bool): Whether the timer was cancelled before running.
+    """
+
+    __slots__ = ("deadline", "callback", "cancelled")
+
+    def __init__(self, deadline: float, callback: Callable):
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Stops the timer from running. Does nothing if it already ran."""
+        self.cancelled = True
+
+
+class Scheduler:
+    """Runs timers and background tasks for a loop that also waits for input.
+
+    The loop waits for input for at most timeout() seconds, then calls run_pending(). Timer
+    callbacks and the completion callbacks of background tasks all run inside run_pending, on the
+    loop's thread, so they can change the game and the UI without locking.
+
+    Background tasks run on a worker thread. They must not change state that the loop reads, and
+    should be given what they need as arguments.
+
+    Methods:
+        call_later: Schedules a callback after a delay.
+        submit: Runs a function in the background and its completion callback on the loop.
+        busy: Checks if background tasks are still running.
+        timeout: Returns how long the loop may wait for input.
+        run_pending: Runs the due timers and the callbacks of finished tasks.
+        close: Waits for the background tasks and stops the worker thread.
+    """
+
+    def __init__(self):
+        # Heap of (deadline, sequence, timer), the sequence keeps timers with equal deadlines FIFO
+        self._timers = []
+        self._sequence = itertools.count()
+        self._tasks = []  # (future, completion callback)
+        self._executor = None  # started by the first background task
+
+    def call_later(self, delay: float, callback: Callable) -> Timer:
+        """Schedules a callback after a delay.
+
+        Args:
+            delay (float): The delay in seconds.
+            callback (Callable): The function to call, without arguments.
+
+        Returns:
+            Timer: The timer, which can be cancelled.
+        """
+        timer = Timer(time.monotonic() + delay, callback)
+        heapq.heappush(self._timers, (timer.deadline, next(self._sequence), timer))
+        return timer
+
+    def submit(self, function: Callable, *args, on_done: Callable = None) -> Future:
+        """Runs a function in the background and its completion callback on the loop.
+
+        Args:
+            function (Callable): The function to run on the worker thread.
+            *args: The arguments of the function.
+            on_done (Callable, optional): Called on the loop with the result of the function.
+                Defaults to None.
+
+        Returns:
+            Future: The future of the function's result.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        future = self._executor.submit(function, *args)
+        self._tasks.append((future, on_done))
+        return future
+
+    def busy(self) -> bool:
+        """Checks if background tasks are still running."""
+        return bool(self._tasks)
+
+    def timeout(self, max_wait: float) -> float:
+        """Returns how long the loop may wait for input before it has to call run_pending.
+
+        Args:
+            max_wait (float): The longest wait in seconds. Background tasks are polled this often.
+
+        Returns:
+            float: The time to wait in seconds, zero if a timer is already due.
+        """
+        while self._timers and self._timers[0][2].cancelled:
+            heapq.heappop(self._timers)
+        if not self._timers:
+            return max_wait
+        return min(max_wait, max(0.0, self._timers[0][0] - time.monotonic()))
+
+    def run_pending(self) -> bool:
+        """Runs the due timers and the callbacks of finished tasks.
+
+        Exceptions raised by background tasks are raised again here.
+
+        Returns:
+            bool: True if any callback ran.
+        """
+        ran = False
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            _, _, timer = heapq.heappop(self._timers)
+            if not timer.cancelled:
+                timer.callback()
+                ran = True
+
+        finished = [task for task in self._tasks if task[0].done()]
+        for task in finished:
+            self._tasks.remove(task)
+            future, on_done = task
+            result = future.result()
+            if on_done is not None:
+                on_done(result)
+            ran = True
+        return ran
+
+    def close(self) -> None:
+        """Waits for the background tasks and stops the worker thread."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._tasks = []
+        self._timers = []
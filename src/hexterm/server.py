@@ -0,0 +1,272 @@
+"""Game server hosting many network games of Hex in one process, with asyncio.
+
+The protocol is one command per line, in ASCII. A client asks for a game, is paired with the next
+client asking for the same board size, and both are told which player they are. Moves are sent by
+action index and every accepted move is sent back to both players:
+
+    client: PLAY <size>           server: WAIT, then START <game id> <size> <player>
+    client: MOVE <action>         server (to both): MOVE <player> <action>
+                                  server (to both, when the move wins): END <winner>
+    client: QUIT                  server (to the opponent): LEFT
+                                  server: ERROR <reason> for anything it can't accept
+
+After END or LEFT the client may send PLAY again. Anyone can watch a running game from a plain
+terminal, e.g. with `nc`, without a curses client:
+
+    client: WATCH <game id>       server: the board as ANSI escape sequences, redrawn after every
+                                  move, and the connection is closed when the game ends
+
+Run a server with:
+
+    python -m hexterm.server --port 7878
+"""
+import argparse
+import asyncio
+import itertools
+import sys
+
+from hexterm.bitboard import BitboardHexGame
+from hexterm.broadcast import Broadcaster
+from hexterm.client import DEFAULT_PORT
+
+MAX_SIZE = 27
+MAX_LINE = 64  # longest command the server reads, in bytes
+
+
+def _parse_int(arguments: list):
+    """Returns the single number argument of a command, or None if there isn't exactly one."""
+    if len(arguments) != 1 or not arguments[0].isdigit():
+        return None
+    return int(arguments[0])
+
+
+class Session:
+    """A game between two connections.
+
+    Only the game, whose board is a bitboard plus a small array, and the two writers are kept, so
+    a server can hold thousands of sessions. The broadcaster is only created for the games someone
+    watches.
+
+    Attributes:
+        game_id (int): The id of the game on the server.
+        game (BitboardHexGame): The game.
+        writers (dict): The stream writer of each player.
+        broadcaster (Broadcaster): Sends the game to its viewers, None until it has one.
+    """
+
+    __slots__ = ("game_id", "game", "writers", "broadcaster")
+
+    def __init__(self, game_id: int, size: int, first, second):
+        self.game_id = game_id
+        self.game = BitboardHexGame(size, size)
+        self.writers = {1: first, 2: second}
+        self.broadcaster = None
+
+    def broadcast(self, line: str) -> None:
+        """Sends a line to both players."""
+        data = line.encode() + b"\n"
+        for writer in self.writers.values():
+            writer.write(data)
+
+    def end_broadcast(self) -> None:
+        """Sends the end of the game to its viewers and disconnects them."""
+        if self.broadcaster is not None:
+            self.broadcaster.close()
+            self.broadcaster = None
+
+
+class GameServer:
+    """Pairs connections into games and referees their moves.
+
+    Everything runs on one event loop: a coroutine per connection reads commands and changes the
+    sessions directly, so no locking is needed.
+
+    Attributes:
+        sessions (dict): The running sessions by game id.
+        moves (int): The number of moves accepted since the server started.
+
+    Methods:
+        handle_connection: Serves one client until it disconnects.
+        serve: Listens for clients until cancelled.
+    """
+
+    def __init__(self):
+        self.sessions = {}
+        self.moves = 0
+        self._waiting = {}  # board size -> (writer, future of the session) of a waiting client
+        self._game_ids = itertools.count(1)
+
+    async def handle_connection(self, reader, writer) -> None:
+        """Serves one client until it disconnects.
+
+        Args:
+            reader (asyncio.StreamReader): The client's input.
+            writer (asyncio.StreamWriter): The client's output.
+        """
+        session, player = None, 0
+        waiting = None  # future of the session while waiting for an opponent
+        watching = None  # the session watched by a viewer
+        read = None
+        try:
+            while True:
+                if read is None:
+                    read = asyncio.ensure_future(reader.readline())
+                if waiting is not None:
+                    # Keep reading while waiting, to notice a client that gives up
+                    await asyncio.wait((read, waiting), return_when=asyncio.FIRST_COMPLETED)
+                    if waiting.done():
+                        session, player, waiting = waiting.result(), 1, None
+                        continue
+                line = await read
+                read = None
+                if not line:
+                    break
+                words = line.decode("ascii", "replace").split()
+                if not words:
+                    continue
+                command, arguments = words[0], words[1:]
+                if watching is not None:
+                    # A viewer's terminal shows the board, so anything but QUIT is ignored
+                    if command == "QUIT":
+                        break
+                    continue
+                if session is not None and session.game_id not in self.sessions:
+                    # The opponent ended the game: they won or they left
+                    session, player = None, 0
+                if command == "MOVE" and session is not None:
+                    if self._move(session, player, arguments):
+                        session, player = None, 0
+                elif command == "PLAY" and session is None and waiting is None:
+                    session, waiting = self._pair(writer, arguments)
+                    player = 2 if session is not None else 0
+                elif command == "WATCH" and session is None and waiting is None:
+                    watching = self._watch(writer, arguments)
+                elif command == "QUIT":
+                    break
+                else:
+                    writer.write(b"ERROR unexpected command\n")
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # The server is stopping. Before Python 3.12, the stream server reports a cancelled
+            # client task as an unhandled exception, so the task ends normally there.
+            if sys.version_info >= (3, 12):
+                raise
+        finally:
+            if read is not None:
+                read.cancel()
+            if session is not None and session.game_id in self.sessions:
+                self._leave(session, player)
+            if watching is not None and watching.broadcaster is not None:
+                watching.broadcaster.remove(writer)
+            self._cancel_wait(writer)
+            writer.close()
+
+    def _pair(self, writer, arguments: list):
+        """Pairs a client with a waiting one of the same board size, or makes it wait.
+
+        Returns:
+            tuple: The new session, or None if the client waits, and the future of the session of
+                a waiting client.
+        """
+        size = _parse_int(arguments)
+        if size is None or not 1 <= size <= MAX_SIZE:
+            writer.write(f"ERROR size must be between 1 and {MAX_SIZE}\n".encode())
+            return None, None
+        waiting = self._waiting.pop(size, None)
+        if waiting is not None:
+            opponent, future = waiting
+            session = Session(next(self._game_ids), size, opponent, writer)
+            self.sessions[session.game_id] = session
+            for player, player_writer in session.writers.items():
+                player_writer.write(f"START {session.game_id} {size} {player}\n".encode())
+            future.set_result(session)
+            return session, None
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[size] = (writer, future)
+        writer.write(b"WAIT\n")
+        return None, future
+
+    def _watch(self, writer, arguments: list):
+        """Starts sending a running game to a viewer.
+
+        Returns:
+            Session: The watched session, or None if there is no such game.
+        """
+        game_id = _parse_int(arguments)
+        session = self.sessions.get(game_id)
+        if session is None:
+            writer.write(b"ERROR no such game\n")
+            return None
+        if session.broadcaster is None:
+            session.broadcaster = Broadcaster(session.game)
+        session.broadcaster.add(writer)
+        return session
+
+    def _move(self, session: Session, player: int, arguments: list) -> bool:
+        """Plays a move of a player, and returns True if it ended the game."""
+        game = session.game
+        writer = session.writers[player]
+        if game.current_player != player:
+            writer.write(b"ERROR not your turn\n")
+            return False
+        action = _parse_int(arguments)
+        if action is None or not game.is_valid(action):
+            writer.write(b"ERROR invalid move\n")
+            return False
+        won = game.make(action)
+        self.moves += 1
+        session.broadcast(f"MOVE {player} {action}")
+        if won:
+            session.broadcast(f"END {player}")
+            session.end_broadcast()
+            del self.sessions[session.game_id]
+        elif session.broadcaster is not None:
+            session.broadcaster.publish()
+        return won
+
+    def _leave(self, session: Session, player: int) -> None:
+        """Ends a session whose player disconnected, telling the opponent."""
+        del self.sessions[session.game_id]
+        opponent = session.writers[3 - player]
+        opponent.write(b"LEFT\n")
+        session.end_broadcast()
+
+    def _cancel_wait(self, writer) -> None:
+        """Removes a disconnected client from the waiting list."""
+        for size, (waiting, future) in list(self._waiting.items()):
+            if waiting is writer:
+                del self._waiting[size]
+                future.cancel()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, ready=None) -> None:
+        """Listens for clients until cancelled.
+
+        Args:
+            host (str, optional): The address to listen on. Defaults to 127.0.0.1.
+            port (int, optional): The port to listen on, 0 for any free port. Defaults to
+                DEFAULT_PORT.
+            ready (asyncio.Future, optional): Set to the bound port once the server listens.
+        """
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+        if ready is not None:
+            ready.set_result(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hosts network games of Hex.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    args = parser.parse_args()
+    try:
+        asyncio.run(GameServer().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""Exact solver for small Hex boards, and the command that builds opening books.
+
+Usage:
+    python -m hexterm.solver --size 5
+    python -m hexterm.solver --size 11 --search-time 10
+"""
+
+import argparse
+import time
+from typing import Tuple
+
+import numpy as np
+
+from hexterm.bitboard import BitboardHexGame
+from hexterm.book import LOSS, UNPROVEN, WIN, default_book_path, write_book
+from hexterm.hex_game import STATE_EMPTY, HexGame, symmetries
+from hexterm.mcts import MCTS
+from hexterm.transposition import TranspositionTable
+
+INFINITY = 1 << 40
+MAX_DEPTH = np.iinfo(np.int32).max
+# Move lists kept for positions being searched, the oldest dropped first
+MAX_MOVE_LISTS = 1 << 16
+
+
+class Solver:
+    """Depth-first proof-number search (DFPN) that finds the winner of a Hex position.
+
+    Hex has no draws, so a position is won for the player to move if one of their moves leads to a
+    position lost for the opponent. Proof-number search always expands the position that is
+    cheapest to prove or disprove, instead of refuting every reply to a bad first move like a
+    plain depth-first search does. The proof and disproof numbers are kept in a
+    TranspositionTable, so positions reached by different move orders are shared and the memory
+    used is fixed however long the search runs. The depth of an entry is the number of positions
+    expanded to compute it, so the table keeps the entries that cost the most to compute and
+    evicts the cheap ones, which are searched again if they are needed.
+
+    Moves are pruned with threats before searching:
+        - A move that wins right away, or that leaves two winning cells, wins.
+        - If the opponent has two winning cells the position is lost, and one must be blocked.
+        - If the opponent has moves that would leave them two winning cells, only the cells of
+          all those patterns and the moves that threaten to win can save the position.
+
+    Attributes:
+        nodes (int): The number of positions expanded.
+        table (TranspositionTable): The proof and disproof numbers for the player to move, and the
+            winning move of proven positions.
+
+    Methods:
+        solve: Returns the result of a position and a winning move.
+    """
+
+    def __init__(self, memory_bytes: int = 64 * 1024 * 1024):
+        self.nodes = 0
+        self.table = TranspositionTable(memory_bytes, num_values=2)
+        self._moves = {}  # hash -> (result if known without search, moves to search)
+        self._orders = {}
+
+    def _move_order(self, game: HexGame) -> np.ndarray:
+        """Returns all action indices, closest to the center of the board first."""
+        size = (game.num_rows, game.num_cols)
+        if size not in self._orders:
+            rows, cols = np.divmod(np.arange(game.num_rows * game.num_cols), game.num_cols)
+            # Hex distance from the center, ties broken towards the short diagonal
+            dr, dc = rows - (game.num_rows - 1) / 2, cols - (game.num_cols - 1) / 2
+            distance = np.maximum(np.maximum(np.abs(dr), np.abs(dc)), np.abs(dr + dc))
+            self._orders[size] = np.argsort(distance + 0.01 * np.abs(dr - dc), kind="stable")
+        return self._orders[size]
+
+    def solve(self, game: HexGame) -> Tuple[int, int]:
+        """Returns the result of a position and a winning move.
+
+        Args:
+            game (HexGame): The game to solve. It is searched with make/undo and left unchanged.
+
+        Returns:
+            Tuple[int, int]: WIN or LOSS for the player to move, and a winning move, or -1 if the
+                position is lost.
+        """
+        self._search(game, INFINITY, INFINITY)
+        (proof, _), _, best_move, _ = self.table.lookup(game.hash)
+        return (WIN, best_move) if proof == 0 else (LOSS, -1)
+
+    def _search(self, game: HexGame, proof_threshold: int, disproof_threshold: int) -> tuple:
+        """Expands the position until its proof or disproof number reaches its threshold.
+
+        Returns:
+            tuple: The proof and disproof numbers of the position, also stored in the table.
+        """
+        key = game.hash
+        start = self.nodes
+        if key not in self._moves:
+            self.nodes += 1
+            if len(self._moves) >= MAX_MOVE_LISTS:
+                del self._moves[next(iter(self._moves))]
+            self._moves[key] = self._generate_moves(game)
+        result, moves = self._moves[key]
+        if result is not None:
+            numbers = (0, INFINITY) if result == WIN else (INFINITY, 0)
+            self.table.store(key, numbers, 1, moves[0] if result == WIN else -1)
+            return numbers
+
+        # The numbers of the children searched from here, for when the table evicts them, so the
+        # search still moves on with a table too small for it
+        searched = {}
+        while True:
+            # The proof number is the smallest disproof number of a child, and the disproof number
+            # is the sum of their proof numbers. Unexpanded children count as (1, 1).
+            proof, second_proof, disproof = INFINITY, INFINITY, 0
+            best_action = best_child_proof = None
+            for action in moves:
+                entry = self.table.lookup(game.hash_after(action))
+                if entry is not None:
+                    child_proof, child_disproof = entry[0]
+                else:
+                    child_proof, child_disproof = searched.get(action, (1, 1))
+                disproof = min(INFINITY, disproof + child_proof)
+                if child_disproof < proof:
+                    second_proof, proof = proof, child_disproof
+                    best_action, best_child_proof = action, child_proof
+                elif child_disproof < second_proof:
+                    second_proof = child_disproof
+            # Once proven, the best action is the disproven child, the winning move
+            work = min(MAX_DEPTH, max(1, self.nodes - start))
+            self.table.store(
+                key, (proof, disproof), work, -1 if best_action is None else best_action
+            )
+            if proof >= proof_threshold or disproof >= disproof_threshold:
+                return proof, disproof
+
+            game.make(best_action)
+            searched[best_action] = self._search(
+                game,
+                min(INFINITY, disproof_threshold - disproof + best_child_proof),
+                min(proof_threshold, second_proof + 1),
+            )
+            game.undo()
+
+    def _generate_moves(self, game: HexGame) -> tuple:
+        """Returns the result of a position if threats decide it, or else the moves to search.
+
+        Returns:
+            tuple: (WIN, [winning move]), (LOSS, []) or (None, moves to search). None of the moves
+                to search ends the game.
+        """
+        player = game.current_player
+        opponent = game.get_opponent(player)
+        wins = game.winning_moves(player)
+        if wins:
+            return WIN, wins[:1]
+        threats = game.winning_moves(opponent)
+        if len(threats) > 1:
+            return LOSS, []
+        if threats:
+            return None, threats
+
+        board = game.board
+        empty = [int(action) for action in self._move_order(game) if board[action] == STATE_EMPTY]
+        double_threats = self._double_threats(game, player, empty)
+        if double_threats:
+            return WIN, [next(iter(double_threats))]
+        opponent_double_threats = self._double_threats(game, opponent, empty)
+        if not opponent_double_threats:
+            return None, empty
+
+        # Any other move lets the opponent play one of their double threats
+        saving = set.intersection(
+            *({action, *wins} for action, wins in opponent_double_threats.items())
+        )
+        for action in empty:
+            if action not in saving:
+                game.make(action)
+                if game.winning_moves(player):
+                    saving.add(action)
+                game.undo()
+        moves = [action for action in empty if action in saving]
+        return (None, moves) if moves else (LOSS, [])
+
+    def _double_threats(self, game: HexGame, player: int, empty: list) -> dict:
+        """Returns the moves that would leave a player with two or more winning cells.
+
+        Args:
+            game (HexGame): The game. Neither player may have a winning cell.
+            player (int): The player, who does not have to be the one to move.
+            empty (list): The empty cells.
+
+        Returns:
+            dict: The winning cells left by each such move.
+        """
+        current_player = game.current_player
+        double_threats = {}
+        for action in empty:
+            # The move is taken back right away, so it may be played out of turn
+            game.current_player = player
+            game.make(action)
+            wins = game.winning_moves(player)
+            game.undo()
+            if len(wins) > 1:
+                double_threats[action] = wins
+        game.current_player = current_player
+        return double_threats
+
+
+def canonical_move(game: HexGame, action: int) -> int:
+    """Returns the move of the canonical form of a position that is the action in the position."""
+    mapping, _ = symmetries(game.num_rows, game.num_cols)[game.canonical_symmetry()]
+    return mapping[action]
+
+
+def solution_entries(size: Tuple[int, int], full_depth: int, solver: Solver = None) -> list:
+    """Solves the positions an opening book needs, and returns its entries.
+
+    Every move is followed for the first full_depth plies. After that only the positions needed to
+    play a won position to the end are visited: the winning move where the player to move wins,
+    and every reply where they lose. Only won positions are stored, since a book move is only
+    useful to the winning side. Positions are stored, and searched, once per equivalence class.
+
+    Args:
+        size (Tuple[int, int]): The number of rows and columns of the board.
+        full_depth (int): The number of plies where every move is followed.
+        solver (Solver, optional): The solver to use. Defaults to a new one.
+
+    Returns:
+        list: (canonical hash, WIN, best move of the canonical form) tuples, one per won position.
+    """
+    solver = solver or Solver()
+    game = BitboardHexGame(*size)
+    visited = set()
+    entries = []
+
+    def visit(depth: int) -> None:
+        key = game.canonical_hash()
+        if key in visited:
+            return
+        visited.add(key)
+        result, best_move = solver.solve(game)
+        if result == WIN:
+            entries.append((key, result, canonical_move(game, best_move)))
+        if result == WIN and depth >= full_depth:
+            moves = [best_move]
+        else:
+            moves = np.flatnonzero(game.board == STATE_EMPTY).tolist()
+        for action in moves:
+            if not game.make(action):
+                visit(depth + 1)
+            game.undo()
+
+    visit(0)
+    return entries
+
+
+def search_entries(size: Tuple[int, int], plies: int, time_limit: float) -> list:
+    """Searches the opening positions of a board too large to solve, and returns book entries.
+
+    Args:
+        size (Tuple[int, int]): The number of rows and columns of the board.
+        plies (int): Positions up to this many moves deep are searched, following every move.
+        time_limit (float): The MCTS thinking time per position, in seconds.
+
+    Returns:
+        list: (canonical hash, UNPROVEN, best move of the canonical form) tuples, one per position.
+    """
+    game = HexGame(*size)
+    mcts = MCTS(*size, time_limit=time_limit, seed=0)
+    entries = {}
+
+    def visit(depth: int) -> None:
+        key = game.canonical_hash()
+        if key in entries:
+            return
+        entries[key] = (key, UNPROVEN, canonical_move(game, mcts.select_action(game)))
+        if depth == plies:
+            return
+        for action in np.flatnonzero(game.board == STATE_EMPTY).tolist():
+            game.make(action)
+            visit(depth + 1)
+            game.undo()
+
+    visit(0)
+    return list(entries.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Builds an opening book for a board size.")
+    parser.add_argument("--size", type=int, required=True, help="board size")
+    parser.add_argument("--cols", type=int, help="number of columns, if not square")
+    parser.add_argument(
+        "--full-depth",
+        type=int,
+        default=1,
+        help="plies where every move is followed when solving (default: 1)",
+    )
+    parser.add_argument(
+        "--search-time",
+        type=float,
+        help="search openings with MCTS for this many seconds each instead of solving",
+    )
+    parser.add_argument("--plies", type=int, default=1, help="opening depth when searching")
+    parser.add_argument(
+        "--memory",
+        type=int,
+        default=64,
+        help="megabytes of the solver's transposition table (default: 64)",
+    )
+    parser.add_argument("--output", help="book path (default: the book shipped with hexterm)")
+    args = parser.parse_args()
+
+    size = (args.size, args.cols or args.size)
+    start = time.perf_counter()
+    if args.search_time is None:
+        solver = Solver(args.memory << 20)
+        entries = solution_entries(size, args.full_depth, solver)
+        print(f"Solved with {solver.nodes} expanded positions")
+    else:
+        entries = search_entries(size, args.plies, args.search_time)
+    path = args.output or default_book_path(*size)
+    write_book(path, *size, entries)
+    print(f"Wrote {len(entries)} entries to {path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+from hexterm.dataset import SampleBatch
+from hexterm.hex_game import STATE_EMPTY, STATE_PLAYERS, symmetries, zobrist_keys
+
+
+@lru_cache(maxsize=None)
+def symmetry_arrays(num_rows: int, num_cols: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """Returns the symmetries and Zobrist keys of a board of the given size as arrays.
+
+    Args:
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+
+    Returns:
+        tuple: The (symmetries, cells) action index every action index is mapped to, as in
+            `symmetries`, whether each symmetry swaps the colors, the (3, cells) keys of an empty
+            cell and of each player's stone, and the key of player 2 to move.
+    """
+    mappings, swaps = zip(*symmetries(num_rows, num_cols))
+    stone_keys, player_key = zobrist_keys(num_rows, num_cols)
+    keys = np.zeros((3, num_rows * num_cols), dtype=np.uint64)
+    for player in STATE_PLAYERS.values():
+        keys[player] = stone_keys[player]
+    arrays = np.array(mappings, dtype=np.int64), np.array(swaps), keys
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays + (player_key,)
+
+
+def players_to_move(boards: np.ndarray) -> np.ndarray:
+    """Returns the player to move in positions of games that are not over.
+
+    Args:
+        boards (np.ndarray): The boards, as in HexGame.board. Shape (n, cells).
+
+    Returns:
+        np.ndarray: Player 1 when both players have as many stones, player 2 otherwise. Shape (n,).
+    """
+    boards = np.asarray(boards)
+    behind = (boards == STATE_PLAYERS[1]).sum(axis=1) > (boards == STATE_PLAYERS[2]).sum(axis=1)
+    return np.where(behind, STATE_PLAYERS[2], STATE_PLAYERS[1]).astype(np.int8)
+
+
+def _canonical(
+    boards: np.ndarray, players: np.ndarray, num_rows: int, num_cols: int, keep_colors: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the canonical boards, players, symmetry indices and hashes of a batch."""
+    boards = np.asarray(boards)
+    players = players_to_move(boards) if players is None else np.asarray(players)
+    mappings, swaps, keys, player_key = symmetry_arrays(num_rows, num_cols)
+    # A stone moves from an action index to the one it is mapped to, and every symmetry is its own
+    # inverse, so the cell an action index takes its stone from is the one it is mapped to
+    symmetric = boards[:, mappings]
+    symmetric = np.where(swaps[:, None] & (symmetric != STATE_EMPTY), 3 - symmetric, symmetric)
+    symmetric_players = np.where(swaps, 3 - players[:, None], players[:, None])
+
+    cell_keys = keys[symmetric, np.arange(keys.shape[1])]
+    hashes = np.bitwise_xor.reduce(cell_keys, axis=-1)
+    hashes ^= np.where(symmetric_players == STATE_PLAYERS[2], np.uint64(player_key), np.uint64(0))
+    if keep_colors:
+        hashes[:, swaps] = np.iinfo(np.uint64).max
+
+    chosen = hashes.argmin(axis=1)
+    batch = np.arange(len(boards))
+    return (
+        symmetric[batch, chosen].astype(boards.dtype),
+        symmetric_players[batch, chosen].astype(np.int8),
+        chosen,
+        hashes[batch, chosen],
+    )
+
+
+def canonical_boards(
+    boards: np.ndarray,
+    num_rows: int,
+    num_cols: int,
+    players: np.ndarray = None,
+    keep_colors: bool = False,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the canonical forms of a batch of positions.
+
+    The canonical form of a position is the symmetric position with the smallest Zobrist hash, as
+    in `HexGame.canonical_hash`, so all the positions equivalent by symmetry have the same one.
+
+    Args:
+        boards (np.ndarray): The boards, as in HexGame.board. Shape (n, cells).
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        players (np.ndarray, optional): The player to move in each position. Defaults to None,
+            which uses `players_to_move`, only right for games that are not over.
+        keep_colors (bool, optional): Whether to leave out the symmetries that swap the colors,
+            for boards whose player to move is left to `players_to_move`, as it can't tell it
+            after a swap. Defaults to False.
+
+    Returns:
+        tuple: The (n, cells) canonical boards, their (n,) players to move and the (n,) index in
+            `symmetries` of the symmetry that maps each position to its canonical form.
+    """
+    return _canonical(boards, players, num_rows, num_cols, keep_colors)[:3]
+
+
+def canonical_hashes(
+    boards: np.ndarray,
+    num_rows: int,
+    num_cols: int,
+    players: np.ndarray = None,
+    keep_colors: bool = False,
+) -> np.ndarray:
+    """Returns the canonical hashes of a batch of positions, as `HexGame.canonical_hash` would.
+
+    With keep_colors, they differ from `HexGame.canonical_hash`, so a table is keyed by either one.
+
+    Args:
+        boards (np.ndarray): The boards, as in HexGame.board. Shape (n, cells).
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        players (np.ndarray, optional): The player to move in each position. Defaults to None,
+            which uses `players_to_move`, only right for games that are not over.
+        keep_colors (bool, optional): Whether to leave out the symmetries that swap the colors,
+            for boards whose player to move is left to `players_to_move`, as it can't tell it
+            after a swap. Defaults to False.
+
+    Returns:
+        np.ndarray: The 64-bit hashes. Shape (n,), dtype uint64.
+    """
+    return _canonical(boards, players, num_rows, num_cols, keep_colors)[3]
+
+
+def transform_actions(
+    actions: np.ndarray, symmetry_indices: np.ndarray, num_rows: int, num_cols: int
+) -> np.ndarray:
+    """Maps moves through symmetries, e.g. onto the canonical forms of their positions and back.
+
+    Args:
+        actions (np.ndarray): The action indices. Shape (n,).
+        symmetry_indices (np.ndarray): The index in `symmetries` of the symmetry of each move, as
+            returned by `canonical_boards`. Shape (n,).
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+
+    Returns:
+        np.ndarray: The mapped action indices, with the dtype of actions. Shape (n,).
+    """
+    actions = np.asarray(actions)
+    mappings = symmetry_arrays(num_rows, num_cols)[0]
+    return mappings[symmetry_indices, actions].astype(actions.dtype)
+
+
+def canonical_samples(
+    samples: SampleBatch, num_rows: int, num_cols: int, unique: bool = False
+) -> SampleBatch:
+    """Maps training samples onto the canonical forms of their positions.
+
+    Samples don't say which player is to move, so the symmetries that swap the colors are left
+    out. They never merge positions of games from the empty board anyway, see `symmetries`.
+
+    Args:
+        samples (SampleBatch): The samples, e.g. from `record_samples`.
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        unique (bool, optional): Whether to keep only the first sample of every canonical position
+            and move. Defaults to False.
+
+    Returns:
+        SampleBatch: The samples with canonical boards and legal masks, and the moves mapped to
+            them.
+    """
+    boards, _, chosen, hashes = _canonical(samples.boards, None, num_rows, num_cols, True)
+    actions = transform_actions(samples.actions, chosen, num_rows, num_cols)
+    outcomes = np.asarray(samples.outcomes)
+    if unique:
+        keys = np.stack([hashes, actions.astype(np.uint64)], axis=1)
+        _, first = np.unique(keys, axis=0, return_index=True)
+        first.sort()
+        boards, actions, outcomes = boards[first], actions[first], outcomes[first]
+    return SampleBatch(boards, boards == STATE_EMPTY, actions, outcomes)
@@ -0,0 +1,426 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from typing import Iterator, List, NamedTuple, Tuple
+
+import numpy as np
+
+from hexterm.hex_game import STATE_PLAYERS, HexGame
+from hexterm.records import GameArchive, GameRecord
+
+RESULTS_SUFFIX = ".jsonl"  # the results of the games of an archive, next to it
+ELO_SCALE = 400 / math.log(10)  # Elo points per unit of log strength
+PRIOR_GAMES = 1.0  # virtual drawn game between every pair, so perfect scores get finite ratings
+BOOTSTRAP_SAMPLES = 1000  # resampled tournaments the confidence intervals are measured on
+CONFIDENCE = 0.95
+MM_ITERATIONS = 1000
+MM_TOLERANCE = 1e-9
+# Options of the MCTS player and the keyword argument of MCTS each one sets
+MCTS_OPTIONS = {
+    "playouts": ("max_playouts", int),
+    "time": ("time_limit", float),
+    "exploration": ("exploration", float),
+    "rave": ("rave_equivalence", float),
+    "nodes": ("max_nodes", int),
+}
+
+
+class RandomPlayer:
+    """Plays uniformly random legal moves, the baseline of tournaments."""
+
+    def __init__(self, seed: int = None):
+        self._rng = random.Random(seed)
+
+    def select_action(self, game: HexGame) -> int:
+        """Returns a random legal move."""
+        return game.random_legal_action(self._rng)
+
+    def close(self) -> None:
+        """Releases the resources of the player. There are none."""
+
+
+class PlayerConfig(NamedTuple):
+    """A player of a tournament: a name and how to create the player for each game.
+
+    Attributes:
+        name (str): The name in the results and the standings.
+        kind (str): "random" or "mcts".
+        options (dict): For MCTS, the MCTS_OPTIONS given and whether to use the opening book.
+    """
+
+    name: str
+    kind: str
+    options: dict
+
+    @classmethod
+    def parse(cls, spec: str) -> "PlayerConfig":
+        """Parses a player given as [NAME=]KIND[:OPTION=VALUE,...].
+
+        For example "random", or "strong=mcts:playouts=2000,exploration=0.3". MCTS players take
+        the MCTS_OPTIONS and book=1 to play from the shipped opening book. With a number of
+        playouts and no time, an MCTS player is deterministic for a given seed.
+
+        Raises:
+            ValueError: If the kind or an option is unknown, or a value is not a number.
+        """
+        player, _, option_list = spec.partition(":")
+        name, _, kind = player.rpartition("=")
+        options = {}
+        for option in filter(None, option_list.split(",")):
+            key, _, value = option.partition("=")
+            if kind == "mcts" and key in MCTS_OPTIONS:
+                options[key] = MCTS_OPTIONS[key][1](value)
+            elif kind == "mcts" and key == "book":
+                options[key] = bool(int(value))
+            else:
+                raise ValueError(f"Unknown option {key!r} of player {spec!r}")
+        if kind not in ("random", "mcts"):
+            raise ValueError(f"Unknown player kind {kind!r} in {spec!r}")
+        return cls(name or spec, kind, options)
+
+    def create(self, num_rows: int, num_cols: int, seed: int):
+        """Creates the player for one game.
+
+        Args:
+            num_rows (int): The number of rows in the game board.
+            num_cols (int): The number of columns in the game board.
+            seed (int): The seed of the player's random choices.
+
+        Returns:
+            The player, with `select_action` and `close`.
+        """
+        if self.kind == "random":
+            return RandomPlayer(seed)
+
+        from hexterm.book import BookPlayer
+        from hexterm.mcts import MCTS
+
+        kwargs = {
+            MCTS_OPTIONS[key][0]: value for key, value in self.options.items() if key != "book"
+        }
+        if "max_playouts" in kwargs and "time_limit" not in kwargs:
+            kwargs["time_limit"] = None
+        search = MCTS(num_rows, num_cols, seed=seed, **kwargs)
+        if self.options.get("book"):
+            return BookPlayer.with_default_book(num_rows, num_cols, search)
+        return search
+
+
+class GameResult(NamedTuple):
+    """The result of a game of a tournament.
+
+    Attributes:
+        index (int): The position of the game in the schedule.
+        first (int): The index of the player who moved first, as player 1.
+        second (int): The index of the other player.
+        seed (int): The seed the seeds of both players were drawn from.
+        winner (int): The index of the winning player.
+        moves (np.ndarray): The action indices of the game.
+        seconds (float): How long the game took.
+    """
+
+    index: int
+    first: int
+    second: int
+    seed: int
+    winner: int
+    moves: np.ndarray
+    seconds: float
+
+
+def schedule(num_players: int, games_per_pair: int, gauntlet: bool = False) -> List[tuple]:
+    """Returns the pairings of the games of a tournament.
+
+    Every pair of players meets games_per_pair times, or in a gauntlet only the first player and
+    each of the others. The players of a pair take turns moving first.
+
+    Returns:
+        list: The (first, second) player indices of every game.
+    """
+    pairs = [
+        (first, second)
+        for first in range(num_players)
+        for second in range(first + 1, num_players)
+        if not gauntlet or first == 0
+    ]
+    return [
+        (first, second) if game % 2 == 0 else (second, first)
+        for first, second in pairs
+        for game in range(games_per_pair)
+    ]
+
+
+# The players and the board size, set once in every worker process
+_worker_setup = None
+
+
+def _init_worker(configs: list, num_rows: int, num_cols: int) -> None:
+    """Keeps what the games of a worker process share."""
+    global _worker_setup
+    _worker_setup = configs, num_rows, num_cols
+
+
+def _play_game(task: tuple) -> GameResult:
+    """Plays one game of a tournament, in a worker process.
+
+    Args:
+        task (tuple): The index of the game, the indices of the first and second player and the
+            seed of the game.
+
+    Returns:
+        GameResult: The result.
+    """
+    index, first, second, seed = task
+    configs, num_rows, num_cols = _worker_setup
+    start = time.perf_counter()
+    seeds = np.random.SeedSequence(seed).generate_state(2)
+    indices = {STATE_PLAYERS[1]: first, STATE_PLAYERS[2]: second}
+    players = {
+        player: configs[player_index].create(num_rows, num_cols, int(player_seed))
+        for (player, player_index), player_seed in zip(indices.items(), seeds)
+    }
+    game = HexGame(num_rows, num_cols)
+    try:
+        while not game.done:
+            action = players[game.current_player].select_action(game)
+            if not game.is_valid(action):
+                name = configs[indices[game.current_player]].name
+                raise ValueError(f"{name} played the invalid move {action}")
+            game.make(action)
+    finally:
+        for player in players.values():
+            player.close()
+    winner = first if game.winner == STATE_PLAYERS[1] else second
+    moves = np.array(game.history_vector())
+    return GameResult(index, first, second, seed, winner, moves, time.perf_counter() - start)
+
+
+def play_tournament(
+    configs: list,
+    num_rows: int,
+    num_cols: int,
+    games_per_pair: int,
+    gauntlet: bool = False,
+    num_workers: int = None,
+    seed: int = 0,
+    archive_path: str = None,
+) -> Iterator[GameResult]:
+    """Plays the games of a tournament on a process pool, yielding the results as they finish.
+
+    Every game has its own seed, drawn from the tournament's seed and the game's position in the
+    schedule, so a game is the same whichever worker plays it and in whatever order. Games are
+    independent and only their results go back to the main process, so the throughput grows with
+    the number of workers.
+
+    Finished games are appended to the archive, and their result to a JSONL file next to it, one
+    object per line with the archive id of the game, the players, the seed and the winner.
+
+    Args:
+        configs (list): The PlayerConfig of every player.
+        num_rows (int): The number of rows in the game board.
+        num_cols (int): The number of columns in the game board.
+        games_per_pair (int): The games between each pair of players.
+        gauntlet (bool, optional): Whether only the first player meets the others. Defaults to
+            False, a round robin.
+        num_workers (int, optional): The number of worker processes. Defaults to None, one per
+            core. With one, the games are played in this process.
+        seed (int, optional): The seed of the tournament. Defaults to 0.
+        archive_path (str, optional): The GameArchive to append the games to. Defaults to None.
+
+    Yields:
+        GameResult: The result of every game, in the order they finish.
+    """
+    pairings = schedule(len(configs), games_per_pair, gauntlet)
+    seeds = np.random.SeedSequence(seed).generate_state(len(pairings), dtype=np.uint64)
+    tasks = [(index, *pairing, int(seeds[index])) for index, pairing in enumerate(pairings)]
+    num_workers = num_workers or os.cpu_count()
+
+    archive = GameArchive(archive_path) if archive_path else None
+    results_file = (
+        open(archive_path + RESULTS_SUFFIX, "a", encoding="utf-8", buffering=1)
+        if archive_path
+        else None
+    )
+    pool = None
+    try:
+        if num_workers > 1:
+            pool = multiprocessing.Pool(
+                num_workers, initializer=_init_worker, initargs=(configs, num_rows, num_cols)
+            )
+            results = pool.imap_unordered(_play_game, tasks)
+        else:
+            _init_worker(configs, num_rows, num_cols)
+            results = map(_play_game, tasks)
+        for result in results:
+            if archive is not None:
+                winner = STATE_PLAYERS[1] if result.winner == result.first else STATE_PLAYERS[2]
+                game_id = archive.append(GameRecord(num_rows, num_cols, winner, result.moves))
+                line = {
+                    "game_id": game_id,
+                    "first": configs[result.first].name,
+                    "second": configs[result.second].name,
+                    "seed": result.seed,
+                    "winner": configs[result.winner].name,
+                    "moves": len(result.moves),
+                    "seconds": round(result.seconds, 4),
+                }
+                results_file.write(json.dumps(line) + "\n")
+            yield result
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if archive is not None:
+            archive.close()
+            results_file.close()
+
+
+def _fit_strengths(wins: np.ndarray, met: np.ndarray) -> np.ndarray:
+    """Fits Bradley-Terry strengths to batches of win matrices with the MM algorithm.
+
+    Args:
+        wins (np.ndarray): The games won by each player against each other, shape (batch, n, n).
+        met (np.ndarray): Whether each pair of players meets in the tournament, which gets the
+            prior, shape (n, n). It is the same for every matrix of the batch, so a player left
+            out of a bootstrap resample still has the prior games and a finite strength.
+
+    Returns:
+        np.ndarray: The log strengths, relative to the first player. Shape (batch, n).
+    """
+    prior = PRIOR_GAMES * met
+    games = wins + np.swapaxes(wins, 1, 2) + prior
+    won = (wins + prior / 2).sum(axis=2)
+    strengths = np.ones(wins.shape[:2])
+    for _ in range(MM_ITERATIONS):
+        pair_strengths = strengths[:, :, None] + strengths[:, None, :]
+        updated = won / (games / pair_strengths).sum(axis=2)
+        updated /= updated[:, :1]
+        converged = np.abs(updated - strengths).max() < MM_TOLERANCE
+        strengths = updated
+        if converged:
+            break
+    return np.log(strengths)
+
+
+def elo_ratings(
+    results: list, num_players: int, seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the Elo rating of every player, with a confidence interval.
+
+    The ratings are the maximum likelihood Bradley-Terry fit of the results, relative to the
+    first player. The interval is measured by bootstrap: the games are resampled with replacement
+    BOOTSTRAP_SAMPLES times and fitted again, all the resamples at once. The games are resampled
+    in schedule order, so the interval only depends on the results and the seed, not on the order
+    the games finished in.
+
+    Args:
+        results (list): The GameResult of every game, in any order.
+        num_players (int): The number of players.
+        seed (int, optional): The seed of the resampling. Defaults to 0.
+
+    Returns:
+        tuple: The ratings, and the lower and upper bounds of their CONFIDENCE interval.
+    """
+    results = sorted(results, key=lambda result: result.index)
+    winners = np.array([result.winner for result in results], dtype=np.int64)
+    losers = np.array(
+        [result.first + result.second - result.winner for result in results], dtype=np.int64
+    )
+    wins = np.zeros((1, num_players, num_players))
+    np.add.at(wins, (0, winners, losers), 1)
+    met = (wins[0] + wins[0].T) > 0
+    ratings = ELO_SCALE * _fit_strengths(wins, met)[0]
+
+    rng = np.random.default_rng(seed)
+    samples = rng.integers(len(results), size=(BOOTSTRAP_SAMPLES, len(results)))
+    resampled = np.zeros((BOOTSTRAP_SAMPLES, num_players, num_players))
+    batch = np.repeat(np.arange(BOOTSTRAP_SAMPLES), len(results))
+    np.add.at(resampled, (batch, winners[samples].ravel(), losers[samples].ravel()), 1)
+    bootstrap = ELO_SCALE * _fit_strengths(resampled, met)
+    tail = (1 - CONFIDENCE) / 2 * 100
+    lower, upper = np.percentile(bootstrap, [tail, 100 - tail], axis=0)
+    return ratings, lower, upper
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plays a tournament between AI players.")
+    parser.add_argument(
+        "--players",
+        nargs="+",
+        required=True,
+        help="players as [NAME=]KIND[:OPTION=VALUE,...], e.g. random mcts:playouts=500",
+    )
+    parser.add_argument("--size", type=int, default=7, help="board size (default: 7)")
+    parser.add_argument("--cols", type=int, help="number of columns, if not square")
+    parser.add_argument("--games", type=int, default=10, help="games per pair (default: 10)")
+    parser.add_argument(
+        "--gauntlet", action="store_true", help="only the first player meets the others"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="number of worker processes (default: one per core)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--archive", help="game archive to append the games to")
+    args = parser.parse_args()
+
+    try:
+        configs = [PlayerConfig.parse(spec) for spec in args.players]
+    except ValueError as error:
+        parser.error(str(error))
+    if len({config.name for config in configs}) != len(configs):
+        parser.error("players must have different names")
+    num_rows, num_cols = args.size, args.cols or args.size
+
+    results = []
+    num_games = len(schedule(len(configs), args.games, args.gauntlet))
+    start = time.perf_counter()
+    for result in play_tournament(
+        configs,
+        num_rows,
+        num_cols,
+        args.games,
+        args.gauntlet,
+        args.workers,
+        args.seed,
+        args.archive,
+    ):
+        results.append(result)
+        elapsed = time.perf_counter() - start
+        print(
+            f"\r{len(results)}/{num_games} games, {len(results) / elapsed:.2f} games/s",
+            end="",
+            flush=True,
+        )
+    elapsed = time.perf_counter() - start
+    print()
+
+    results.sort(key=lambda result: result.index)
+    ratings, lower, upper = elo_ratings(results, len(configs), args.seed)
+    games = np.zeros(len(configs), dtype=int)
+    wins = np.zeros(len(configs), dtype=int)
+    for result in results:
+        games[[result.first, result.second]] += 1
+        wins[result.winner] += 1
+    width = max(len(config.name) for config in configs)
+    interval = f"{CONFIDENCE:.0%} interval"
+    print(f"{'player':<{width}} {'games':>6} {'score':>6} {'elo':>6} {interval:>15}")
+    for index in np.argsort(-ratings):
+        print(
+            f"{configs[index].name:<{width}} {games[index]:>6} "
+            f"{wins[index] / max(games[index], 1):>6.1%} {ratings[index]:>6.0f} "
+            f"{lower[index]:>7.0f} {upper[index]:>7.0f}"
+        )
+    first_wins = sum(result.winner == result.first for result in results)
+    print(
+        f"Ratings are relative to {configs[0].name}. First player won "
+        f"{first_wins / len(results):.1%} of {len(results)} games, "
+        f"{len(results) / elapsed:.2f} games/s over {elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
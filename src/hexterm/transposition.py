@@ -0,0 +1,136 @@
+import numpy as np
+
+# Stored entries are grouped in buckets of this many slots sharing one index
+BUCKET_SIZE = 2
+EMPTY_DEPTH = -1
+
+
+class TranspositionTable:
+    """Fixed size table of search results keyed by the Zobrist hash of the position.
+
+    The table is a set of flat arrays sized once from a memory budget, so it never grows during
+    search. A hash selects a bucket of BUCKET_SIZE slots. When storing a new position in a full
+    bucket, the entry with the lowest depth is evicted, since deeper results cost the most to
+    recompute.
+
+    An entry holds num_values values, e.g. a single evaluation, or the proof and disproof numbers
+    of the Solver. Values are 64-bit floats, which hold integers up to 2**53 exactly.
+
+    Attributes:
+        num_entries (int): The number of slots in the table.
+        num_values (int): The number of values of an entry.
+        hits (int): The number of lookups that found their position.
+        misses (int): The number of lookups that did not.
+        stores (int): The number of entries written.
+        evictions (int): The number of entries overwritten by a different position.
+
+    Methods:
+        lookup: Returns the entry stored for a hash.
+        store: Stores the result of a position.
+        clear: Removes every entry and resets the counters.
+        stats: Returns the counters.
+    """
+
+    # Bytes per entry but the values: key, depth, best move and flag
+    ENTRY_BYTES = 8 + 4 + 2 + 1
+    VALUE_BYTES = 8
+
+    def __init__(self, memory_bytes: int = 16 * 1024 * 1024, num_values: int = 1):
+        self.num_values = num_values
+        entry_bytes = self.ENTRY_BYTES + self.VALUE_BYTES * num_values
+        num_buckets = max(1, memory_bytes // (entry_bytes * BUCKET_SIZE))
+        num_buckets = 1 << (num_buckets.bit_length() - 1)  # power of two, for masking
+        self._mask = num_buckets - 1
+        self.num_entries = num_buckets * BUCKET_SIZE
+
+        self.keys = np.zeros(self.num_entries, dtype=np.uint64)
+        self.values = np.zeros((self.num_entries, num_values), dtype=np.float64)
+        self.depths = np.zeros(self.num_entries, dtype=np.int32)
+        self.best_moves = np.zeros(self.num_entries, dtype=np.int16)
+        self.flags = np.zeros(self.num_entries, dtype=np.uint8)
+        self.clear()
+
+    def clear(self) -> None:
+        """Removes every entry and resets the counters."""
+        self.depths[:] = EMPTY_DEPTH
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _find(self, key: np.uint64) -> int:
+        """Returns the slot holding the key, or -1 if it is not stored."""
+        start = (int(key) & self._mask) * BUCKET_SIZE
+        for slot in range(start, start + BUCKET_SIZE):
+            if self.keys[slot] == key and self.depths[slot] != EMPTY_DEPTH:
+                return slot
+        return -1
+
+    def lookup(self, key: int):
+        """Returns the entry stored for a hash.
+
+        Args:
+            key (int): The Zobrist hash of the position.
+
+        Returns:
+            tuple: The value, depth, best move and flag of the entry, or None if the position is
+                not stored. The value is a float, or a tuple of floats if entries hold several.
+        """
+        slot = self._find(np.uint64(key))
+        if slot < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        values = self.values[slot].tolist()
+        return (
+            values[0] if self.num_values == 1 else tuple(values),
+            int(self.depths[slot]),
+            int(self.best_moves[slot]),
+            int(self.flags[slot]),
+        )
+
+    def store(self, key: int, value, depth: int = 0, best_move: int = -1, flag: int = 0):
+        """Stores the result of a position.
+
+        An entry for the same position is always overwritten. Otherwise an empty slot of the
+        bucket is used, or the entry with the lowest depth is evicted.
+
+        Args:
+            key (int): The Zobrist hash of the position.
+            value (float or tuple): The value of the position, or its num_values values.
+            depth (int, optional): How much search the value is based on. Defaults to 0.
+            best_move (int, optional): The best action found. Defaults to -1.
+            flag (int, optional): Extra information about the value, e.g. if it is a bound.
+                Defaults to 0.
+        """
+        key = np.uint64(key)
+        slot = self._find(key)
+        if slot < 0:
+            start = (int(key) & self._mask) * BUCKET_SIZE
+            bucket = self.depths[start : start + BUCKET_SIZE]
+            slot = start + int(np.argmin(bucket))
+            if bucket[slot - start] != EMPTY_DEPTH:
+                self.evictions += 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.depths[slot] = depth
+        self.best_moves[slot] = best_move
+        self.flags[slot] = flag
+        self.stores += 1
+
+    def stats(self) -> dict:
+        """Returns the counters of the table.
+
+        Returns:
+            dict: The hits, misses, stores, evictions, hit rate and number of used entries.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "used": int(np.count_nonzero(self.depths != EMPTY_DEPTH)),
+            "capacity": self.num_entries,
+        }
@@ -0,0 +1,62 @@
+import random
+
+from hexterm.book import WIN, BookPlayer, OpeningBook, default_book_path
+from hexterm.hex_game import HexGame, symmetries
+
+
+class NoFallback:
+    """A player for the positions the book should answer, which fails if it is asked."""
+
+    def select_action(self, game: HexGame) -> int:
+        raise AssertionError(f"No book move after {game.history}")
+
+    def close(self) -> None:
+        pass
+
+
+def test_4x4_book_is_shipped():
+    assert isinstance(BookPlayer.with_default_book(4, 4, NoFallback()), BookPlayer)
+
+
+def test_book_player_wins_4x4_from_the_book():
+    player = BookPlayer(OpeningBook(default_book_path(4, 4)), NoFallback())
+    rng = random.Random(0)
+    game = HexGame(4, 4)
+    # The book has the winning side's moves from the start, and after every first move
+    for moves in [[]] + [[action] for action in range(16)]:
+        for _ in range(3):
+            game.load_moves(moves)
+            result = player.book.probe(game)
+            won = result is not None and result[0] == WIN
+            book_side = game.current_player if won else game.get_opponent(game.current_player)
+            while not game.done:
+                if game.current_player == book_side:
+                    game.make(player.select_action(game))
+                else:
+                    game.make(game.random_legal_action(rng))
+            assert game.winner == book_side
+
+
+def test_symmetric_positions_share_an_entry():
+    book = OpeningBook(default_book_path(4, 4))
+    rotation, _ = symmetries(4, 4)[1]
+    rng = random.Random(1)
+    game, rotated = HexGame(4, 4), HexGame(4, 4)
+    checked = 0
+    for first_move in range(16):
+        game.load_moves([first_move])
+        while not game.done:
+            rotated.load_moves([rotation[action] for action in game.history_vector().tolist()])
+            entry = book.probe(game)
+            if entry is None:
+                game.make(game.random_legal_action(rng))
+                continue
+            result, move = entry
+            assert book.probe(rotated) == (result, rotation[move])
+            # Only the canonical form is stored
+            assert rotated.canonical_hash() == game.canonical_hash()
+            for key in {game.hash, rotated.hash} - {game.canonical_hash()}:
+                assert book.lookup(key) is None
+            checked += 1
+            game.make(move)
+    assert checked > 16
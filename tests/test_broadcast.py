@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+from hexterm.broadcast import STYLE_WIN_PATH, AnsiRenderer
+from hexterm.hex_game import HexGame
+
+
+def test_broadcast_does_not_import_the_curses_ui():
+    code = "import sys, hexterm.broadcast; print({'curses', 'hexterm.hex_ui'} & set(sys.modules))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "set()"
+
+
+def test_renderer_highlights_the_winning_path():
+    game = HexGame(3, 3)
+    renderer = AnsiRenderer(3, 3)
+    renderer.render(game)
+    for action in (0, 1, 3, 4):
+        game.make(action)
+        assert f"\x1b[{STYLE_WIN_PATH}m" not in renderer.render(game).decode()
+    assert game.win_path() == []
+
+    game.make(6)
+    assert game.win_path() == [(0, 0), (1, 0), (2, 0)]
+    assert f"\x1b[{STYLE_WIN_PATH}m" in renderer.render(game).decode()
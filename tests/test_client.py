@@ -0,0 +1,62 @@
+import socket
+import threading
+import time
+
+from hexterm.client import NetworkOpponent
+from hexterm.hex_game import HexGame
+from hexterm.hex_ui import HexUI
+
+
+def start_server(after_start: bytes = b"") -> socket.socket:
+    """Starts a server that pairs one client as player 1, sends after_start and then only reads."""
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        connection, _ = server.accept()
+        with connection, connection.makefile("rb") as lines:
+            lines.readline()  # PLAY
+            connection.sendall(b"START 1 3 1\n" + after_start)
+            while lines.readline():
+                pass
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server
+
+
+def connect(server: socket.socket) -> NetworkOpponent:
+    return NetworkOpponent(port=server.getsockname()[1], size=3)
+
+
+def test_select_action_returns_the_opponents_move():
+    with start_server(b"WAIT\n\nMOVE 1 4\nMOVE 2 7\n") as server:
+        opponent = connect(server)
+        assert opponent.select_action(HexGame(3, 3)) == 7
+        opponent.close()
+
+
+def test_select_action_returns_none_when_the_connection_ends():
+    with start_server(b"LEFT\n") as server:
+        opponent = connect(server)
+        assert opponent.select_action(HexGame(3, 3)) is None
+        opponent._socket.shutdown(socket.SHUT_RD)
+        assert opponent.select_action(HexGame(3, 3)) is None
+        opponent.close()
+        assert opponent.select_action(HexGame(3, 3)) is None
+
+
+def test_quit_while_the_remote_move_is_pending(monkeypatch):
+    monkeypatch.setattr(HexUI, "init_colors", lambda self: None)
+    with start_server() as server:
+        hex_ui = HexUI(HexGame(3, 3))
+        hex_ui.ai = opponent = connect(server)
+        move = hex_ui.scheduler.submit(opponent.select_action, hex_ui.game)
+        time.sleep(0.1)
+        assert not move.done()
+
+        # What quitting does once the game loop ends
+        closing = threading.Thread(target=hex_ui.close, daemon=True)
+        closing.start()
+        closing.join(timeout=3)
+        assert not closing.is_alive()
+        assert move.result(timeout=0) is None
+        assert hex_ui.ai is None
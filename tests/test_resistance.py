@@ -0,0 +1,121 @@
+import random
+
+import numpy as np
+
+from hexterm.hex_game import STATE_EMPTY, HexGame, fill_winner, neighbor_table
+from hexterm.resistance import (
+    EMPTY_RESISTANCE,
+    MAX_RESISTANCE,
+    STONE_RESISTANCE,
+    ResistanceEvaluator,
+)
+
+
+def dense_resistance(board: np.ndarray, size: int, player: int) -> float:
+    """Returns the resistance between a player's edges from the pseudo-inverse of the Laplacian."""
+    num_cells = size * size
+    resistance = np.where(board == player, STONE_RESISTANCE, EMPTY_RESISTANCE)
+    resistance[(board != player) & (board != STATE_EMPTY)] = np.inf
+    source, sink = num_cells, num_cells + 1
+    laplacian = np.zeros((num_cells + 2, num_cells + 2))
+
+    def link(first: int, second: int, conductance: float) -> None:
+        laplacian[[first, second], [first, second]] += conductance
+        laplacian[first, second] -= conductance
+        laplacian[second, first] -= conductance
+
+    for cell, neighbors in enumerate(neighbor_table(size, size)):
+        for neighbor in neighbors:
+            if cell < neighbor and np.isfinite(resistance[cell] + resistance[neighbor]):
+                link(cell, neighbor, 1.0 / (resistance[cell] + resistance[neighbor]))
+        row, col = divmod(cell, size)
+        position = row if player == 1 else col
+        if np.isfinite(resistance[cell]) and position in (0, size - 1):
+            link(cell, source if position == 0 else sink, 1.0 / resistance[cell])
+
+    direction = np.zeros(num_cells + 2)
+    direction[[source, sink]] = 1.0, -1.0
+    return direction @ np.linalg.pinv(laplacian) @ direction
+
+
+def can_connect(board: np.ndarray, size: int, player: int) -> bool:
+    """Returns whether the player still wins with every empty cell filled with their stones."""
+    cells = np.where(board == STATE_EMPTY, player, board).tolist()
+    return fill_winner(cells, size, size) == player
+
+
+def random_game(rng: random.Random, size: int, num_moves: int) -> HexGame:
+    """Returns a game with up to num_moves random moves, stopping when one wins."""
+    game = HexGame(size, size)
+    for _ in range(num_moves):
+        if game.make(game.random_legal_action(rng)):
+            break
+    return game
+
+
+def test_resistances_match_a_dense_solve():
+    rng = random.Random(0)
+    for size in (3, 4, 5, 7):
+        for _ in range(10):
+            game = random_game(rng, size, rng.randrange(size * size))
+            evaluator = ResistanceEvaluator(size, size)
+            evaluator.update(game.board)
+            for player, resistance in zip((1, 2), evaluator.resistances()):
+                if can_connect(game.board, size, player):
+                    expected = dense_resistance(game.board, size, player)
+                    assert np.isclose(resistance, expected, rtol=1e-4)
+                else:
+                    assert resistance == MAX_RESISTANCE
+
+
+def test_cut_off_player_has_max_resistance():
+    board = np.zeros(25, dtype=np.int8)
+    for row, col in [(0, 1), (1, 1), (2, 2), (3, 1), (4, 1)]:
+        board[row * 5 + col] = 1
+    for row, col in [(1, 2), (1, 3), (1, 4), (2, 1), (3, 0)]:
+        board[row * 5 + col] = 2
+    evaluator = ResistanceEvaluator(5, 5)
+    evaluator.update(board)
+    resistance = evaluator.resistances()
+    assert resistance[0] == MAX_RESISTANCE
+    assert np.isclose(resistance[1], dense_resistance(board, 5, 2), rtol=1e-4)
+    assert evaluator.evaluate(2) > 0
+    assert evaluator.evaluate(1) == -evaluator.evaluate(2)
+
+
+def test_final_positions_rate_the_loser_cut_off():
+    rng = random.Random(1)
+    for size in range(5, 10):
+        for _ in range(5):
+            game = random_game(rng, size, size * size)
+            evaluator = ResistanceEvaluator(size, size)
+            evaluator.update(game.board)
+            loser = game.get_opponent(game.winner)
+            assert evaluator.resistances()[loser - 1] == MAX_RESISTANCE
+            assert np.isfinite(evaluator.evaluate(game.winner))
+            assert evaluator.evaluate(game.winner) > 0
+
+
+def test_evaluate_moves_prefers_a_winning_move():
+    rng = random.Random(2)
+    checked = 0
+    while checked < 20:
+        size = rng.randrange(4, 8)
+        game = random_game(rng, size, size * size)
+        game.undo()  # one move before the win
+        player = game.current_player
+        actions = game.legal_actions()
+        winning = game.winning_moves(player)
+        assert winning
+
+        evaluator = ResistanceEvaluator(size, size)
+        evaluator.update(game.board)
+        scores = evaluator.evaluate_moves(actions, player)
+        assert np.isfinite(scores).all()
+        assert actions[int(np.argmax(scores))] in winning
+        for action, score in zip(actions, scores):
+            game.make(action)
+            evaluator.update(game.board)
+            assert np.isclose(score, evaluator.evaluate(player), atol=1e-4)
+            game.undo()
+        checked += 1
@@ -0,0 +1,36 @@
+import asyncio
+
+from hexterm.server import GameServer
+
+
+async def open_clients(port: int, commands: list) -> list:
+    clients = []
+    for command in commands:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(command)
+        await writer.drain()
+        clients.append((reader, writer))
+    return clients
+
+
+def test_stopping_with_open_sessions_is_clean():
+    errors = []
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: errors.append(context)
+        )
+        server = GameServer()
+        ready = asyncio.get_running_loop().create_future()
+        serving = asyncio.create_task(server.serve("127.0.0.1", 0, ready))
+        port = await ready
+        # A game, a client waiting for an opponent and a client that sent nothing yet
+        clients = await open_clients(port, [b"PLAY 3\n", b"PLAY 3\n", b"PLAY 4\n", b""])
+        while len(server.sessions) < 1:
+            await asyncio.sleep(0.01)
+        serving.cancel()
+        return clients
+
+    clients = asyncio.run(run())
+    assert errors == []
+    assert len(clients) == 4
@@ -0,0 +1,54 @@
+from hexterm.bitboard import BitboardHexGame
+from hexterm.book import LOSS, WIN
+from hexterm.solver import Solver
+from hexterm.transposition import TranspositionTable
+
+
+def test_table_entries_hold_several_values():
+    table = TranspositionTable(1024, num_values=2)
+    table.store(12345, (3, 1 << 40), depth=7, best_move=5)
+    assert table.lookup(12345) == ((3.0, float(1 << 40)), 7, 5, 0)
+    assert table.lookup(54321) is None
+
+
+def test_table_size_is_fixed():
+    table = TranspositionTable(1024, num_values=2)
+    for key in range(10 * table.num_entries):
+        table.store(key, (1, 1), depth=1)
+    stats = table.stats()
+    assert stats["used"] == stats["capacity"] == table.num_entries
+    assert stats["evictions"] > 0
+
+
+def results(solver: Solver, size: int) -> list:
+    """Returns the result and winning move of the empty board and of every first move."""
+    game = BitboardHexGame(size, size)
+    found = [solver.solve(game)]
+    for action in range(size * size):
+        game.make(action)
+        found.append(solver.solve(game))
+        game.undo()
+    return found
+
+
+def test_solver_shares_numbers_through_the_table():
+    solver = Solver()
+    assert results(solver, 3)[0] == (WIN, 4)
+    assert solver.table.stats()["hits"] > 0
+
+
+def test_small_table_gives_the_same_results():
+    solver = Solver(memory_bytes=4096)
+    found = results(solver, 4)
+    assert [result for result, _ in found] == [result for result, _ in results(Solver(), 4)]
+    assert solver.table.stats()["evictions"] > 0
+
+    # The winning moves may differ, but are right although the table evicted entries
+    game = BitboardHexGame(4, 4)
+    for action, (result, best_move) in enumerate(found[1:]):
+        game.make(action)
+        if result == WIN:
+            game.make(best_move)
+            assert game.done or Solver().solve(game)[0] == LOSS
+            game.undo()
+        game.undo()
@@ -0,0 +1,38 @@
+import numpy as np
+
+from hexterm.tournament import GameResult, elo_ratings, schedule
+
+
+def gauntlet_results(num_players: int, games_per_pair: int, seed: int = 1) -> list:
+    """Returns the results of a gauntlet where the first player wins 60% of the games."""
+    rng = np.random.default_rng(seed)
+    results = []
+    for index, (first, second) in enumerate(schedule(num_players, games_per_pair, True)):
+        other = second if first == 0 else first
+        winner = 0 if rng.random() < 0.6 else other
+        results.append(GameResult(index, first, second, index, winner, np.zeros(0), 0.0))
+    return results
+
+
+def test_small_gauntlet_has_finite_intervals():
+    # Some bootstrap resamples leave out every game of a player
+    ratings, lower, upper = elo_ratings(gauntlet_results(5, 5), 5)
+    assert np.isfinite(ratings).all() and np.isfinite(lower).all() and np.isfinite(upper).all()
+    assert (lower <= ratings).all() and (ratings <= upper).all()
+
+
+def test_rating_of_a_known_score():
+    # 75% against the first player is about 191 Elo, shrunk a little by the prior
+    results = [
+        GameResult(i, i % 2, 1 - i % 2, i, 1 if i % 4 else 0, np.zeros(0), 0.0) for i in range(400)
+    ]
+    ratings, _, _ = elo_ratings(results, 2)
+    assert 185 < ratings[1] < 191
+
+
+def test_ratings_do_not_depend_on_the_order_games_finish_in():
+    results = gauntlet_results(3, 10)
+    shuffled = list(results)
+    np.random.default_rng(2).shuffle(shuffled)
+    for expected, found in zip(elo_ratings(results, 3), elo_ratings(shuffled, 3)):
+        np.testing.assert_array_equal(expected, found)